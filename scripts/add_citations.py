@@ -1,55 +1,124 @@
 #!/usr/bin/env python3
 """
 Script to add citation commands for all publications in LaTeX file
+
+By default the file is synchronized incrementally: only keys that are not
+cited yet get a \\nocite command, \\nocite keys that are no longer in the
+bib file are removed, and the file is not rewritten (its mtime stays the
+same) when nothing changed, so LaTeX builds are not triggered needlessly.
 """
 
+import argparse
 import re
 
+from bib_parser import parse_bibtex_file
+from update_latex_citations import CITE_RE, KEY_TOKEN_RE
+
+# \nocite command, optionally occupying a whole line
+NOCITE_RE = re.compile(r'(^[ \t]*)?\\nocite\s*\{([^}]*)\}([ \t]*\n)?', re.MULTILINE)
+BIBLIOGRAPHY_RE = re.compile(r'\\bibliography\{[^}]*\}')
+
 def extract_bibtex_keys(bibtex_file):
     """Extract all BibTeX keys from the file"""
-    with open(bibtex_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Find all @article{key, patterns
-    pattern = r'@article\{([^,]+),'
-    keys = re.findall(pattern, content)
-    return keys
+    # All entry types (@article, @inproceedings, @phdthesis, ...), in file order
+    keys = [entry['key'] for entry in parse_bibtex_file(bibtex_file)]
+    return list(dict.fromkeys(keys))
 
 def add_citations_to_latex(latex_file, bibtex_keys):
     """Add citation commands to LaTeX file"""
     with open(latex_file, 'r', encoding='utf-8') as f:
         content = f.read()
-    
+
     # Find the bibliography section
     bib_pattern = r'(\\bibliography\{my_bib\})'
-    
+
     # Create citation commands
     citations = []
     for key in bibtex_keys:
         citations.append(f'\\nocite{{{key}}}')
-    
+
     citations_text = '\n'.join(citations)
-    
+
     # Replace bibliography command with citations + bibliography
     new_content = re.sub(bib_pattern, f'{citations_text}\n\\1', content)
-    
+
     # Write back to file
     with open(latex_file, 'w', encoding='utf-8') as f:
         f.write(new_content)
-    
+
     print(f"Added {len(citations)} citation commands to {latex_file}")
 
+def cited_keys(content):
+    """Collect keys of all citation commands (\\cite, \\nocite, ...) in LaTeX source"""
+    keys = set()
+    for match in CITE_RE.finditer(content):
+        keys.update(KEY_TOKEN_RE.findall(match.group(2)))
+    return keys
+
+def sync_citations(latex_file, bibtex_keys):
+    """Incrementally synchronize \\nocite commands with BibTeX keys"""
+    with open(latex_file, 'r', encoding='utf-8', newline='') as f:
+        content = f.read()
+
+    bib_keys = set(bibtex_keys)
+    removed = []
+
+    # Remove \nocite keys that are no longer in the bib file
+    def prune(match):
+        keys = KEY_TOKEN_RE.findall(match.group(2))
+        kept = [key for key in keys if key == '*' or key in bib_keys]
+        if kept == keys:
+            return match.group(0)
+        removed.extend(key for key in keys if key not in kept)
+        if kept:
+            return f"{match.group(1) or ''}\\nocite{{{','.join(kept)}}}{match.group(3) or ''}"
+        if match.group(1) is not None and match.group(3) is not None:
+            return ''
+        return f"{match.group(1) or ''}{match.group(3) or ''}"
+
+    new_content = NOCITE_RE.sub(prune, content)
+
+    # Add \nocite only for keys that are not cited anywhere yet
+    cited = cited_keys(new_content)
+    missing = [] if '*' in cited else [key for key in bibtex_keys if key not in cited]
+    if missing:
+        bibliography = BIBLIOGRAPHY_RE.search(new_content)
+        if not bibliography:
+            print(f"No \\bibliography command found in {latex_file}")
+            missing = []
+        else:
+            citations_text = ''.join(f'\\nocite{{{key}}}\n' for key in missing)
+            position = bibliography.start()
+            new_content = new_content[:position] + citations_text + new_content[position:]
+
+    if new_content == content:
+        print(f"No changes: {latex_file} is up to date")
+        return missing, removed
+
+    with open(latex_file, 'w', encoding='utf-8', newline='') as f:
+        f.write(new_content)
+
+    print(f"Added {len(missing)} and removed {len(removed)} citation keys in {latex_file}")
+    return missing, removed
+
 def main():
-    bibtex_file = 'central uni grant/my_bib.bib'
-    latex_file = 'central uni grant/Osinenko_list_of_papers_no_preprints.tex'
-    
+    parser = argparse.ArgumentParser(description='Add \\nocite commands for all BibTeX entries to a LaTeX file')
+    parser.add_argument('--bib', default='central uni grant/my_bib.bib', help='BibTeX file')
+    parser.add_argument('--tex', default='central uni grant/Osinenko_list_of_papers_no_preprints.tex', help='LaTeX file')
+    parser.add_argument('--append-all', action='store_true', help='Old behaviour: prepend \\nocite for every key unconditionally')
+
+    args = parser.parse_args()
+
     print("Extracting BibTeX keys...")
-    keys = extract_bibtex_keys(bibtex_file)
+    keys = extract_bibtex_keys(args.bib)
     print(f"Found {len(keys)} publications")
-    
+
     print("Adding citation commands to LaTeX file...")
-    add_citations_to_latex(latex_file, keys)
-    
+    if args.append_all:
+        add_citations_to_latex(args.tex, keys)
+    else:
+        sync_citations(args.tex, keys)
+
     print("Done!")
 
 if __name__ == "__main__":
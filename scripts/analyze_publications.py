@@ -3,128 +3,130 @@
 Script to analyze publication statistics from BibTeX file
 """
 
-import re
+import argparse
 import json
-from collections import defaultdict, Counter
+from collections import Counter
 
-def parse_bibtex_file(filename):
-    """Parse BibTeX file and extract publication data"""
+from author_identity import default_resolver, resolve_authors
+from bib_parser import iter_bibtex_blocks, parse_bibtex_text
+from citation_metrics import citation_report, default_since_year, parse_citations
+from journal_names import canonical_journal
+from keyword_classifier import DEFAULT_TAXONOMY_FILE, build_classifier, classify, load_taxonomy
+from latex_codec import escape_latex, unescape_fields
+from topic_clusters import count_topics, load_topic_areas
+
+def is_first_author(author_ids, researcher=0):
+    """Check whether the configured researcher (researchers.json) is the first author"""
+    return bool(author_ids) and author_ids[0] == researcher
+
+def entry_to_publication(entry, resolver=None):
+    """Extract publication data from a parsed BibTeX entry (None if incomplete); researcher 0 of resolver is the owner"""
+    fields = unescape_fields(entry)
+    title = fields.get('title', '').strip()
+    author = fields.get('author', '').strip()
+    year = fields.get('year', '').strip()
+    if not (title and author and year):
+        return None
+
+    authors = [author.strip() for author in author.split(' and ')]
+    author_ids = resolve_authors(resolver or default_resolver(), authors)
+    return {
+        'key': entry['key'],
+        'title': title,
+        'authors': authors,
+        'author_ids': author_ids,
+        'year': year,
+        'journal': canonical_journal(fields.get('journal', '')),
+        'publisher': fields.get('publisher', '').strip(),
+        'doi': fields.get('doi', '').strip(),
+        'citations': parse_citations(fields.get('citations')),
+        'is_first_author': is_first_author(author_ids)
+    }
+
+def parse_bibtex_file(filename, resolver=None):
+    """Parse BibTeX file and yield publication data entry by entry"""
     with open(filename, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Split into individual entries
-    entries = re.split(r'\n(?=@)', content)
-    
-    publications = []
-    
-    for entry in entries:
-        if not entry.strip() or not entry.startswith('@'):
-            continue
-        
-        # Extract basic information
-        title_match = re.search(r'title\s*=\s*{([^}]+)}', entry)
-        author_match = re.search(r'author\s*=\s*{([^}]+)}', entry)
-        year_match = re.search(r'year\s*=\s*{([^}]+)}', entry)
-        journal_match = re.search(r'journal\s*=\s*{([^}]+)}', entry)
-        doi_match = re.search(r'doi\s*=\s*{([^}]+)}', entry)
-        
-        if title_match and author_match and year_match:
-            title = title_match.group(1).strip()
-            authors = [author.strip() for author in author_match.group(1).split(' and ')]
-            year = year_match.group(1).strip()
-            journal = journal_match.group(1).strip() if journal_match else ""
-            doi = doi_match.group(1).strip() if doi_match else ""
-            
-            # Determine if first author
-            is_first_author = False
-            if authors:
-                first_author = authors[0].lower()
-                if 'osinenko' in first_author or 'павел' in first_author or 'pavel' in first_author:
-                    is_first_author = True
-            
-            publications.append({
-                'title': title,
-                'authors': authors,
-                'year': year,
-                'journal': journal,
-                'doi': doi,
-                'is_first_author': is_first_author
-            })
-    
-    return publications
+        for block in iter_bibtex_blocks(f):
+            for entry in parse_bibtex_text(block):
+                publication = entry_to_publication(entry, resolver)
+                if publication:
+                    yield publication
 
-def analyze_publications(publications):
-    """Analyze publication statistics"""
+def new_aggregate(taxonomy):
+    """Create empty running statistics"""
+    return {
+        'total': 0,
+        'first_author': 0,
+        'by_year': Counter(),
+        'first_author_by_year': Counter(),
+        'journals': Counter(),
+        'research_areas': {area: 0 for area in taxonomy},
+        'citations': [],
+        'citation_years': [],
+        'keys': [],
+    }
+
+def add_publication(aggregate, publication, classifier):
+    """Update all running statistics with one publication"""
+    aggregate['total'] += 1
+    if publication['is_first_author']:
+        aggregate['first_author'] += 1
+
+    if publication['year'].isdigit():
+        year = int(publication['year'])
+        aggregate['by_year'][year] += 1
+        if publication['is_first_author']:
+            aggregate['first_author_by_year'][year] += 1
+
+    if publication['journal']:
+        aggregate['journals'][publication['journal']] += 1
+
+    aggregate['citations'].append(publication['citations'])
+    aggregate['citation_years'].append(int(publication['year']) if publication['year'].isdigit() else 0)
+    aggregate['keys'].append(publication['key'])
+
+    # Research areas (based on journal names and titles)
+    for area in classify(classifier, publication['title'], publication['journal']):
+        aggregate['research_areas'][area] += 1
+
+def finalize_aggregate(aggregate, since_year=None, topics=None):
+    """Convert running statistics to the stats dictionary; with topics (load_topic_areas) research areas are topic clusters"""
     stats = {}
-    
-    # Basic counts
-    stats['total_publications'] = len(publications)
-    stats['first_author_publications'] = sum(1 for p in publications if p['is_first_author'])
-    
-    # Years
-    years = [int(p['year']) for p in publications if p['year'].isdigit()]
+    stats['total_publications'] = aggregate['total']
+    stats['first_author_publications'] = aggregate['first_author']
+
+    years = aggregate['by_year']
     stats['year_range'] = f"{min(years)}-{max(years)}" if years else "N/A"
-    stats['avg_per_year'] = round(len(publications) / (max(years) - min(years) + 1), 1) if years else 0
-    
-    # Publications by year
-    year_counts = Counter(int(p['year']) for p in publications if p['year'].isdigit())
-    stats['by_year'] = dict(sorted(year_counts.items()))
-    
-    # First author by year
-    first_author_by_year = Counter()
-    for p in publications:
-        if p['is_first_author'] and p['year'].isdigit():
-            first_author_by_year[int(p['year'])] += 1
-    stats['first_author_by_year'] = dict(sorted(first_author_by_year.items()))
-    
-    # Journals
-    journal_counts = Counter(p['journal'] for p in publications if p['journal'])
-    stats['top_journals'] = dict(journal_counts.most_common(10))
-    
-    # Research areas (based on journal names and titles)
-    research_areas = {
-        'control_theory': 0,
-        'machine_learning': 0,
-        'agriculture': 0,
-        'optimization': 0,
-        'energy': 0
-    }
-    
-    for p in publications:
-        title_lower = p['title'].lower()
-        journal_lower = p['journal'].lower()
-        
-        # Control theory and automation
-        if any(keyword in title_lower or keyword in journal_lower 
-               for keyword in ['control', 'automatic', 'ifac', 'ecc', 'cdc']):
-            research_areas['control_theory'] += 1
-        
-        # Machine learning and AI
-        if any(keyword in title_lower or keyword in journal_lower 
-               for keyword in ['learning', 'reinforcement', 'neural', 'ai', 'artificial']):
-            research_areas['machine_learning'] += 1
-        
-        # Agriculture
-        if any(keyword in title_lower or keyword in journal_lower 
-               for keyword in ['biosystem', 'agriculture', 'farm', 'tractor', 'soil']):
-            research_areas['agriculture'] += 1
-        
-        # Optimization
-        if any(keyword in title_lower or keyword in journal_lower 
-               for keyword in ['optimization', 'optimal', 'dynamic programming']):
-            research_areas['optimization'] += 1
-        
-        # Energy
-        if any(keyword in title_lower or keyword in journal_lower 
-               for keyword in ['energy', 'battery', 'flow']):
-            research_areas['energy'] += 1
-    
-    stats['research_areas'] = research_areas
-    
+    stats['avg_per_year'] = round(aggregate['total'] / (max(years) - min(years) + 1), 1) if years else 0
+
+    stats['by_year'] = dict(sorted(years.items()))
+    stats['first_author_by_year'] = dict(sorted(aggregate['first_author_by_year'].items()))
+    stats['top_journals'] = top_counts(aggregate['journals'])
+    stats['research_areas'] = count_topics(topics, aggregate['keys']) if topics else aggregate['research_areas']
+
+    # Citation metrics: all papers and papers published since since_year
+    since_year = since_year or default_since_year()
+    stats['citation_metrics'] = citation_report(aggregate['citations'], aggregate['citation_years'], since_year)
     return stats
 
-def generate_latex_tables(stats):
+def top_counts(counter, limit=10):
+    """Most common items; ties are broken by name so the order does not depend on input order"""
+    return dict(sorted(counter.items(), key=lambda item: (-item[1], item[0]))[:limit])
+
+def analyze_publications(publications, taxonomy=None, since_year=None, topics=None):
+    """Analyze publication statistics in a single pass over publications"""
+    taxonomy = taxonomy or load_taxonomy()
+    classifier = build_classifier(taxonomy)
+
+    aggregate = new_aggregate(taxonomy)
+    for publication in publications:
+        add_publication(aggregate, publication, classifier)
+
+    return finalize_aggregate(aggregate, since_year, topics)
+
+def generate_latex_tables(stats, taxonomy=None):
     """Generate LaTeX table content"""
+    taxonomy = taxonomy or load_taxonomy()
     
     # Basic statistics table
     basic_stats = f"""\\begin{{table}}[h]
@@ -145,20 +147,22 @@ def generate_latex_tables(stats):
 \\end{{table}}"""
 
     # Citation statistics table
-    citation_stats = """\\begin{table}[h]
+    citations = stats['citation_metrics']
+    all_time, since = citations['all'], citations['since']
+    citation_stats = f"""\\begin{{table}}[h]
 \\centering
-\\begin{tabular}{|l|c|c|}
+\\begin{{tabular}}{{|l|c|c|}}
 \\hline
-\\textbf{Метрика} & \\textbf{Все} & \\textbf{Начиная с 2020 г.} \\\\
+\\textbf{{Метрика}} & \\textbf{{Все}} & \\textbf{{Работы с {citations['since_year']} г.}} \\\\
 \\hline
-Процитировано & 512 & 428 \\\\
+Процитировано & {all_time['citations']} & {since['citations']} \\\\
 \\hline
-h-индекс & 11 & 11 \\\\
+h-индекс & {all_time['h_index']} & {since['h_index']} \\\\
 \\hline
-i10-индекс & 14 & 12 \\\\
+i10-индекс & {all_time['i10_index']} & {since['i10_index']} \\\\
 \\hline
-\\end{tabular}
-\\end{table}"""
+\\end{{tabular}}
+\\end{{table}}"""
     
     # Publications by year table
     year_table = "\\begin{table}[h]\n\\centering\n\\begin{tabular}{|c|c|c|}\n\\hline\n\\textbf{Год} & \\textbf{Количество публикаций} & \\textbf{Публикаций первым автором} \\\\\n\\hline\n"
@@ -173,22 +177,15 @@ i10-индекс & 14 & 12 \\\\
     # Top journals
     journals_list = "\\begin{itemize}\n"
     for journal, count in list(stats['top_journals'].items())[:6]:
-        journals_list += f"\\item \\textbf{{{journal}}} - {count} публикаций\n"
+        journals_list += f"\\item \\textbf{{{escape_latex(journal)}}} - {count} публикаций\n"
     journals_list += "\\end{itemize}"
     
     # Research areas
     areas_list = "\\begin{itemize}\n"
-    area_names = {
-        'control_theory': 'Теория управления и автоматизация',
-        'machine_learning': 'Машинное обучение и искусственный интеллект',
-        'agriculture': 'Сельскохозяйственная робототехника',
-        'optimization': 'Оптимизация и алгоритмы',
-        'energy': 'Энергетические системы'
-    }
-    
     for area, count in stats['research_areas'].items():
         if count > 0:
-            areas_list += f"\\item \\textbf{{{area_names[area]}}} - {count} публикаций\n"
+            area_name = taxonomy.get(area, {}).get('name', area)
+            areas_list += f"\\item \\textbf{{{escape_latex(area_name)}}} - {count} публикаций\n"
     areas_list += "\\end{itemize}"
     
     return {
@@ -200,14 +197,32 @@ i10-индекс & 14 & 12 \\\\
     }
 
 def main():
-    bibtex_file = 'central uni grant/my_bib.bib'
-    
+    parser = argparse.ArgumentParser(description='Analyze publication statistics from a BibTeX file')
+    parser.add_argument('bib_file', nargs='?', default='central uni grant/my_bib.bib', help='BibTeX file')
+    parser.add_argument('--taxonomy', '-t', default=str(DEFAULT_TAXONOMY_FILE), help='Research area taxonomy JSON file')
+    parser.add_argument('--since', type=int, default=default_since_year(), help='First publication year of the citation window')
+    parser.add_argument('--topics', help='Topics JSON from topic_clusters.py; analyzed entries are counted by their topic instead of keyword research areas')
+    parser.add_argument('--state', help='Persisted statistics state; only changed entries are re-analyzed')
+
+    args = parser.parse_args()
+    taxonomy = load_taxonomy(args.taxonomy)
+    topics = load_topic_areas(args.topics) if args.topics else None
+
     print("Analyzing publication statistics...")
-    publications = parse_bibtex_file(bibtex_file)
-    
-    print(f"Found {len(publications)} publications")
+    if args.state:
+        # Imported here: stats_store builds on this module
+        from stats_store import refresh_state, state_to_stats
+        state, delta = refresh_state(args.state, args.bib_file, taxonomy)
+        print(f"Changed entries: {len(delta['added'])} added, {len(delta['removed'])} removed, {len(delta['updated'])} updated")
+        stats = state_to_stats(state, taxonomy, args.since, topics)
+    else:
+        stats = analyze_publications(parse_bibtex_file(args.bib_file), taxonomy, args.since, topics)
+
+    if topics:
+        # Research areas are clusters of the topic model
+        taxonomy = topics[0]
     
-    stats = analyze_publications(publications)
+    print(f"Found {stats['total_publications']} publications")
     
     print("\n=== PUBLICATION STATISTICS ===")
     print(f"Total publications: {stats['total_publications']}")
@@ -231,7 +246,7 @@ def main():
             print(f"{area}: {count} publications")
     
     # Generate LaTeX tables
-    latex_tables = generate_latex_tables(stats)
+    latex_tables = generate_latex_tables(stats, taxonomy)
     
     # Save to file
     with open('publication_stats_latex.txt', 'w', encoding='utf-8') as f:
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Отождествление авторов по именам.
+
+Имя разбирается на фамилию и инициалы ("Pavel V. Osinenko",
+"Osinenko, P. V." и "Осиненко П. В." дают фамилию osinenko и инициалы
+p, v): LaTeX экранирование снимается, кириллица транслитерируется по
+таблице russian_rules.json, диакритика отбрасывается. Исследователи
+задаются файлом researchers.json ({"id": {"name": ..., "variants": [...]}})
+и получают идентификаторы 0, 1, ...; имя относится к исследователю, если
+совпадает фамилия, а инициалы согласованы (одни являются началом других).
+Остальные авторы отождествляются по фамилии и первому инициалу.
+
+Индекс вариант написания -> целый идентификатор мемоизируется, поэтому
+каждое написание разбирается один раз, а позиции автора (первый,
+последний, единственный) определяются сравнением целых чисел.
+"""
+
+import argparse
+import json
+import re
+import sys
+import unicodedata
+from pathlib import Path
+
+from bib_names import load_transliteration, parse_name
+from latex_codec import unescape_latex
+
+
+# Исследователи по умолчанию рядом со скриптом
+DEFAULT_RESEARCHERS_FILE = Path(__file__).with_name('researchers.json')
+
+# Инициалы в конце имени без запятой: "Осиненко П. В.", "Osinenko P.V."
+TRAILING_INITIALS_RE = re.compile(r'^(.+?)\s+((?:\w\.\s*)+)$')
+
+NAME_PART_RE = re.compile(r'[\s.\-]+')
+
+_transliteration = None
+
+
+def transliterate(text):
+    """Транслитерирует кириллицу и отбрасывает диакритику, нижний регистр."""
+    global _transliteration
+    if _transliteration is None:
+        _transliteration = load_transliteration()
+    text = ''.join(_transliteration.get(char, char) for char in text)
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def split_name(name):
+    """Разбирает имя на (фамилия, инициалы) в латинице нижнего регистра."""
+    name = ' '.join(unescape_latex(name).replace('{', '').replace('}', '').split())
+    trailing = TRAILING_INITIALS_RE.match(name)
+    if trailing and ',' not in name:
+        name = f"{trailing.group(1)}, {trailing.group(2)}"
+
+    first, von, last, _ = parse_name(name)
+    family = transliterate(' '.join(part for part in (von, last) if part))
+    family = ' '.join(NAME_PART_RE.split(family)).strip()
+    initials = tuple(transliterate(part)[0] for part in NAME_PART_RE.split(first) if part)
+    return family, initials
+
+
+def initials_match(left, right):
+    """Инициалы согласованы: одни являются началом других."""
+    size = min(len(left), len(right))
+    return left[:size] == right[:size]
+
+
+def load_researchers(researchers_file=DEFAULT_RESEARCHERS_FILE):
+    """Загружает исследователей: {идентификатор: {'name': ..., 'variants': [...]}}."""
+    with open(researchers_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_resolver(researchers):
+    """
+    Строит резолвер имен.
+
+    Возвращает словарь с именами (каноническими для исследователей и
+    первым встретившимся написанием для остальных), ключами
+    исследователей по фамилии и мемоизированным индексом написаний.
+    """
+    resolver = {
+        'researchers': list(researchers),
+        'names': [],
+        'families': {},
+        'keys': {},
+        'cache': {},
+    }
+    for author_id, (slug, description) in enumerate(researchers.items()):
+        resolver['names'].append(description.get('name', slug))
+        for variant in [description.get('name', slug)] + description.get('variants', []):
+            family, initials = split_name(variant)
+            resolver['families'].setdefault(family, []).append((initials, author_id))
+    return resolver
+
+
+def resolve(resolver, name):
+    """Целый идентификатор автора по написанию имени (мемоизирован)."""
+    cache = resolver['cache']
+    if name in cache:
+        return cache[name]
+
+    family, initials = split_name(name)
+    author_id = None
+    for researcher_initials, researcher_id in resolver['families'].get(family, []):
+        if initials_match(initials, researcher_initials):
+            author_id = researcher_id
+            break
+
+    if author_id is None:
+        key = (family, initials[:1])
+        if key not in resolver['keys']:
+            resolver['keys'][key] = len(resolver['names'])
+            resolver['names'].append(' '.join(name.split()))
+        author_id = resolver['keys'][key]
+
+    cache[name] = author_id
+    return author_id
+
+
+def resolve_authors(resolver, authors):
+    """Идентификаторы списка авторов."""
+    return [resolve(resolver, author) for author in authors]
+
+
+def researcher_id(resolver, slug):
+    """Идентификатор исследователя по его ключу в файле исследователей."""
+    return resolver['researchers'].index(slug)
+
+
+def is_researcher(resolver, author_id):
+    """Идентификатор принадлежит настроенному исследователю."""
+    return author_id < len(resolver['researchers'])
+
+
+def common_authors(resolver, authors, other_authors):
+    """Общие авторы двух списков (для поиска самоцитирований)."""
+    return set(resolve_authors(resolver, authors)) & set(resolve_authors(resolver, other_authors))
+
+
+_default_resolver = None
+
+
+def default_resolver():
+    """Резолвер по файлу исследователей по умолчанию (строится один раз)."""
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = build_resolver(load_researchers())
+    return _default_resolver
+
+
+def position_stats(author_id_lists, author_id):
+    """Число статей автора первым, последним, единственным и средним автором."""
+    stats = {'total': 0, 'first': 0, 'last': 0, 'solo': 0, 'middle': 0}
+    for author_ids in author_id_lists:
+        if author_id not in author_ids:
+            continue
+        stats['total'] += 1
+        if len(author_ids) == 1:
+            stats['solo'] += 1
+        elif author_ids[0] == author_id:
+            stats['first'] += 1
+        elif author_ids[-1] == author_id:
+            stats['last'] += 1
+        else:
+            stats['middle'] += 1
+    return stats
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Resolve author names and report author positions')
+    parser.add_argument('bib_file', help='BibTeX file')
+    parser.add_argument('--researchers', '-r', default=str(DEFAULT_RESEARCHERS_FILE), help='Researchers JSON file')
+
+    args = parser.parse_args()
+
+    for filename in (args.bib_file, args.researchers):
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+
+    # Импорт здесь: analyze_publications сам использует этот модуль
+    from analyze_publications import parse_bibtex_file
+
+    resolver = build_resolver(load_researchers(args.researchers))
+    author_id_lists = [resolve_authors(resolver, publication['authors'])
+                       for publication in parse_bibtex_file(args.bib_file)]
+    print(f"Публикаций: {len(author_id_lists)}, авторов: {len(resolver['names'])}, написаний: {len(resolver['cache'])}")
+
+    for slug in resolver['researchers']:
+        author_id = researcher_id(resolver, slug)
+        variants = sorted(name for name, resolved in resolver['cache'].items() if resolved == author_id)
+        stats = position_stats(author_id_lists, author_id)
+        print(f"\n=== {resolver['names'][author_id]} ===")
+        print(f"Написания: {'; '.join(variants)}")
+        print(f"Всего: {stats['total']}, первым: {stats['first']}, последним: {stats['last']}, "
+              f"единственным: {stats['solo']}, в середине: {stats['middle']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Генерация .bbl файла без запуска bibtex.
+
+Записи из bib файла форматируются в стиле ieeetr, который используется в
+списках публикаций (Osinenko_list_of_papers_no_preprints*.tex), и
+сортируются по году и фамилии первого автора. Отформатированный текст
+каждой записи кэшируется по хешу ее исходного текста, поэтому при
+повторной генерации заново форматируются только измененные записи.
+Если .bbl не изменился, файл не перезаписывается.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+from add_citations import cited_keys
+from bib_names import parse_name, split_top_level
+from bib_parser import parse_bibtex_text, read_bibtex_file
+
+
+# Версия форматирования: при изменении правил старый кэш не используется
+STYLE_VERSION = 'ieeetr-1'
+
+# Сокращения месяцев из ieeetr.bst
+MONTHS = {
+    'jan': 'Jan.', 'feb': 'Feb.', 'mar': 'Mar.', 'apr': 'Apr.', 'may': 'May', 'jun': 'June',
+    'jul': 'July', 'aug': 'Aug.', 'sep': 'Sept.', 'oct': 'Oct.', 'nov': 'Nov.', 'dec': 'Dec.',
+}
+
+YEAR_RE = re.compile(r'\d{4}')
+SINGLE_DASH_RE = re.compile(r'(?<!-)-(?!-)')
+
+
+def initial(token):
+    """Инициал слова: "Jean-Pierre" -> "J.-P.", "{\\"O}zg{\\"u}r" -> "{\\"O}."."""
+    pieces = []
+    for piece in token.split('-'):
+        if piece.startswith('{'):
+            depth = 0
+            for index, char in enumerate(piece):
+                depth += {'{': 1, '}': -1}.get(char, 0)
+                if depth == 0:
+                    pieces.append(piece[:index + 1] + '.')
+                    break
+            else:
+                pieces.append(piece + '.')
+        elif piece:
+            pieces.append(piece[0] + '.')
+    return '-'.join(pieces)
+
+
+def tie(left, right):
+    """Соединяет части имени: неразрывный пробел после коротких частей, как в BibTeX."""
+    if not left:
+        return right
+    return f"{left}{'~' if len(left) < 3 else ' '}{right}"
+
+
+def format_name(name):
+    """Имя в формате ieeetr: "{f.~}{vv~}{ll}{, jj}"."""
+    first, von, last, jr = parse_name(name)
+    initials = '~'.join(initial(token) for token in split_top_level(first, re.compile(r'\s+')))
+    formatted = tie(initials, tie(von, last))
+    return f"{formatted}, {jr}" if jr else formatted
+
+
+def format_names(field):
+    """Список авторов: "A", "A and B", "A, B, and C", "... et~al."."""
+    names = split_top_level(field, re.compile(r'\s+and\s+', re.IGNORECASE))
+    others = bool(names) and names[-1].lower() == 'others'
+    formatted = [format_name(name) for name in names if name.lower() != 'others']
+    if others:
+        # Как в ieeetr.bst: запятая перед "et~al.", если всего имен (с others) больше двух
+        return f"{', '.join(formatted)}{',' if len(formatted) >= 2 else ''} et~al."
+    if len(formatted) <= 2:
+        return ' and '.join(formatted)
+    return ', '.join(formatted[:-1]) + ', and ' + formatted[-1]
+
+
+def title_case(title):
+    """
+    Преобразование "t" из change.case$: все буквы вне фигурных скобок
+    строчные, кроме первой и первой после двоеточия с пробелом.
+    """
+    result = []
+    depth = 0
+    keep = True
+    after_colon = False
+    for char in title:
+        if char == '{':
+            depth += 1
+            keep = False
+        elif char == '}':
+            depth = max(depth - 1, 0)
+        elif depth == 0:
+            if char.isspace():
+                if after_colon:
+                    keep = True
+            elif keep:
+                keep = False
+                after_colon = char == ':'
+            else:
+                after_colon = char == ':'
+                char = char.lower()
+        result.append(char)
+    return ''.join(result)
+
+
+def format_pages(pages):
+    """Страницы: "pp.~1--10" для диапазона, "p.~5" для одной страницы."""
+    if not pages:
+        return ''
+    if any(char in pages for char in '-,+'):
+        return 'pp.~' + SINGLE_DASH_RE.sub('--', pages)
+    return 'p.~' + pages
+
+
+def format_date(fields):
+    """Дата: "Feb. 2019" или только год."""
+    month = fields.get('month', '')
+    month = MONTHS.get(month.lower()[:3], month) if month else ''
+    return ' '.join(part for part in (month, fields.get('year', '')) if part)
+
+
+def format_vol_num_pages(fields):
+    """Том, номер и страницы статьи."""
+    parts = []
+    if fields.get('volume'):
+        parts.append(f"vol.~{fields['volume']}")
+    if fields.get('number'):
+        parts.append(f"no.~{fields['number']}")
+    parts.append(format_pages(fields.get('pages')))
+    return parts
+
+
+def quoted_title(fields):
+    """Название в кавычках; признак True означает закрывающие кавычки после знака."""
+    title = fields.get('title')
+    return (f"``{title_case(title)}", True) if title else None
+
+
+def emphasize(text):
+    """Выделение курсивом, как emphasize в .bst."""
+    return f"{{\\em {text}}}" if text else ''
+
+
+def _article(fields):
+    return [[quoted_title(fields), emphasize(fields.get('journal'))] + format_vol_num_pages(fields) + [format_date(fields)]]
+
+
+def _inproceedings(fields):
+    booktitle = fields.get('booktitle')
+    block = [quoted_title(fields), f"in {emphasize(booktitle)}" if booktitle else '']
+    if fields.get('volume'):
+        block.append(f"vol.~{fields['volume']}")
+    block.append(format_pages(fields.get('pages')))
+    if fields.get('address'):
+        block += [fields['address'], format_date(fields)]
+        return [block, [fields.get('organization', ''), fields.get('publisher', '')]]
+    block += [fields.get('organization', ''), fields.get('publisher', ''), format_date(fields)]
+    return [block]
+
+
+def _book(fields):
+    publisher = ': '.join(part for part in (fields.get('address'), fields.get('publisher')) if part)
+    volume = f"vol.~{fields['volume']}" if fields.get('volume') else ''
+    return [[emphasize(fields.get('title')), volume], [publisher, format_date(fields)]]
+
+
+def _incollection(fields):
+    booktitle = fields.get('booktitle')
+    publisher = ': '.join(part for part in (fields.get('address'), fields.get('publisher')) if part)
+    return [[quoted_title(fields), f"in {emphasize(booktitle)}" if booktitle else '',
+             format_pages(fields.get('pages')), publisher, format_date(fields)]]
+
+
+def _thesis(default_type):
+    def render(fields):
+        return [[emphasize(fields.get('title'))],
+                [fields.get('type') or default_type, fields.get('school', ''), fields.get('address', ''), format_date(fields)]]
+    return render
+
+
+def _techreport(fields):
+    report = fields.get('type') or 'tech. rep.'
+    if fields.get('number'):
+        report = f"{report} {fields['number']}"
+    return [[quoted_title(fields), report, fields.get('institution', ''), fields.get('address', ''), format_date(fields)]]
+
+
+def _misc(fields):
+    return [[quoted_title(fields), fields.get('howpublished', ''), format_date(fields)]]
+
+
+# Форматирование по типам записей; остальные типы выводятся как misc
+RENDERERS = {
+    'article': _article,
+    'inproceedings': _inproceedings,
+    'conference': _inproceedings,
+    'book': _book,
+    'incollection': _incollection,
+    'inbook': _incollection,
+    'phdthesis': _thesis('PhD thesis'),
+    'mastersthesis': _thesis("Master's thesis"),
+    'techreport': _techreport,
+    'misc': _misc,
+}
+
+
+def render_block(items):
+    """Собирает блок через запятые с учетом кавычек после названия."""
+    items = [item if isinstance(item, tuple) else (item, False) for item in items if item]
+    if not items:
+        return ''
+    text = ''
+    for index, (item, quoted) in enumerate(items):
+        if index:
+            text += ",'' " if items[index - 1][1] else ', '
+        text += item
+    return text + (".''" if items[-1][1] else '.')
+
+
+def format_entry(entry):
+    """Текст \\bibitem записи в стиле ieeetr."""
+    # Как и bibtex, схлопываем пробельные символы внутри значений
+    fields = {name: ' '.join(value.split()) for name, value in entry['fields'].items() if value.strip()}
+    blocks = RENDERERS.get(entry['type'], _misc)(fields)
+    if fields.get('author'):
+        blocks[0].insert(0, format_names(fields['author']))
+    if fields.get('note'):
+        blocks.append([fields['note']])
+    rendered = [render_block(block) for block in blocks]
+    return f"\\bibitem{{{entry['key']}}}\n" + '\n\\newblock '.join(block for block in rendered if block)
+
+
+def purify(text):
+    """Текст для сортировки: без скобок и команд LaTeX, в нижнем регистре."""
+    return re.sub(r'[{}\\]', '', text).lower()
+
+
+def sort_key(entry):
+    """Ключ сортировки: год, фамилия первого автора, название."""
+    fields = entry['fields']
+    year_match = YEAR_RE.search(fields.get('year', ''))
+    authors = split_top_level(fields.get('author', ''), re.compile(r'\s+and\s+', re.IGNORECASE))
+    surname = parse_name(authors[0])[2] if authors else ''
+    return int(year_match.group(0)) if year_match else 0, purify(surname), purify(fields.get('title', ''))
+
+
+def entry_hash(text):
+    """Хеш исходного текста записи вместе с версией стиля."""
+    return hashlib.sha256(f"{STYLE_VERSION}\n{text}".encode('utf-8')).hexdigest()
+
+
+def load_cache(cache_file):
+    """Загружает кэш отформатированных записей."""
+    if cache_file and Path(cache_file).exists():
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def generate_bbl(bib_file, output_file, latex_file=None, cache_file=None, newest_first=False):
+    """
+    Пишет .bbl для записей bib файла.
+
+    Если задан latex_file, включаются только процитированные в нем ключи
+    (\\nocite{*} — все записи). Возвращает статистику: число записей и число
+    записей, отформатированных заново.
+    """
+    text = read_bibtex_file(bib_file)
+    entries = []
+    seen = set()
+    for entry in parse_bibtex_text(text):
+        # Как и bibtex, при повторе ключа используем первую запись
+        if entry['key'] not in seen:
+            seen.add(entry['key'])
+            entries.append(entry)
+
+    if latex_file:
+        with open(latex_file, 'r', encoding='utf-8') as f:
+            cited = cited_keys(f.read())
+        if '*' not in cited:
+            entries = [entry for entry in entries if entry['key'] in cited]
+
+    entries.sort(key=sort_key)
+    if newest_first:
+        # Устойчивая сортировка: внутри года порядок по авторам сохраняется
+        entries.sort(key=lambda entry: sort_key(entry)[0], reverse=True)
+
+    cache = load_cache(cache_file)
+    new_cache = {}
+    rendered = 0
+    items = []
+    for entry in entries:
+        start, end = entry['span']
+        digest = entry_hash(text[start:end])
+        if digest not in cache:
+            cache[digest] = format_entry(entry)
+            rendered += 1
+        new_cache[digest] = cache[digest]
+        items.append(new_cache[digest])
+
+    widest_label = '1' + '0' * (len(str(len(entries))) - 1)
+    content = f"\\begin{{thebibliography}}{{{widest_label}}}\n\n" + '\n\n'.join(items) + "\n\n\\end{thebibliography}\n"
+
+    output_path = Path(output_file)
+    if not output_path.exists() or output_path.read_text(encoding='utf-8') != content:
+        output_path.write_text(content, encoding='utf-8')
+
+    if cache_file:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(new_cache, f, ensure_ascii=False)
+
+    return {'entries': len(entries), 'rendered': rendered}
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Generate an ieeetr-style .bbl file directly from a BibTeX file')
+    parser.add_argument('bib_file', help='Input BibTeX file')
+    parser.add_argument('--tex', help='LaTeX file: include only keys cited there and write <tex>.bbl by default')
+    parser.add_argument('--output', '-o', help='Output .bbl file')
+    parser.add_argument('--cache', help='Per-entry render cache (default: <output>.cache.json)')
+    parser.add_argument('--newest-first', action='store_true', help='Sort by year descending')
+
+    args = parser.parse_args()
+
+    for filename in filter(None, (args.bib_file, args.tex)):
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+
+    output_file = args.output or (str(Path(args.tex).with_suffix('.bbl')) if args.tex else str(Path(args.bib_file).with_suffix('.bbl')))
+    cache_file = args.cache or f"{output_file}.cache.json"
+
+    stats = generate_bbl(args.bib_file, output_file, args.tex, cache_file, args.newest_first)
+
+    print(f"Записей в списке литературы: {stats['entries']}")
+    print(f"Отформатировано заново: {stats['rendered']}")
+    print(f"Файл сохранен как: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
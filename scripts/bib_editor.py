@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Редактор bib файлов с сохранением форматирования.
+
+Вместо перезаписи всего файла из преобразованной регулярными выражениями
+строки редактор использует позиции записей и полей, найденные парсером,
+и строит минимальный план вставок (splice plan): список замен
+``(start, end, replacement)``. Неизмененные участки файла копируются как
+есть, поэтому исходные отступы и пустые строки сохраняются, а diff
+версионируемого bib файла остается минимальным.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from bib_parser import parse_bibtex_text, read_bibtex_file
+
+
+def load_document(filename):
+    """Загружает bib файл: текст, записи и индекс записей по ключу."""
+    # newline='' сохраняет исходные переводы строк, включая CRLF
+    with open(filename, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    return build_document(text)
+
+
+def build_document(text):
+    """Строит документ из текста bib файла."""
+    entries = parse_bibtex_text(text)
+    index = {}
+    for entry in entries:
+        index.setdefault(entry['key'], []).append(entry)
+    return {'text': text, 'entries': entries, 'index': index}
+
+
+def _get_entry(document, key):
+    """Возвращает первую запись с ключом key."""
+    if key not in document['index']:
+        raise KeyError(f"Запись {key} не найдена")
+    return document['index'][key][0]
+
+
+def rekey(document, old_key, new_key, entry=None):
+    """План замены ключа записи."""
+    entry = entry or _get_entry(document, old_key)
+    start, end = entry['key_span']
+    return [(start, end, new_key)]
+
+
+def field_source(document, entry, field):
+    """Исходный текст значения поля вместе с ограничителями ({...}, "..." или имя макроса)."""
+    start, end = entry['field_spans'][field.lower()]
+    return document['text'][start:end]
+
+
+def replace_field(document, key, field, value, entry=None, raw=False):
+    """
+    План замены значения поля.
+
+    Если поле есть в записи, заменяется только его значение (вместе со
+    скобками); иначе поле добавляется после последнего поля записи.
+    При raw=True значение вставляется как есть, уже с ограничителями.
+    """
+    entry = entry or _get_entry(document, key)
+    field = field.lower()
+    value = value if raw else f'{{{value}}}'
+    if field in entry['field_spans']:
+        start, end = entry['field_spans'][field]
+        return [(start, end, value)]
+
+    if entry['field_spans']:
+        insert_at = max(end for _, end in entry['field_spans'].values())
+    else:
+        insert_at = entry['key_span'][1]
+    return [(insert_at, insert_at, f',\n  {field} = {value}')]
+
+
+def delete_field(document, key, field, entry=None):
+    """
+    План удаления поля вместе с запятой перед ним.
+
+    Удаляется участок от разделителя после предыдущего поля (или ключа) до
+    конца значения, поэтому запятая после удаленного поля остается
+    разделителем для следующего.
+    """
+    entry = entry or _get_entry(document, key)
+    field = field.lower()
+    if field not in entry['field_spans']:
+        return []
+    value_start, value_end = entry['field_spans'][field]
+    start = document['text'].rfind(',', entry['key_span'][1], value_start)
+    if start < 0:
+        start = entry['key_span'][1]
+    return [(start, value_end, '')]
+
+
+def delete_entry(document, key, entry=None):
+    """План удаления записи вместе с пробельными символами после нее."""
+    entry = entry or _get_entry(document, key)
+    text = document['text']
+    start, end = entry['span']
+    # Поглощаем пустые строки за записью, чтобы не накапливать разрывы
+    while end < len(text) and text[end] in ' \t\r\n':
+        end += 1
+    return [(start, end, '')]
+
+
+def insert_entry(document, entry_text, after_key=None):
+    """План вставки новой записи после записи after_key (или в конец файла)."""
+    text = document['text']
+    if after_key is None:
+        position = len(text)
+        prefix = '' if not text or text.endswith('\n\n') else ('\n' if text.endswith('\n') else '\n\n')
+        return [(position, position, f'{prefix}{entry_text.strip()}\n')]
+
+    position = _get_entry(document, after_key)['span'][1]
+    return [(position, position, f'\n\n{entry_text.strip()}')]
+
+
+def normalize_plan(splices):
+    """Сортирует план и проверяет, что замены не пересекаются."""
+    plan = sorted(splices, key=lambda splice: (splice[0], splice[1]))
+    for previous, current in zip(plan, plan[1:]):
+        if current[0] < previous[1]:
+            raise ValueError(f"Пересекающиеся замены: {previous[:2]} и {current[:2]}")
+    return plan
+
+
+def iter_spliced(text, splices):
+    """Генерирует куски итогового текста: неизмененные участки и замены."""
+    position = 0
+    for start, end, replacement in normalize_plan(splices):
+        if start > position:
+            yield text[position:start]
+        if replacement:
+            yield replacement
+        position = end
+    if position < len(text):
+        yield text[position:]
+
+
+def apply_splices(text, splices):
+    """Применяет план замен к тексту."""
+    return ''.join(iter_spliced(text, splices))
+
+
+def write_spliced(document, splices, output_file):
+    """Записывает документ с примененным планом, копируя неизмененные участки."""
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        for chunk in iter_spliced(document['text'], splices):
+            f.write(chunk)
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Edit a BibTeX file in place, preserving formatting')
+    parser.add_argument('input', help='Input BibTeX file')
+    parser.add_argument('output', help='Output BibTeX file')
+    parser.add_argument('--rekey', nargs=2, action='append', default=[], metavar=('OLD', 'NEW'), help='Rename entry key')
+    parser.add_argument('--set', nargs=3, action='append', default=[], metavar=('KEY', 'FIELD', 'VALUE'), help='Replace or add field value')
+    parser.add_argument('--delete', action='append', default=[], metavar='KEY', help='Delete entry')
+    parser.add_argument('--insert', action='append', default=[], metavar='FILE', help='Append entries from a BibTeX file')
+
+    args = parser.parse_args()
+
+    if not Path(args.input).exists():
+        print(f"Ошибка: файл {args.input} не найден")
+        sys.exit(1)
+
+    document = load_document(args.input)
+
+    splices = []
+    try:
+        for old_key, new_key in args.rekey:
+            splices += rekey(document, old_key, new_key)
+        for key, field, value in args.set:
+            splices += replace_field(document, key, field, value)
+        for key in args.delete:
+            splices += delete_entry(document, key)
+        for filename in args.insert:
+            splices += insert_entry(document, read_bibtex_file(filename))
+        write_spliced(document, splices, args.output)
+    except (KeyError, ValueError) as e:
+        print(f"Ошибка: {e.args[0]}")
+        sys.exit(1)
+
+    print(f"Применено замен: {len(splices)}")
+    print(f"Файл сохранен как: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Разбор имен BibTeX и таблица транслитерации.
+
+Общие функции для модулей, которым нужны части имени (bbl_generator,
+author_identity) и транслитерация кириллицы (fix_bib_encoding,
+author_identity): parse_name делит имя на части (first, von, last, jr)
+по правилам BibTeX с учетом фигурных скобок, load_transliteration
+загружает таблицу транслитерации из russian_rules.json. Модуль не
+зависит от остальных скриптов, поэтому его импорт не тянет за собой
+генерацию .bbl или исправление bib файлов.
+"""
+
+import argparse
+import json
+import re
+from pathlib import Path
+
+
+# Правила транслитерации и перевода рядом со скриптом
+DEFAULT_RULES_FILE = Path(__file__).with_name('russian_rules.json')
+
+
+def split_top_level(text, separator_re):
+    """Разбивает строку по разделителю вне фигурных скобок."""
+    parts = []
+    depth = 0
+    start = 0
+    position = 0
+    while position < len(text):
+        char = text[position]
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth = max(depth - 1, 0)
+        elif depth == 0:
+            match = separator_re.match(text, position)
+            if match and match.end() > position:
+                parts.append(text[start:position])
+                start = position = match.end()
+                continue
+        position += 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def parse_name(name):
+    """Разбирает имя BibTeX на части (first, von, last, jr)."""
+    parts = split_top_level(name, re.compile(r','))
+    if len(parts) >= 3:
+        last, jr, first = parts[0], parts[1], ', '.join(parts[2:])
+    elif len(parts) == 2:
+        last, jr, first = parts[0], '', parts[1]
+    else:
+        tokens = split_top_level(name, re.compile(r'\s+'))
+        if len(tokens) < 2:
+            return '', '', name.strip(), ''
+        # Частица von: слова со строчной буквы перед фамилией
+        von_start = next((i for i, token in enumerate(tokens[:-1]) if token[:1].islower()), None)
+        if von_start is None:
+            return ' '.join(tokens[:-1]), '', tokens[-1], ''
+        von_end = von_start
+        while von_end < len(tokens) - 1 and tokens[von_end][:1].islower():
+            von_end += 1
+        return ' '.join(tokens[:von_start]), ' '.join(tokens[von_start:von_end]), ' '.join(tokens[von_end:]), ''
+
+    tokens = split_top_level(last, re.compile(r'\s+'))
+    von = []
+    while len(tokens) > 1 and tokens[0][:1].islower():
+        von.append(tokens.pop(0))
+    return first, ' '.join(von), ' '.join(tokens), jr
+
+
+def build_transliteration(table):
+    """Таблица транслитерации: к строчным буквам добавляются заглавные варианты."""
+    transliteration = {}
+    for letter, replacement in table.items():
+        transliteration[letter] = replacement
+        transliteration.setdefault(letter.upper(), replacement.capitalize())
+    return transliteration
+
+
+def load_transliteration(rules_file=DEFAULT_RULES_FILE):
+    """Загружает таблицу транслитерации из файла правил."""
+    with open(rules_file, 'r', encoding='utf-8') as f:
+        return build_transliteration(json.load(f).get('transliteration', {}))
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Split BibTeX names into first, von, last and jr parts')
+    parser.add_argument('names', nargs='+', help='Names to parse')
+
+    args = parser.parse_args()
+
+    for name in args.names:
+        first, von, last, jr = parse_name(name)
+        print(f"{name}: first={first!r}, von={von!r}, last={last!r}, jr={jr!r}")
+
+
+if __name__ == "__main__":
+    main()
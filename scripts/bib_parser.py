@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Разбор BibTeX файлов с поддержкой параллельного режима.
+
+Последовательный разбор учитывает вложенные фигурные скобки, поэтому
+корректно читает значения полей вида ``{{IEEE} Access}``. Для больших и
+множественных библиографий текст делится на шарды по безопасным границам
+записей (``\\n@`` на нулевой глубине скобок), шарды разбираются в пуле
+процессов, а результаты собираются в исходном порядке. Результат
+параллельного разбора совпадает с последовательным.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+# Служебные записи, которые не являются публикациями
+SPECIAL_ENTRY_TYPES = {'comment', 'preamble', 'string'}
+
+# Размер шарда по умолчанию (в символах)
+DEFAULT_SHARD_SIZE = 1 << 20
+
+# Сколько порций без безопасной границы читать, прежде чем отдать остаток файла одним блоком
+MAX_BLOCK_CHUNKS = 16
+
+ENTRY_HEAD_RE = re.compile(r'@\s*(\w+)\s*([{(])')
+KEY_RE = re.compile(r'\s*([^,\s}]*)\s*,?')
+FIELD_NAME_RE = re.compile(r'\s*([\w\-:.+]+)\s*=\s*')
+BARE_VALUE_RE = re.compile(r'[^\s,#})]+')
+SEPARATOR_RE = re.compile(r'\s*(#|,)?\s*')
+
+
+def _match_brace(text, pos, end):
+    """Возвращает позицию закрывающей скобки для '{' в позиции pos или -1."""
+    depth = 0
+    i = pos
+    while i < end:
+        next_open = text.find('{', i, end)
+        next_close = text.find('}', i, end)
+        if next_close < 0:
+            return -1
+        if 0 <= next_open < next_close:
+            depth += 1
+            i = next_open + 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return next_close
+            i = next_close + 1
+    return -1
+
+
+def _match_quote(text, pos, end):
+    """Возвращает позицию закрывающей кавычки (кавычки внутри {} не считаются)."""
+    depth = 0
+    for i in range(pos + 1, end):
+        char = text[i]
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+        elif char == '"' and depth == 0:
+            return i
+    return -1
+
+
+def _match_paren(text, pos, end):
+    """Возвращает позицию ')', закрывающей запись с '(' в позиции pos, или -1 (скобки внутри {} и "" не считаются)."""
+    depth = 0
+    quoted = False
+    for i in range(pos + 1, end):
+        char = text[i]
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+        elif depth == 0 and char == '"':
+            quoted = not quoted
+        elif depth == 0 and not quoted and char == ')':
+            return i
+    return -1
+
+
+def _parse_value(text, pos, end):
+    """Разбирает значение поля (с конкатенацией через #), возвращает (значение, позиция)."""
+    parts = []
+    while pos < end:
+        char = text[pos]
+        if char == '{':
+            close = _match_brace(text, pos, end)
+            if close < 0:
+                return None, end
+            parts.append(text[pos + 1:close])
+            pos = close + 1
+        elif char == '"':
+            close = _match_quote(text, pos, end)
+            if close < 0:
+                return None, end
+            parts.append(text[pos + 1:close])
+            pos = close + 1
+        else:
+            bare = BARE_VALUE_RE.match(text, pos, end)
+            if not bare:
+                break
+            parts.append(bare.group(0))
+            pos = bare.end()
+
+        separator = SEPARATOR_RE.match(text, pos, end)
+        pos = separator.end()
+        if separator.group(1) != '#':
+            break
+
+    return ''.join(parts).strip(), pos
+
+
+def _parse_fields(text, pos, end):
+    """
+    Разбирает поля записи между pos и end.
+
+    Возвращает словарь полей и словарь позиций их значений: для каждого поля
+    хранится диапазон [start, end) значения вместе с ограничителями.
+    """
+    fields = {}
+    field_spans = {}
+    while pos < end:
+        name_match = FIELD_NAME_RE.match(text, pos, end)
+        if not name_match:
+            break
+        value_start = name_match.end()
+        value, pos = _parse_value(text, value_start, end)
+        if value is None:
+            break
+        name = name_match.group(1).lower()
+        # Как и BibTeX, при повторе поля оставляем первое значение
+        if name not in fields:
+            fields[name] = value
+            value_end = text[value_start:pos].rstrip().rstrip(',').rstrip()
+            field_spans[name] = (value_start, value_start + len(value_end))
+    return fields, field_spans
+
+
+def parse_bibtex_text(text, start=0, end=None, special_blocks=None):
+    """
+    Последовательно разбирает записи BibTeX в диапазоне [start, end).
+
+    Каждая запись возвращается словарем с ключами ``type``, ``key``,
+    ``fields`` и ``span`` (абсолютные смещения начала и конца записи в тексте),
+    а также ``key_span`` и ``field_spans`` с позициями ключа и значений полей.
+    Если передан список special_blocks, в него добавляются тексты служебных
+    записей (@string, @preamble, @comment).
+    """
+    if end is None:
+        end = len(text)
+
+    entries = []
+    pos = start
+    while True:
+        at = text.find('@', pos, end)
+        if at < 0:
+            break
+
+        head = ENTRY_HEAD_RE.match(text, at, end)
+        if not head:
+            pos = at + 1
+            continue
+
+        entry_type = head.group(1).lower()
+        body_start = head.end()
+        if head.group(2) == '{':
+            close = _match_brace(text, head.end() - 1, end)
+        else:
+            close = _match_paren(text, head.end() - 1, end)
+        if close < 0:
+            # Незакрытая запись: пропускаем символ '@' и ищем дальше
+            pos = at + 1
+            continue
+
+        if entry_type not in SPECIAL_ENTRY_TYPES:
+            key_match = KEY_RE.match(text, body_start, close)
+            fields, field_spans = _parse_fields(text, key_match.end(), close)
+            entries.append({
+                'type': entry_type,
+                'key': key_match.group(1),
+                'fields': fields,
+                'span': (at, close + 1),
+                'key_span': key_match.span(1),
+                'field_spans': field_spans,
+            })
+        elif special_blocks is not None:
+            special_blocks.append(text[at:close + 1])
+        pos = close + 1
+
+    return entries
+
+
+def find_safe_boundaries(text):
+    """
+    Находит безопасные границы записей: позиции '@' после перевода строки,
+    перед которыми баланс фигурных скобок равен нулю.
+    """
+    boundaries = []
+    depth = 0
+    last = 0
+    pos = text.find('\n@')
+    while pos >= 0:
+        depth += text.count('{', last, pos) - text.count('}', last, pos)
+        if depth < 0:
+            # Лишняя закрывающая скобка: дальше границам доверять нельзя
+            break
+        if depth == 0:
+            boundaries.append(pos + 1)
+        last = pos
+        pos = text.find('\n@', pos + 1)
+    return boundaries
+
+
+def split_into_shards(text, shard_size=DEFAULT_SHARD_SIZE):
+    """Делит текст на диапазоны [start, end) размером около shard_size по безопасным границам."""
+    shards = []
+    start = 0
+    for boundary in find_safe_boundaries(text):
+        if boundary - start >= shard_size:
+            shards.append((start, boundary))
+            start = boundary
+    shards.append((start, len(text)))
+    return shards
+
+
+def iter_bibtex_blocks(f, chunk_size=DEFAULT_SHARD_SIZE):
+    """
+    Читает открытый файл порциями и выдает блоки текста, которые
+    заканчиваются на безопасных границах записей.
+
+    В памяти одновременно находится не больше одной порции и одной
+    незавершенной записи, поэтому файл любого размера читается потоково.
+    Если за MAX_BLOCK_CHUNKS порций граница не найдена (например, из-за
+    лишней скобки), остаток файла выдается одним блоком с предупреждением.
+    """
+    buffer = ''
+    for chunk in iter(lambda: f.read(chunk_size), ''):
+        buffer += chunk
+        boundaries = find_safe_boundaries(buffer)
+        if boundaries:
+            yield buffer[:boundaries[-1]]
+            buffer = buffer[boundaries[-1]:]
+        elif len(buffer) >= MAX_BLOCK_CHUNKS * chunk_size:
+            print(f"Внимание: в {getattr(f, 'name', 'файле')} нет границы записи на нулевой глубине скобок "
+                  f"(непарная скобка?), остаток файла читается одним блоком")
+            buffer += f.read()
+            break
+    if buffer:
+        yield buffer
+
+
+def shift_entry_spans(entry, offset):
+    """Сдвигает все позиции записи на offset символов."""
+    entry['span'] = tuple(p + offset for p in entry['span'])
+    entry['key_span'] = tuple(p + offset for p in entry['key_span'])
+    entry['field_spans'] = {
+        name: (start + offset, end + offset)
+        for name, (start, end) in entry['field_spans'].items()
+    }
+
+
+def _parse_shard(task):
+    """Разбирает один шард в процессе-обработчике."""
+    shard_text, offset = task
+    entries = parse_bibtex_text(shard_text)
+    if offset:
+        for entry in entries:
+            shift_entry_spans(entry, offset)
+    return entries
+
+
+def read_bibtex_file(filename):
+    """Читает BibTeX файл в UTF-8."""
+    with open(filename, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def parse_bibtex_files(filenames, workers=None, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Разбирает несколько BibTeX файлов параллельно.
+
+    Все файлы делятся на шарды, шарды разбираются в общем пуле процессов.
+    Возвращает список списков записей в порядке входных файлов.
+    """
+    tasks = []
+    owners = []
+    for index, filename in enumerate(filenames):
+        text = read_bibtex_file(filename)
+        for start, end in split_into_shards(text, shard_size):
+            tasks.append((text[start:end], start))
+            owners.append(index)
+
+    results = [[] for _ in filenames]
+    if workers == 1 or len(tasks) <= 1:
+        shard_results = map(_parse_shard, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        with executor:
+            # map сохраняет порядок задач, поэтому вывод детерминирован
+            shard_results = list(executor.map(_parse_shard, tasks))
+
+    for owner, entries in zip(owners, shard_results):
+        results[owner].extend(entries)
+    return results
+
+
+def parse_bibtex_file(filename, workers=None, shard_size=DEFAULT_SHARD_SIZE):
+    """Разбирает один BibTeX файл (параллельно, если он состоит из нескольких шардов)."""
+    return parse_bibtex_files([filename], workers, shard_size)[0]
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Parse BibTeX files (optionally in parallel)')
+    parser.add_argument('inputs', nargs='+', help='Input BibTeX files')
+    parser.add_argument('--output', '-o', help='Output JSON file with parsed entries')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count(), help='Number of worker processes')
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help='Approximate shard size in characters')
+    parser.add_argument('--serial', action='store_true', help='Parse without process pool')
+
+    args = parser.parse_args()
+
+    for filename in args.inputs:
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+
+    workers = 1 if args.serial else args.workers
+    results = parse_bibtex_files(args.inputs, workers, args.shard_size)
+
+    for filename, entries in zip(args.inputs, results):
+        print(f"{filename}: {len(entries)} записей")
+
+    if args.output:
+        data = {
+            filename: entries
+            for filename, entries in zip(args.inputs, results)
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"Результаты сохранены в файл: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
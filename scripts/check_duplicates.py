@@ -3,6 +3,8 @@ import re
 import json
 from collections import defaultdict
 
+from near_duplicates import find_near_duplicates
+
 def parse_bibtex(bibtex_file):
     """Парсит BibTeX файл и извлекает названия статей"""
     with open(bibtex_file, 'r', encoding='utf-8') as f:
@@ -54,6 +56,12 @@ def main():
     print(f"📊 Всего статей в файле: {len(articles)}")
     
     duplicates = find_duplicates(articles)
+    near_duplicates = find_near_duplicates(articles)
+    
+    if near_duplicates:
+        print(f"\n🔎 Найдено {len(near_duplicates)} кластеров похожих названий (MinHash/LSH):")
+        for i, cluster in enumerate(near_duplicates, 1):
+            print(f"   {i}. Сходство до {cluster['max_similarity']}: {', '.join(cluster['keys'])}")
     
     if not duplicates:
         print("✅ Дублирующихся названий не найдено!")
@@ -78,7 +86,8 @@ def main():
         'duplicates': {
             title: [{'key': a['key'], 'title': a['title']} for a in articles]
             for title, articles in duplicates.items()
-        }
+        },
+        'near_duplicates': near_duplicates
     }
     
     with open('duplicate_analysis.json', 'w', encoding='utf-8') as f:
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Расчет наукометрических показателей по числу цитирований статей.
+
+Числа цитирований один раз сортируются по убыванию (O(n log n)), после
+чего общее число цитирований, h-индекс и i10-индекс находятся двоичным
+поиском по отсортированным массивам (O(log n)):
+
+* i10 — число статей с не менее чем 10 цитированиями;
+* h — число статей i, для которых c[i] - (i + 1) >= 0; эта разность
+  строго убывает по i, поэтому ее тоже можно искать двоичным поиском.
+
+Оконные показатели считаются по статьям, опубликованным начиная с
+заданного года: отсортированные массивы строятся для окна один раз и
+кэшируются. Число цитирований берется из поля citations bib файла.
+"""
+
+import argparse
+import json
+import re
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from bib_parser import parse_bibtex_file
+
+
+# Порог i10-индекса
+I10_THRESHOLD = 10
+# Длина окна цитирований в годах, как в Google Scholar
+SINCE_WINDOW_YEARS = 5
+
+
+def default_since_year():
+    """Первый год окна цитирований: последние SINCE_WINDOW_YEARS лет."""
+    return date.today().year - SINCE_WINDOW_YEARS
+
+
+def parse_citations(value):
+    """Число цитирований из поля citations; пустое или нечисловое значение — 0."""
+    match = re.search(r'\d+', value or '')
+    return int(match.group(0)) if match else 0
+
+
+def _sorted_metrics(citations):
+    """Отсортированные массивы для запросов по набору статей."""
+    counts = np.sort(np.asarray(citations, dtype=np.int64))[::-1]
+    ranks = np.arange(1, len(counts) + 1, dtype=np.int64)
+    return {
+        # По возрастанию, для np.searchsorted
+        'negative_counts': -counts,
+        'negative_slack': ranks - counts,
+        'total': int(counts.sum()),
+        'papers': len(counts),
+    }
+
+
+def build_metrics_engine(citations, years):
+    """
+    Строит движок показателей.
+
+    citations и years — числа цитирований и годы публикации статей (0,
+    если год неизвестен).
+    """
+    citations = np.asarray(citations, dtype=np.int64)
+    years = np.asarray(years, dtype=np.int64)
+    return {
+        'citations': citations,
+        'years': years,
+        'all': _sorted_metrics(citations),
+        'windows': {},
+    }
+
+
+def query_metrics(sorted_metrics, threshold=I10_THRESHOLD):
+    """Показатели по отсортированным массивам за O(log n)."""
+    return {
+        'papers': sorted_metrics['papers'],
+        'citations': sorted_metrics['total'],
+        'h_index': int(np.searchsorted(sorted_metrics['negative_slack'], 0, side='right')),
+        'i10_index': int(np.searchsorted(sorted_metrics['negative_counts'], -threshold, side='right')),
+    }
+
+
+def metrics(engine, since_year=None):
+    """Показатели по всем статьям или по статьям, опубликованным с since_year."""
+    if since_year is None:
+        return query_metrics(engine['all'])
+    if since_year not in engine['windows']:
+        mask = engine['years'] >= since_year
+        engine['windows'][since_year] = _sorted_metrics(engine['citations'][mask])
+    return query_metrics(engine['windows'][since_year])
+
+
+def citation_report(citations, years, since_year):
+    """Показатели за все время и за окно с since_year."""
+    engine = build_metrics_engine(citations, years)
+    return {
+        'since_year': since_year,
+        'all': metrics(engine),
+        'since': metrics(engine, since_year),
+    }
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Compute citation metrics from the citations field of a BibTeX file')
+    parser.add_argument('bib_file', help='BibTeX file')
+    parser.add_argument('--since', type=int, default=default_since_year(),
+                        help='First publication year of the window (default: last five years)')
+
+    args = parser.parse_args()
+
+    if not Path(args.bib_file).exists():
+        print(f"Ошибка: файл {args.bib_file} не найден")
+        sys.exit(1)
+
+    entries = parse_bibtex_file(args.bib_file)
+    citations = [parse_citations(entry['fields'].get('citations')) for entry in entries]
+    years = [int(year) if year.isdigit() else 0 for year in (entry['fields'].get('year', '').strip() for entry in entries)]
+
+    report = citation_report(citations, years, args.since)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
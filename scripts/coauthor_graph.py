@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Граф соавторства по bib файлу.
+
+Имена авторов за один проход по публикациям заменяются целыми
+идентификаторами, а каждая пара соавторов статьи дает ребро с годом
+публикации. Ребра собираются в разреженную симметричную матрицу
+смежности scipy.sparse, вес ребра — число совместных статей. Степень
+(число соавторов), взвешенная степень, компоненты связности,
+центральность и срезы по годам считаются операциями над разреженными
+матрицами, поэтому граф масштабируется до публикаций всего
+подразделения.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from analyze_publications import parse_bibtex_file
+from author_identity import default_resolver, resolve
+
+
+# Год для публикаций без года; такие ребра не попадают в срезы по годам
+NO_YEAR = 0
+
+
+def normalize_author(name):
+    """Имя в нижнем регистре с одиночными пробелами."""
+    return ' '.join(name.lower().split())
+
+
+def resolved_author_key(name):
+    """Ключ автора: идентификатор резолвера author_identity."""
+    return resolve(default_resolver(), name)
+
+
+def build_graph(publications, author_key=resolved_author_key):
+    """
+    Строит граф соавторства за один проход.
+
+    author_key переводит имя автора в ключ, по которому авторы
+    отождествляются (по умолчанию — резолвер author_identity, поэтому
+    "P. V. Osinenko" и "Pavel Osinenko" — один автор). Возвращает
+    словарь с именами авторов (первое встретившееся написание), числом
+    статей каждого автора и числом его статей с соавторами, массивами ребер (rows, cols, years; каждое
+    ребро в обоих направлениях) и взвешенной матрицей смежности CSR.
+    """
+    index = {}
+    names = []
+    papers = []
+    joint_papers = []
+    rows, cols, years = [], [], []
+
+    for publication in publications:
+        year = int(publication['year']) if publication['year'].isdigit() else NO_YEAR
+        members = []
+        for author in publication['authors']:
+            key = author_key(author)
+            if key is None or key == '':
+                continue
+            if key not in index:
+                index[key] = len(names)
+                names.append(author)
+                papers.append(0)
+                joint_papers.append(0)
+            author_id = index[key]
+            if author_id not in members:
+                members.append(author_id)
+
+        for position, author_id in enumerate(members):
+            papers[author_id] += 1
+            if len(members) > 1:
+                joint_papers[author_id] += 1
+            for other_id in members[position + 1:]:
+                rows += [author_id, other_id]
+                cols += [other_id, author_id]
+                years += [year, year]
+
+    graph = {
+        'names': names,
+        'index': index,
+        'papers': np.array(papers, dtype=np.int64),
+        'joint_papers': np.array(joint_papers, dtype=np.int64),
+        'rows': np.array(rows, dtype=np.int64),
+        'cols': np.array(cols, dtype=np.int64),
+        'years': np.array(years, dtype=np.int64),
+    }
+    graph['adjacency'] = edges_to_matrix(graph, np.ones(len(rows), dtype=bool))
+    return graph
+
+
+def edges_to_matrix(graph, mask):
+    """Матрица смежности CSR по ребрам из маски; повторные ребра суммируются в вес."""
+    size = len(graph['names'])
+    data = np.ones(int(mask.sum()), dtype=np.int64)
+    matrix = sparse.coo_matrix((data, (graph['rows'][mask], graph['cols'][mask])), shape=(size, size))
+    return matrix.tocsr()
+
+
+def year_slice(graph, first_year=None, last_year=None):
+    """Матрица смежности по статьям, опубликованным в [first_year, last_year]."""
+    mask = graph['years'] != NO_YEAR
+    if first_year is not None:
+        mask &= graph['years'] >= first_year
+    if last_year is not None:
+        mask &= graph['years'] <= last_year
+    return edges_to_matrix(graph, mask)
+
+
+def degrees(adjacency):
+    """Число соавторов каждого автора: ненулевые элементы строк CSR."""
+    return np.diff(adjacency.indptr)
+
+
+def weighted_degrees(adjacency):
+    """
+    Сумма весов по строкам: число пар (статья, соавтор).
+
+    Статья с k соавторами автора учитывается k раз, поэтому это вес
+    сотрудничества, а не число совместных статей.
+    """
+    return np.asarray(adjacency.sum(axis=1)).ravel()
+
+
+def components(adjacency):
+    """Компоненты связности: (метки авторов, размеры компонент)."""
+    _, labels = connected_components(adjacency, directed=False)
+    return labels, np.bincount(labels)
+
+
+def eigenvector_centrality(adjacency, iterations=200, tolerance=1e-10):
+    """
+    Центральность по собственному вектору степенным методом.
+
+    Итерация x <- (A + I) x сходится и на двудольных графах; вектор
+    нормируется на максимум, поэтому самый центральный автор получает 1.
+    """
+    size = adjacency.shape[0]
+    if size == 0:
+        return np.zeros(0)
+    matrix = adjacency.astype(np.float64)
+    x = np.ones(size)
+    for _ in range(iterations):
+        y = matrix @ x + x
+        y /= y.max()
+        if np.abs(y - x).max() < tolerance:
+            return y
+        x = y
+    return x
+
+
+def find_author(graph, query):
+    """Идентификатор автора, чье имя содержит query (самый публикуемый), или None."""
+    query = normalize_author(query)
+    candidates = [author_id for author_id, name in enumerate(graph['names']) if query in normalize_author(name)]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda author_id: graph['papers'][author_id])
+
+
+def first_collaboration_years(graph, author_id):
+    """Год первой совместной статьи с каждым соавтором: {идентификатор: год}."""
+    mask = (graph['rows'] == author_id) & (graph['years'] != NO_YEAR)
+    partners, years = graph['cols'][mask], graph['years'][mask]
+    first = np.full(len(graph['names']), np.iinfo(np.int64).max)
+    np.minimum.at(first, partners, years)
+    found = np.flatnonzero(first != np.iinfo(np.int64).max)
+    return {int(partner): int(first[partner]) for partner in found}
+
+
+def collaborator_report(graph, author_id, top=10):
+    """Отчет о соавторах: число, основные соавторы, рост по годам и место в сети."""
+    adjacency = graph['adjacency']
+    names = graph['names']
+    row = adjacency.getrow(author_id)
+    order = np.lexsort((row.indices, -row.data))[:top]
+
+    # Рост сети: новые и все соавторы по годам
+    first_years = first_collaboration_years(graph, author_id)
+    active_years = sorted(set(first_years.values()))
+    by_year = {}
+    total = 0
+    for year in active_years:
+        new = sum(1 for first_year in first_years.values() if first_year == year)
+        total += new
+        by_year[year] = {
+            'collaborators': int(degrees(year_slice(graph, year, year))[author_id]),
+            'new_collaborators': new,
+            'cumulative_collaborators': total,
+        }
+
+    labels, sizes = components(adjacency)
+    centrality = eigenvector_centrality(adjacency)
+    degree = degrees(adjacency)
+    size = len(names)
+    return {
+        'author': names[author_id],
+        'papers': int(graph['papers'][author_id]),
+        'collaborators': int(degree[author_id]),
+        'joint_papers': int(graph['joint_papers'][author_id]),
+        'collaboration_weight': int(weighted_degrees(adjacency)[author_id]),
+        'top_coauthors': {names[row.indices[i]]: int(row.data[i]) for i in order},
+        'by_year': by_year,
+        'network': {
+            'authors': size,
+            'collaborations': int(adjacency.nnz // 2),
+            'components': len(sizes),
+            'component_size': int(sizes[labels[author_id]]),
+            'degree_centrality': round(float(degree[author_id]) / (size - 1), 4) if size > 1 else 0.0,
+            'eigenvector_centrality': round(float(centrality[author_id]), 4),
+            'eigenvector_rank': int((centrality > centrality[author_id]).sum()) + 1,
+        },
+    }
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Build a co-authorship graph and a collaborator report from a BibTeX file')
+    parser.add_argument('bib_file', help='BibTeX file')
+    parser.add_argument('--author', '-a', default='osinenko', help='Researcher name or its part')
+    parser.add_argument('--top', type=int, default=10, help='Number of top co-authors')
+    parser.add_argument('--output', '-o', default='coauthor_report.json', help='Output JSON report')
+
+    args = parser.parse_args()
+
+    if not Path(args.bib_file).exists():
+        print(f"Ошибка: файл {args.bib_file} не найден")
+        sys.exit(1)
+
+    graph = build_graph(parse_bibtex_file(args.bib_file))
+    print(f"Авторов: {len(graph['names'])}, пар соавторов: {graph['adjacency'].nnz // 2}")
+
+    author_id = find_author(graph, args.author)
+    if author_id is None:
+        print(f"Ошибка: автор {args.author} не найден")
+        sys.exit(1)
+
+    report = collaborator_report(graph, author_id, args.top)
+    print(f"Автор: {report['author']}")
+    print(f"Статей: {report['papers']} (с соавторами: {report['joint_papers']}), соавторов: {report['collaborators']}")
+
+    print("\n=== TOP CO-AUTHORS ===")
+    for name, count in report['top_coauthors'].items():
+        print(f"{name}: {count} joint papers")
+
+    print("\n=== COLLABORATORS BY YEAR ===")
+    for year, counts in report['by_year'].items():
+        print(f"{year}: {counts['collaborators']} active, {counts['new_collaborators']} new, {counts['cumulative_collaborators']} total")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\nОтчет сохранен как: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
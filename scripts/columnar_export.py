@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Колоночный экспорт разобранных публикаций для быстрой аналитики.
+
+Превращает список записей BibTeX в набор массивов NumPy: год хранится в
+int16, журнал, издатель и тип записи кодируются словарем в целые коды,
+списки авторов хранятся как массив смещений плюс массив кодов авторов.
+Массивы сохраняются в .npz (и, при наличии pyarrow, в Arrow/Feather), а
+агрегаты вроде количества публикаций по годам и журналам считаются
+векторными операциями.
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from bib_parser import parse_bibtex_files
+from latex_codec import unescape_fields
+
+
+# Значение для отсутствующего года или кода
+MISSING = -1
+
+# Поля, кодируемые словарем
+DICTIONARY_COLUMNS = ('journal', 'publisher', 'type')
+
+AUTHOR_SPLIT_RE = re.compile(r'\s+and\s+', re.IGNORECASE)
+YEAR_RE = re.compile(r'\d{4}')
+
+
+def split_authors(author_field):
+    """Разбивает поле author на список авторов."""
+    if not author_field:
+        return []
+    return [author.strip() for author in AUTHOR_SPLIT_RE.split(author_field) if author.strip()]
+
+
+def parse_year(year_field):
+    """Извлекает год из поля year или возвращает MISSING."""
+    year_match = YEAR_RE.search(year_field or '')
+    return int(year_match.group(0)) if year_match else MISSING
+
+
+def dictionary_encode(values):
+    """Кодирует значения словарем: возвращает (коды int32, массив словаря)."""
+    index = {}
+    codes = np.fromiter(
+        (index.setdefault(value, len(index)) if value else MISSING for value in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return codes, np.array(list(index), dtype=str)
+
+
+def build_columns(entries):
+    """Строит колоночное представление списка записей."""
+    fields = [unescape_fields(entry) for entry in entries]
+
+    columns = {
+        'key': np.array([entry['key'] for entry in entries], dtype=str),
+        'year': np.array([parse_year(f.get('year')) for f in fields], dtype=np.int16),
+    }
+
+    for name in DICTIONARY_COLUMNS:
+        if name == 'type':
+            values = [entry['type'] for entry in entries]
+        else:
+            values = [f.get(name, '').strip() for f in fields]
+        columns[f'{name}_codes'], columns[f'{name}_dict'] = dictionary_encode(values)
+
+    # Авторы: смещения [offsets[i], offsets[i+1]) указывают на коды авторов записи i
+    author_lists = [split_authors(f.get('author')) for f in fields]
+    offsets = np.zeros(len(entries) + 1, dtype=np.int64)
+    np.cumsum([len(authors) for authors in author_lists], out=offsets[1:])
+    flat_authors = [author for authors in author_lists for author in authors]
+    columns['author_offsets'] = offsets
+    columns['author_codes'], columns['author_dict'] = dictionary_encode(flat_authors)
+
+    return columns
+
+
+def save_columns(columns, filename):
+    """Сохраняет колонки в сжатый .npz файл."""
+    np.savez_compressed(filename, **columns)
+    print(f"Колонки сохранены в файл: {filename}")
+
+
+def load_columns(filename):
+    """Загружает колонки из .npz файла."""
+    with np.load(filename, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+
+def save_arrow(columns, filename):
+    """Сохраняет колонки в Arrow/Feather файл (требуется pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError:
+        print("Для экспорта в Arrow установите pyarrow: pip install pyarrow")
+        return False
+
+    def dictionary_array(name):
+        codes = columns[f'{name}_codes']
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, mask=codes == MISSING),
+            pa.array(columns[f'{name}_dict'], type=pa.string()),
+        )
+
+    authors = pa.DictionaryArray.from_arrays(
+        pa.array(columns['author_codes']),
+        pa.array(columns['author_dict'], type=pa.string()),
+    )
+    year = columns['year']
+    table = pa.table({
+        'key': pa.array(columns['key'], type=pa.string()),
+        'year': pa.array(year, mask=year == MISSING),
+        'journal': dictionary_array('journal'),
+        'publisher': dictionary_array('publisher'),
+        'type': dictionary_array('type'),
+        'authors': pa.ListArray.from_arrays(pa.array(columns['author_offsets'], type=pa.int32()), authors),
+    })
+    feather.write_feather(table, filename)
+    print(f"Arrow таблица сохранена в файл: {filename}")
+    return True
+
+
+def count_by_year(columns):
+    """Количество публикаций по годам (векторно через bincount)."""
+    years = columns['year']
+    years = years[years != MISSING].astype(np.int64)
+    if years.size == 0:
+        return {}
+    first_year = years.min()
+    counts = np.bincount(years - first_year)
+    nonzero = np.flatnonzero(counts)
+    return {int(first_year + i): int(counts[i]) for i in nonzero}
+
+
+def count_by_code(columns, name, top=None):
+    """Количество публикаций по значениям закодированной колонки, по убыванию."""
+    codes = columns[f'{name}_codes']
+    dictionary = columns[f'{name}_dict']
+    counts = np.bincount(codes[codes != MISSING], minlength=len(dictionary))
+    # Устойчивая сортировка сохраняет порядок первого появления при равенстве
+    order = np.argsort(-counts, kind='stable')
+    order = order[counts[order] > 0]
+    if top is not None:
+        order = order[:top]
+    return {str(dictionary[i]): int(counts[i]) for i in order}
+
+
+def first_author_codes(columns):
+    """Коды первых авторов записей (MISSING для записей без авторов)."""
+    offsets = columns['author_offsets']
+    has_authors = offsets[1:] > offsets[:-1]
+    first = np.full(len(offsets) - 1, MISSING, dtype=np.int32)
+    first[has_authors] = columns['author_codes'][offsets[:-1][has_authors]]
+    return first
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Export parsed BibTeX entries to columnar arrays')
+    parser.add_argument('inputs', nargs='+', help='Input BibTeX files')
+    parser.add_argument('--output', '-o', default='publications_columns.npz', help='Output .npz file')
+    parser.add_argument('--arrow', help='Optional output Arrow/Feather file')
+    parser.add_argument('--workers', '-w', type=int, help='Number of parser processes')
+
+    args = parser.parse_args()
+
+    for filename in args.inputs:
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+
+    entries = [entry for file_entries in parse_bibtex_files(args.inputs, args.workers) for entry in file_entries]
+    print(f"Найдено {len(entries)} записей")
+
+    columns = build_columns(entries)
+    save_columns(columns, args.output)
+    if args.arrow:
+        save_arrow(columns, args.arrow)
+
+    print("\n=== PUBLICATIONS BY YEAR ===")
+    for year, count in count_by_year(columns).items():
+        print(f"{year}: {count}")
+
+    print("\n=== TOP JOURNALS ===")
+    for journal, count in count_by_code(columns, 'journal', top=10).items():
+        print(f"{journal}: {count}")
+
+
+if __name__ == "__main__":
+    main()
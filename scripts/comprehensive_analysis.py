@@ -4,6 +4,12 @@ import json
 from collections import defaultdict, Counter
 from datetime import datetime
 
+from author_identity import default_resolver, researcher_id, resolve
+from journal_names import canonical_journal
+
+# Исследователь из researchers.json, для которого считаются статьи первым автором
+RESEARCHER = 'osinenko'
+
 def parse_bibtex_comprehensive(bibtex_file):
     """Парсит BibTeX файл и извлекает полную информацию о статьях"""
     with open(bibtex_file, 'r', encoding='utf-8') as f:
@@ -54,7 +60,7 @@ def analyze_articles(articles):
     year_stats = Counter(years)
     
     # Статистика по журналам
-    journals = [article['journal'] for article in articles if article['journal']]
+    journals = [canonical_journal(article['journal']) for article in articles if article['journal']]
     journal_stats = Counter(journals)
     
     # Статистика по издателям
@@ -63,13 +69,15 @@ def analyze_articles(articles):
     
     # Анализ авторов (первый автор)
     first_authors = []
+    resolver = default_resolver()
+    researcher = researcher_id(resolver, RESEARCHER)
     for article in articles:
         if article['author']:
             # Извлекаем первого автора
             authors = article['author'].split(' and ')
             if authors:
                 first_author = authors[0].strip()
-                if 'Osinenko' in first_author:
+                if resolve(resolver, first_author) == researcher:
                     first_authors.append(article['year'])
     
     first_author_stats = Counter(first_authors)
@@ -4,12 +4,21 @@
 
 Преобразует формат "фамилия год" на формат, основанный на начале
 заголовка статьи.
+
+Записи обходятся один раз: для каждой записи ключ строится из первых слов
+заголовка и года, совпадения разрешаются суффиксами по множеству уже
+выданных ключей. Ключи заменяются через план вставок bib_editor, а
+отображение старых ключей на новые сохраняется в файл для
+update_latex_citations.py.
 """
 
+import json
 import re
 import sys
 from pathlib import Path
 
+from bib_editor import load_document, rekey, write_spliced
+
 
 def clean_title_for_key(title):
     """Очищает заголовок для использования в качестве ключа."""
@@ -25,63 +34,103 @@ def clean_title_for_key(title):
         return cleaned
 
 
-def convert_bib_naming(input_file, output_file):
-    """Преобразует именование в bib файле."""
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Паттерн для поиска bib записей
-    pattern = r'@(\w+)\{([^,]+),\s*\n\s*title\s*=\s*\{([^}]+)\}'
-    
-    def replace_entry(match):
-        entry_type = match.group(1)
-        old_key = match.group(2)
-        title = match.group(3)
-        
-        # Создаем новый ключ на основе заголовка
+def key_mapping_path(bib_file):
+    """Путь к файлу отображения ключей рядом с bib файлом."""
+    return Path(bib_file).with_suffix('.keymap.json')
+
+
+def unique_key(base_key, used_keys):
+    """
+    Возвращает base_key или base_key с буквенным суффиксом (b, c, ...), если он занят.
+
+    BibTeX сравнивает ключи без учета регистра, поэтому used_keys хранит
+    ключи в нижнем регистре, и занятость проверяется по key.lower().
+    """
+    if base_key.lower() not in used_keys:
+        return base_key
+    for suffix in 'bcdefghijklmnopqrstuvwxyz':
+        candidate = f"{base_key}{suffix}"
+        if candidate.lower() not in used_keys:
+            return candidate
+    number = 2
+    while f"{base_key}_{number}".lower() in used_keys:
+        number += 1
+    return f"{base_key}_{number}"
+
+
+def generate_keys(entries):
+    """
+    Строит новые ключи за один проход по записям.
+
+    Возвращает список новых ключей (по одному на запись). Записи без
+    заголовка сохраняют старый ключ; их ключи заранее резервируются, чтобы
+    сгенерированные ключи с ними не совпали.
+    """
+    used_keys = {entry['key'].lower() for entry in entries if not entry['fields'].get('title')}
+    new_keys = []
+
+    for entry in entries:
+        title = entry['fields'].get('title')
+        if not title:
+            new_keys.append(entry['key'])
+            continue
+
         new_key = clean_title_for_key(title)
-        
         # Добавляем год к ключу для уникальности
-        year_match = re.search(
-            r'year\s*=\s*\{(\d{4})\}', 
-            content[match.start():match.start()+500]
-        )
+        year_match = re.search(r'\d{4}', entry['fields'].get('year', ''))
         if year_match:
-            year = year_match.group(1)
-            new_key = f"{new_key}_{year}"
-        
-        print(f"Преобразование: {old_key} -> {new_key}")
-        print(f"  Заголовок: {title}")
-        
-        # Заменяем ключ в записи
-        return f"@{entry_type}{{{new_key},"
-    
-    # Выполняем замену
-    new_content = re.sub(
-        pattern, replace_entry, content, flags=re.MULTILINE | re.DOTALL
-    )
-    
+            new_key = f"{new_key}_{year_match.group(0)}"
+
+        new_key = unique_key(new_key, used_keys)
+        used_keys.add(new_key.lower())
+        new_keys.append(new_key)
+
+    return new_keys
+
+
+def convert_bib_naming(input_file, output_file, mapping_file=None):
+    """Преобразует именование в bib файле."""
+    document = load_document(input_file)
+    new_keys = generate_keys(document['entries'])
+
+    splices = []
+    mapping = {}
+    for entry, new_key in zip(document['entries'], new_keys):
+        if new_key == entry['key']:
+            continue
+        print(f"Преобразование: {entry['key']} -> {new_key}")
+        print(f"  Заголовок: {entry['fields']['title']}")
+        splices += rekey(document, entry['key'], new_key, entry=entry)
+        # Для повторяющихся старых ключей ссылки ведут на первую запись
+        mapping.setdefault(entry['key'], new_key)
+
     # Сохраняем результат
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(new_content)
-    
+    write_spliced(document, splices, output_file)
     print(f"\nФайл сохранен как: {output_file}")
 
+    mapping_file = mapping_file or key_mapping_path(output_file)
+    with open(mapping_file, 'w', encoding='utf-8') as f:
+        json.dump(mapping, f, ensure_ascii=False, indent=2)
+    print(f"Отображение ключей сохранено в файл: {mapping_file}")
+
+    return mapping
+
 
 def main():
     """Основная функция для запуска скрипта."""
-    if len(sys.argv) != 3:
-        print("Использование: python convert_bib_naming.py input.bib output.bib")
+    if len(sys.argv) not in (3, 4):
+        print("Использование: python convert_bib_naming.py input.bib output.bib [key_mapping.json]")
         sys.exit(1)
-    
+
     input_file = sys.argv[1]
     output_file = sys.argv[2]
-    
+    mapping_file = sys.argv[3] if len(sys.argv) == 4 else None
+
     if not Path(input_file).exists():
         print(f"Ошибка: файл {input_file} не найден")
         sys.exit(1)
-    
-    convert_bib_naming(input_file, output_file)
+
+    convert_bib_naming(input_file, output_file, mapping_file)
 
 
 if __name__ == "__main__":
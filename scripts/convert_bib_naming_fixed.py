@@ -6,77 +6,12 @@
 заголовка статьи.
 """
 
-import re
 import sys
 from pathlib import Path
 
-
-def clean_title_for_key(title):
-    """Очищает заголовок для использования в качестве ключа."""
-    # Убираем специальные символы и приводим к нижнему регистру
-    cleaned = re.sub(r'[^\w\s]', '', title.lower())
-    # Заменяем пробелы на подчеркивания
-    cleaned = re.sub(r'\s+', '_', cleaned)
-    # Берем первые 3-4 слова
-    words = cleaned.split('_')
-    if len(words) >= 4:
-        return '_'.join(words[:4])
-    else:
-        return cleaned
-
-
-def convert_bib_naming(input_file, output_file):
-    """Преобразует именование в bib файле."""
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Паттерн для поиска bib записей с более точным сопоставлением
-    pattern = r'@(\w+)\{([^,]+),'
-    
-    def replace_entry(match):
-        entry_type = match.group(1)
-        old_key = match.group(2)
-        
-        # Ищем заголовок в следующей части записи
-        start_pos = match.end()
-        # Ищем title в пределах следующих 1000 символов
-        title_match = re.search(
-            r'title\s*=\s*\{([^}]+)\}', 
-            content[start_pos:start_pos+1000]
-        )
-        
-        if not title_match:
-            print(f"Не найден заголовок для записи: {old_key}")
-            return match.group(0)  # Возвращаем оригинал
-        
-        title = title_match.group(1)
-        
-        # Создаем новый ключ на основе заголовка
-        new_key = clean_title_for_key(title)
-        
-        # Ищем год в записи
-        year_match = re.search(
-            r'year\s*=\s*\{(\d{4})\}', 
-            content[start_pos:start_pos+1000]
-        )
-        if year_match:
-            year = year_match.group(1)
-            new_key = f"{new_key}_{year}"
-        
-        print(f"Преобразование: {old_key} -> {new_key}")
-        print(f"  Заголовок: {title}")
-        
-        # Заменяем ключ в записи
-        return f"@{entry_type}{{{new_key},"
-    
-    # Выполняем замену
-    new_content = re.sub(pattern, replace_entry, content)
-    
-    # Сохраняем результат
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(new_content)
-    
-    print(f"\nФайл сохранен как: {output_file}")
+# Реализация перенесена в convert_bib_naming.py: один проход по разобранным
+# записям вместо поиска заголовка в первых 1000 символах после ключа
+from convert_bib_naming import clean_title_for_key, convert_bib_naming  # noqa: F401
 
 
 def main():
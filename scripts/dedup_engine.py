@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Единый движок удаления дубликатов в bib файлах.
+
+Заменяет раздельные проверки check_duplicates.py (названия),
+check_doi_duplicates.py (DOI) и проверку ключей в comprehensive_analysis.py.
+Записи объединяются в кластеры системой непересекающихся множеств
+(union-find) по трем сигналам: нормализованный DOI, нормализованное
+название и совпадающий ключ. Из каждого кластера остается самая полная
+запись, недостающие поля которой дополняются из остальных записей
+кластера. Результат и карта перенаправления ключей (старый -> оставшийся)
+записываются за один потоковый проход, неизмененные записи копируются
+в исходном форматировании.
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+from bib_editor import apply_splices, field_source, load_document, replace_field
+from near_duplicates import normalize_title
+
+
+# Названия короче этого порога не считаются сигналом дубликата
+MIN_TITLE_LENGTH = 15
+
+DOI_PREFIX_RE = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)', re.IGNORECASE)
+
+
+def normalize_doi(doi):
+    """Нормализует DOI: без префикса URL/doi:, пробелов и регистра."""
+    return DOI_PREFIX_RE.sub('', (doi or '').strip()).strip().lower()
+
+
+def _find(parent, i):
+    """Корень множества с сжатием путей."""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _union(parent, i, j):
+    """Объединяет множества i и j (корнем становится меньший индекс)."""
+    root_i, root_j = _find(parent, i), _find(parent, j)
+    if root_i != root_j:
+        parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+def entry_signals(entry):
+    """Сигналы дубликата записи: (тип сигнала, значение)."""
+    signals = [('key', entry['key'])]
+    doi = normalize_doi(entry['fields'].get('doi'))
+    if doi:
+        signals.append(('doi', doi))
+    title = normalize_title(entry['fields'].get('title'))
+    if len(title) >= MIN_TITLE_LENGTH:
+        signals.append(('title', title))
+    return signals
+
+
+def cluster_entries(entries):
+    """
+    Группирует записи в кластеры дубликатов.
+
+    Возвращает список кластеров (списков индексов записей) в порядке
+    первого появления и словарь с числом объединений по каждому сигналу.
+    """
+    parent = list(range(len(entries)))
+    first_seen = {}
+    merges = {'key': 0, 'doi': 0, 'title': 0}
+
+    for index, entry in enumerate(entries):
+        for signal in entry_signals(entry):
+            if signal in first_seen:
+                if _find(parent, index) != _find(parent, first_seen[signal]):
+                    merges[signal[0]] += 1
+                _union(parent, index, first_seen[signal])
+            else:
+                first_seen[signal] = index
+
+    clusters = {}
+    for index in range(len(entries)):
+        clusters.setdefault(_find(parent, index), []).append(index)
+    return list(clusters.values()), merges
+
+
+def richness(entry):
+    """Полнота записи: число непустых полей, затем суммарная длина значений."""
+    values = [value for value in entry['fields'].values() if value.strip()]
+    return len(values), sum(len(value) for value in values)
+
+
+def merge_cluster(entries, cluster):
+    """
+    Выбирает самую полную запись кластера и дополняет ее поля.
+
+    Возвращает (индекс победителя, словарь добавляемых полей: имя поля ->
+    индекс записи-источника). Поля победителя не перезаписываются, пустые
+    и отсутствующие поля берутся из остальных записей по убыванию их
+    полноты.
+    """
+    # При равной полноте побеждает запись, встретившаяся раньше
+    ranked = sorted(cluster, key=lambda i: (richness(entries[i]), -i), reverse=True)
+    winner = ranked[0]
+    winner_fields = entries[winner]['fields']
+
+    additions = {}
+    for index in ranked[1:]:
+        for name, value in entries[index]['fields'].items():
+            if value.strip() and not winner_fields.get(name, '').strip() and name not in additions:
+                additions[name] = index
+    return winner, additions
+
+
+def render_entry(document, entry, additions):
+    """Текст записи: исходный фрагмент, дополненный недостающими полями (значения с ограничителями)."""
+    start, end = entry['span']
+    splices = []
+    for name, value in additions.items():
+        for splice_start, splice_end, replacement in replace_field(document, entry['key'], name, value, entry=entry, raw=True):
+            splices.append((splice_start - start, splice_end - start, replacement))
+    return apply_splices(document['text'][start:end], _chain_insertions(splices))
+
+
+def _chain_insertions(splices):
+    """Склеивает вставки в одну позицию, чтобы план не содержал повторов."""
+    merged = {}
+    for start, end, replacement in splices:
+        if (start, end) in merged and start == end:
+            merged[(start, end)] += replacement
+        else:
+            merged[(start, end)] = replacement
+    return [(start, end, replacement) for (start, end), replacement in merged.items()]
+
+
+def deduplicate(documents, output_file):
+    """
+    Удаляет дубликаты из набора документов и пишет результат в output_file.
+
+    Возвращает карту перенаправления ключей и статистику.
+    """
+    entries = []
+    owners = []
+    for doc_index, document in enumerate(documents):
+        entries.extend(document['entries'])
+        owners.extend([doc_index] * len(document['entries']))
+
+    clusters, merges = cluster_entries(entries)
+
+    winners = {}
+    redirects = {}
+    for cluster in clusters:
+        winner, sources = merge_cluster(entries, cluster)
+        # Значения переносятся в исходном виде: в скобках, в кавычках или именем макроса
+        winners[winner] = {
+            name: field_source(documents[owners[index]], entries[index], name)
+            for name, index in sources.items()
+        }
+        for index in cluster:
+            if entries[index]['key'] != entries[winner]['key']:
+                redirects[entries[index]['key']] = entries[winner]['key']
+
+    # Потоковая запись в исходном порядке: оставшиеся записи и весь текст вне записей
+    # (@string, @preamble, @comment), в том числе перед удаленными записями и после последней
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        index = 0
+        for doc_index, document in enumerate(documents):
+            text = document['text']
+            position = 0
+            # Граница между файлами: отделяем записи пустой строкой
+            separate = doc_index > 0
+            for entry in document['entries']:
+                gap = text[position:entry['span'][0]]
+                position = entry['span'][1]
+                additions = winners.get(index)
+                index += 1
+                if additions is None:
+                    # От удаленной записи остается только текст вне записей перед ней
+                    gap = gap.rstrip()
+                    if not gap:
+                        continue
+                if separate and not gap.startswith('\n'):
+                    gap = '\n\n' + gap
+                separate = False
+                f.write(gap)
+                if additions is not None:
+                    f.write(render_entry(document, entry, additions))
+            tail = text[position:].rstrip()
+            if tail:
+                f.write(('\n\n' if separate and not tail.startswith('\n') else '') + tail)
+        f.write('\n')
+
+    stats = {
+        'total_entries': len(entries),
+        'unique_entries': len(clusters),
+        'removed_entries': len(entries) - len(clusters),
+        'merged_fields': sum(len(additions) for additions in winners.values()),
+        'merges_by_signal': merges,
+    }
+    return redirects, stats
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Deduplicate BibTeX entries by DOI, title and key')
+    parser.add_argument('inputs', nargs='+', help='Input BibTeX files')
+    parser.add_argument('--output', '-o', required=True, help='Output deduplicated BibTeX file')
+    parser.add_argument('--redirects', '-r', default='key_redirects.json', help='Output JSON map of removed keys to kept keys')
+
+    args = parser.parse_args()
+
+    for filename in args.inputs:
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+
+    documents = [load_document(filename) for filename in args.inputs]
+    redirects, stats = deduplicate(documents, args.output)
+
+    with open(args.redirects, 'w', encoding='utf-8') as f:
+        json.dump(redirects, f, ensure_ascii=False, indent=2)
+
+    print(f"Всего записей: {stats['total_entries']}")
+    print(f"Уникальных записей: {stats['unique_entries']}")
+    print(f"Удалено дубликатов: {stats['removed_entries']}")
+    print(f"Дополнено полей: {stats['merged_fields']}")
+    print(f"Объединений по сигналам: {stats['merges_by_signal']}")
+    print(f"Файл сохранен как: {args.output}")
+    print(f"Карта перенаправления ключей сохранена в файл: {args.redirects}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Статистика публикаций по подразделению: много исследователей, много bib файлов.
+
+Список исследователей берется из манифеста (JSON вида
+{"id": {"bib": "path.bib", "name": ..., "variants": [...],
+"department": ...}}) или из каталога: каждый .bib файл — исследователь
+(идентификатор — путь к файлу относительно каталога без расширения,
+поэтому одинаковые имена файлов в разных подразделениях не совпадают),
+подкаталог — подразделение.
+
+Каждый файл обрабатывается в пуле процессов целиком одним обработчиком:
+файл читается потоково, публикации сразу сворачиваются в агрегат
+исследователя analyze_publications, поэтому в памяти одновременно
+находятся записи не более чем одного файла на процесс. Вместе с
+агрегатом обработчик возвращает краткие записи статей по идентификатору
+(DOI или название и год). В основном процессе записи сливаются по мере
+готовности (map-reduce) в словари уникальных статей подразделений и
+факультета, и все итоги подразделения и факультета — число публикаций,
+годы, журналы, области и метрики цитирования — строятся по этим
+словарям: совместная статья нескольких исследователей учитывается один
+раз.
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from analyze_publications import add_publication, finalize_aggregate, new_aggregate, parse_bibtex_file
+from author_identity import DEFAULT_RESEARCHERS_FILE, build_resolver, load_researchers
+from keyword_classifier import DEFAULT_TAXONOMY_FILE, build_classifier, load_taxonomy
+from latex_codec import escape_latex
+from near_duplicates import normalize_title
+
+
+# Подразделение для файлов вне подкаталогов и записей манифеста без него
+DEFAULT_DEPARTMENT = 'Без подразделения'
+
+# Поля публикации, которые нужны add_publication для итогов по уникальным статьям
+PAPER_FIELDS = ('key', 'title', 'year', 'journal', 'citations', 'is_first_author')
+
+_worker_taxonomy = None
+_worker_classifier = None
+
+
+def _init_worker(taxonomy):
+    """Строит классификатор один раз на процесс-обработчик."""
+    global _worker_taxonomy, _worker_classifier
+    _worker_taxonomy = taxonomy
+    _worker_classifier = build_classifier(taxonomy)
+
+
+def load_manifest(manifest_file):
+    """Задачи по манифесту; пути к bib файлам считаются от каталога манифеста."""
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    base = Path(manifest_file).parent
+    tasks = []
+    for slug, description in manifest.items():
+        tasks.append({
+            'id': slug,
+            'name': description.get('name', slug),
+            'variants': description.get('variants', []),
+            'bib': str(base / description['bib']),
+            'department': description.get('department', DEFAULT_DEPARTMENT),
+        })
+    return tasks
+
+
+def scan_directory(root, researchers=None):
+    """
+    Задачи по каталогу: каждый .bib файл — исследователь.
+
+    Идентификатор — относительный путь без расширения ("lab/osinenko").
+    Имя и варианты написания берутся из researchers по имени файла, если
+    оно там есть; иначе именем служит сама фамилия из имени файла.
+    """
+    researchers = researchers or {}
+    tasks = []
+    for path in sorted(Path(root).rglob('*.bib')):
+        description = researchers.get(path.stem, {})
+        relative_parent = path.parent.relative_to(root)
+        tasks.append({
+            'id': path.relative_to(root).with_suffix('').as_posix(),
+            'name': description.get('name', path.stem),
+            'variants': description.get('variants', []),
+            'bib': str(path),
+            'department': str(relative_parent) if relative_parent.parts else DEFAULT_DEPARTMENT,
+        })
+    return tasks
+
+
+def paper_id(publication):
+    """Идентификатор статьи для подсчета уникальных публикаций подразделения."""
+    if publication['doi']:
+        return publication['doi'].lower()
+    return f"{normalize_title(publication['title'])}|{publication['year']}"
+
+
+def analyze_researcher(task, taxonomy=None, classifier=None):
+    """
+    Map: частичный агрегат публикаций одного исследователя.
+
+    Кроме агрегата возвращает статьи {идентификатор статьи: запись с полями
+    PAPER_FIELDS} для итогов подразделения по уникальным статьям.
+    """
+    taxonomy = taxonomy or _worker_taxonomy
+    classifier = classifier or _worker_classifier
+
+    # Исследователь задачи получает идентификатор 0 и считается владельцем файла
+    resolver = build_resolver({task['id']: {'name': task['name'], 'variants': task['variants']}})
+    aggregate = new_aggregate(taxonomy)
+    papers = {}
+    for publication in parse_bibtex_file(task['bib'], resolver):
+        add_publication(aggregate, publication, classifier)
+        merge_paper(papers, paper_id(publication), {field: publication[field] for field in PAPER_FIELDS})
+
+    return {'task': task, 'aggregate': aggregate, 'papers': papers}
+
+
+def merge_paper(papers, key, paper):
+    """
+    Reduce: добавляет запись статьи в словарь уникальных статей.
+
+    Из записей одной статьи в нескольких файлах остается запись с
+    наибольшим числом цитирований (при равенстве — по названию и журналу,
+    чтобы итог не зависел от порядка файлов). Статья считается статьей
+    первого автора, если так в любом из файлов: первый автор — один из
+    исследователей подразделения.
+    """
+    current = papers.get(key)
+    if current is None:
+        papers[key] = dict(paper)
+        return
+    first_author = current['is_first_author'] or paper['is_first_author']
+    if (paper['citations'], paper['title'], paper['journal']) > (current['citations'], current['title'], current['journal']):
+        current = papers[key] = dict(paper)
+    current['is_first_author'] = first_author
+
+
+def aggregate_papers(papers, taxonomy, classifier):
+    """Агрегат analyze_publications по уникальным статьям."""
+    aggregate = new_aggregate(taxonomy)
+    for paper in papers.values():
+        add_publication(aggregate, paper, classifier)
+    return aggregate
+
+
+def iter_results(tasks, taxonomy, workers=None):
+    """Результаты analyze_researcher по задачам, параллельно при workers != 1."""
+    if workers == 1 or len(tasks) <= 1:
+        classifier = build_classifier(taxonomy)
+        for task in tasks:
+            yield analyze_researcher(task, taxonomy, classifier)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(taxonomy,)) as executor:
+        futures = [executor.submit(analyze_researcher, task) for task in tasks]
+        # Частичные агрегаты сливаются по мере готовности
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def analyze_department(tasks, taxonomy, since_year=None, workers=None):
+    """Статистика по исследователям, подразделениям и факультету в целом."""
+    researchers = {}
+    departments = {}
+    faculty = {'papers': {}, 'researchers': 0}
+
+    for result in iter_results(tasks, taxonomy, workers):
+        task = result['task']
+        stats = finalize_aggregate(result['aggregate'], since_year)
+        stats['name'] = task['name']
+        stats['department'] = task['department']
+        researchers[task['id']] = stats
+
+        department = departments.setdefault(task['department'], {'papers': {}, 'researchers': 0})
+        for totals in (department, faculty):
+            for key, paper in result['papers'].items():
+                merge_paper(totals['papers'], key, paper)
+            totals['researchers'] += 1
+
+    # Итоги строятся по уникальным статьям: совместная статья учитывается один раз
+    classifier = build_classifier(taxonomy)
+
+    def summarize(totals):
+        stats = finalize_aggregate(aggregate_papers(totals['papers'], taxonomy, classifier), since_year)
+        stats['researchers'] = totals['researchers']
+        return stats
+
+    return {
+        'researchers': dict(sorted(researchers.items())),
+        'departments': {name: summarize(totals) for name, totals in sorted(departments.items())},
+        'total': summarize(faculty),
+    }
+
+
+def generate_department_table(report):
+    """LaTeX таблица: исследователи по подразделениям."""
+    table = ("\\begin{table}[h]\n\\centering\n\\begin{tabular}{|l|l|c|c|c|}\n\\hline\n"
+             "\\textbf{Подразделение} & \\textbf{Исследователь} & \\textbf{Публикаций} & "
+             "\\textbf{Первым автором} & \\textbf{h-индекс} \\\\\n\\hline\n")
+    for stats in sorted(report['researchers'].values(), key=lambda stats: (stats['department'], stats['name'])):
+        table += (f"{escape_latex(stats['department'])} & {escape_latex(stats['name'])} & "
+                  f"{stats['total_publications']} & {stats['first_author_publications']} & "
+                  f"{stats['citation_metrics']['all']['h_index']} \\\\\n\\hline\n")
+    for name, stats in report['departments'].items():
+        table += (f"\\textbf{{{escape_latex(name)}}} & \\textbf{{Итого ({stats['researchers']})}} & "
+                  f"{stats['total_publications']} & {stats['first_author_publications']} & "
+                  f"{stats['citation_metrics']['all']['h_index']} \\\\\n\\hline\n")
+    table += "\\end{tabular}\n\\end{table}"
+    return table
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Analyze publication statistics for many researchers in parallel')
+    parser.add_argument('source', help='Directory with .bib files (subdirectories are departments) or JSON manifest')
+    parser.add_argument('--researchers', '-r', default=str(DEFAULT_RESEARCHERS_FILE), help='Researchers JSON file for directory mode')
+    parser.add_argument('--taxonomy', '-t', default=str(DEFAULT_TAXONOMY_FILE), help='Research area taxonomy JSON file')
+    parser.add_argument('--since', type=int, help='First publication year of the citation window')
+    parser.add_argument('--workers', '-w', type=int, help='Number of worker processes')
+    parser.add_argument('--output', '-o', default='department_stats.json', help='Output JSON file')
+    parser.add_argument('--latex', default='department_stats_latex.txt', help='Output LaTeX table file')
+
+    args = parser.parse_args()
+
+    for filename in (args.source, args.taxonomy):
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+
+    if Path(args.source).is_dir():
+        researchers = load_researchers(args.researchers) if Path(args.researchers).exists() else {}
+        tasks = scan_directory(args.source, researchers)
+    else:
+        tasks = load_manifest(args.source)
+
+    missing = [task['bib'] for task in tasks if not Path(task['bib']).exists()]
+    if missing:
+        print(f"Ошибка: файлы не найдены: {', '.join(missing)}")
+        sys.exit(1)
+
+    print(f"Исследователей: {len(tasks)}")
+    report = analyze_department(tasks, load_taxonomy(args.taxonomy), args.since, args.workers)
+
+    print("\n=== DEPARTMENTS ===")
+    for name, stats in report['departments'].items():
+        print(f"{name}: {stats['researchers']} researchers, {stats['total_publications']} unique publications, "
+              f"{stats['first_author_publications']} first author")
+    total = report['total']
+    print(f"\nTotal: {total['researchers']} researchers, {total['total_publications']} unique publications")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nСтатистика сохранена как: {args.output}")
+
+    with open(args.latex, 'w', encoding='utf-8') as f:
+        f.write(generate_department_table(report))
+    print(f"LaTeX таблица сохранена как: {args.latex}")
+
+
+if __name__ == "__main__":
+    main()
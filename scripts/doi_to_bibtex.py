@@ -12,6 +12,8 @@ import sys
 import argparse
 from urllib.parse import quote_plus
 
+from latex_codec import escape_latex
+
 def get_bibtex_from_doi(doi):
     """Get BibTeX entry from DOI using CrossRef API"""
     try:
@@ -74,6 +76,9 @@ def get_bibtex_from_doi(doi):
         # Get publisher
         publisher = work.get('publisher', '')
         
+        # Get ISSN (print and electronic) for joining with journal metrics
+        issn = ', '.join(work.get('ISSN', []))
+        
         # Generate BibTeX key
         if authors:
             first_author = authors[0].split()[-1]  # Last name of first author
@@ -87,9 +92,9 @@ def get_bibtex_from_doi(doi):
         
         # Create BibTeX entry
         bibtex = f"""@article{{{key},
-  title = {{{title}}},
-  author = {{{' and '.join(authors)}}},
-  journal = {{{journal}}},
+  title = {{{escape_latex(title)}}},
+  author = {{{' and '.join(escape_latex(author) for author in authors)}}},
+  journal = {{{escape_latex(journal)}}},
   year = {{{year}}},
   doi = {{{doi}}},
 """
@@ -104,7 +109,10 @@ def get_bibtex_from_doi(doi):
             bibtex += f"  pages = {{{pages}}},\n"
         
         if publisher:
-            bibtex += f"  publisher = {{{publisher}}},\n"
+            bibtex += f"  publisher = {{{escape_latex(publisher)}}},\n"
+        
+        if issn:
+            bibtex += f"  issn = {{{issn}}},\n"
         
         bibtex += "}\n\n"
         
@@ -119,7 +127,8 @@ def get_bibtex_from_doi(doi):
                 'volume': volume,
                 'issue': issue,
                 'pages': pages,
-                'publisher': publisher
+                'publisher': publisher,
+                'issn': issn
             }
         }
         
@@ -3,106 +3,163 @@
 Скрипт для исправления проблем с кодировкой в bib файле.
 
 Исправляет записи с русским текстом для совместимости с LaTeX.
+
+Правила не зашиты в код, а загружаются из файла данных (по умолчанию
+russian_rules.json рядом со скриптом): таблица транслитерации, словари
+переводов по полям (раздел "*" действует для всех полей) и список полей,
+которые удаляются. Для каждого поля все фразы словаря и буквы кириллицы
+компилируются в одно регулярное выражение, поэтому значение
+обрабатывается за один проход. Правила применяются к каждой записи с
+language = {russian}; ключи с кириллицей заменяются ключами из
+переведенного названия, а отображение старых ключей на новые сохраняется
+рядом с выходным файлом (как в convert_bib_naming.py), чтобы ссылки в
+LaTeX можно было обновить update_latex_citations.py.
 """
 
+import json
 import re
 import sys
 from pathlib import Path
 
+from bib_editor import delete_field, load_document, rekey, replace_field, write_spliced
+from bib_names import DEFAULT_RULES_FILE, build_transliteration
+from convert_bib_naming import clean_title_for_key, key_mapping_path, unique_key
+
+
+# Значения поля language, при которых запись считается русскоязычной
+RUSSIAN_LANGUAGES = {'russian', 'ru', 'русский'}
+
+NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+
+def load_rules(rules_file=DEFAULT_RULES_FILE):
+    """
+    Загружает правила и компилирует их.
+
+    Таблица транслитерации задается строчными буквами, заглавные варианты
+    строятся автоматически. Возвращает словарь с таблицами и функцией
+    получения скомпилированного сопоставителя для поля.
+    """
+    with open(rules_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    transliteration = build_transliteration(data.get('transliteration', {}))
+    translations = data.get('translations', {})
+    return {
+        'transliteration': transliteration,
+        'translations': {field.lower(): phrases for field, phrases in translations.items()},
+        'remove_fields': [field.lower() for field in data.get('remove_fields', [])],
+        'matchers': {},
+    }
+
+
+def field_matcher(rules, field):
+    """
+    Сопоставитель для поля: (регулярное выражение, словарь замен).
+
+    Фразы поля и общие фразы идут в порядке убывания длины, чтобы
+    выигрывало самое длинное совпадение, последней альтернативой идут
+    отдельные буквы таблицы транслитерации. Сопоставители кэшируются.
+    """
+    if field in rules['matchers']:
+        return rules['matchers'][field]
+
+    replacements = dict(rules['translations'].get('*', {}))
+    replacements.update(rules['translations'].get(field, {}))
+    phrases = sorted(replacements, key=len, reverse=True)
+    alternatives = [re.escape(phrase) for phrase in phrases]
+    if rules['transliteration']:
+        letters = ''.join(re.escape(letter) for letter in rules['transliteration'])
+        alternatives.append(f'[{letters}]')
+    pattern = re.compile('|'.join(alternatives)) if alternatives else None
+
+    lookup = dict(rules['transliteration'])
+    lookup.update(replacements)
+    rules['matchers'][field] = (pattern, lookup)
+    return rules['matchers'][field]
+
+
+def convert_value(rules, field, value):
+    """Переводит и транслитерирует значение поля за один проход."""
+    pattern, lookup = field_matcher(rules, field)
+    if pattern is None:
+        return value
+    return pattern.sub(lambda match: lookup[match.group(0)], value)
 
-def fix_bib_encoding(input_file, output_file):
+
+def is_russian(entry):
+    """Запись помечена как русскоязычная."""
+    return entry['fields'].get('language', '').strip().lower() in RUSSIAN_LANGUAGES
+
+
+def fix_bib_encoding(input_file, output_file, rules_file=DEFAULT_RULES_FILE, mapping_file=None):
     """Исправляет проблемы с кодировкой в bib файле."""
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Исправляем записи с русским текстом
-    replacements = [
-        # Первая запись
-        (
-            r'@article\{совершенствование_методики_обработки_данных_2011,',
-            r'@article{improving_data_processing_methods_2011,'
-        ),
-        (
-            r'title = \{Совершенствование методики обработки данных испытаний наземных транспортных средств\},',
-            r'title = {Improving data processing methods for ground vehicle testing},'
-        ),
-        (
-            r'author = \{Осиненко П\.В\.\},',
-            r'author = {Osinenko P.V.},'
-        ),
-        (
-            r'journal = \{Тракторы и сельхозмашины\},',
-            r'journal = {Tractors and Agricultural Machines},'
-        ),
-        (
-            r'address = \{Калужский ф-л МГТУ им\. Н\.Э\. Баумана\},',
-            r'address = {Kaluga Branch of Bauman Moscow State Technical University},'
-        ),
-        (
-            r'publisher = \{Московский политехнический университет, ООО "Эко-Вектор"\},',
-            r'publisher = {Moscow Polytechnic University, Eco-Vector LLC},'
-        ),
-        (
-            r'note = \{УДК: 629\.114\.2\}',
-            r'note = {UDC: 629.114.2}'
-        ),
-        
-        # Вторая запись
-        (
-            r'@article\{усовершенствованная_измерительная_система_для_2012,',
-            r'@article{improved_measurement_system_for_2012,'
-        ),
-        (
-            r'title = \{Усовершенствованная измерительная система для наземно-транспортных средств\},',
-            r'title = {Improved measurement system for ground vehicles},'
-        ),
-        (
-            r'author = \{П\.В\. Осиненко and В\.А\. Воронин and М\.В\. Сидоров\},',
-            r'author = {P.V. Osinenko and V.A. Voronin and M.V. Sidorov},'
-        ),
-        (
-            r'journal = \{Сельскохозяйственные машины и технологии\},',
-            r'journal = {Agricultural Machines and Technologies},'
-        ),
-        (
-            r'publisher = \{Федеральный научный агроинженерный центр ВИМ\},',
-            r'publisher = {Federal Scientific Agroengineering Center VIM},'
-        ),
-        (
-            r'note = \{КФ МГТУ им\. Н\.Э\. Баумана\}',
-            r'note = {KF Bauman Moscow State Technical University}'
-        )
-    ]
-    
-    # Применяем замены
-    for old_pattern, new_pattern in replacements:
-        content = re.sub(old_pattern, new_pattern, content)
-    
-    # Удаляем строки с language = {russian}
-    content = re.sub(r'language = \{russian\},?\n?', '', content)
-    
+    rules = load_rules(rules_file)
+    document = load_document(input_file)
+    used_keys = {entry['key'].lower() for entry in document['entries']}
+
+    splices = []
+    mapping = {}
+    converted = 0
+    for entry in document['entries']:
+        if not is_russian(entry):
+            continue
+        converted += 1
+
+        new_fields = {}
+        for field, value in entry['fields'].items():
+            if field in rules['remove_fields']:
+                splices += delete_field(document, entry['key'], field, entry=entry)
+                continue
+            new_value = convert_value(rules, field, value)
+            new_fields[field] = new_value
+            if new_value != value:
+                splices += replace_field(document, entry['key'], field, new_value, entry=entry)
+
+        # Ключ с кириллицей заменяем ключом из переведенного названия
+        if NON_ASCII_RE.search(entry['key']) and new_fields.get('title'):
+            new_key = clean_title_for_key(new_fields['title'])
+            year_match = re.search(r'\d{4}', new_fields.get('year', ''))
+            if year_match:
+                new_key = f"{new_key}_{year_match.group(0)}"
+            new_key = unique_key(new_key, used_keys)
+            used_keys.add(new_key.lower())
+            splices += rekey(document, entry['key'], new_key, entry=entry)
+            # Для повторяющихся старых ключей ссылки ведут на первую запись
+            mapping.setdefault(entry['key'], new_key)
+            print(f"Ключ: {entry['key']} -> {new_key}")
+
     # Сохраняем результат
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
+    write_spliced(document, splices, output_file)
+
     print(f"Файл исправлен: {output_file}")
+    print(f"Обработано русскоязычных записей: {converted}")
     print("Русский текст заменен на английский для совместимости с LaTeX")
 
+    mapping_file = mapping_file or key_mapping_path(output_file)
+    with open(mapping_file, 'w', encoding='utf-8') as f:
+        json.dump(mapping, f, ensure_ascii=False, indent=2)
+    print(f"Отображение ключей сохранено в файл: {mapping_file}")
+
+    return mapping
+
 
 def main():
     """Основная функция для запуска скрипта."""
-    if len(sys.argv) != 3:
-        print("Использование: python fix_bib_encoding.py input.bib output.bib")
+    if len(sys.argv) not in (3, 4):
+        print("Использование: python fix_bib_encoding.py input.bib output.bib [rules.json]")
         sys.exit(1)
-    
+
     input_file = sys.argv[1]
     output_file = sys.argv[2]
-    
-    if not Path(input_file).exists():
-        print(f"Ошибка: файл {input_file} не найден")
-        sys.exit(1)
-    
-    fix_bib_encoding(input_file, output_file)
+    rules_file = sys.argv[3] if len(sys.argv) == 4 else DEFAULT_RULES_FILE
+
+    for filename in (input_file, rules_file):
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+
+    fix_bib_encoding(input_file, output_file, rules_file)
 
 
 if __name__ == "__main__":
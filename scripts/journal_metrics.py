@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Показатели журналов из локальной таблицы (SJR) для отчетов по квартилям.
+
+Таблица загружается из CSV в формате выгрузки SCImago (разделитель ";",
+десятичная запятая, колонки Title, Issn, SJR, SJR Best Quartile,
+H index) или в аналогичном CSV с запятыми; по ней строятся хэш-индексы
+ISSN -> журнал и нормализованное название -> журнал. Публикация
+сопоставляется за O(1) по ISSN (поле issn записывается из ответа
+CrossRef), затем по точному нормализованному названию, и только если оба
+не дали результата — нечетко по названию: кандидаты отбираются по
+инвертированному индексу слов и сравниваются по коэффициенту Жаккара
+шинглов. Результаты сопоставления названий кэшируются.
+
+Таблицы квартилей и журналов строятся за один проход по bib файлу.
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+from bib_parser import parse_bibtex_file
+from latex_codec import escape_latex, unescape_fields
+from journal_names import canonical_journal, journal_key
+from near_duplicates import jaccard, title_shingles
+
+
+# Порог нечеткого сопоставления названий
+DEFAULT_FUZZY_THRESHOLD = 0.8
+
+# Максимум кандидатов для нечеткого сопоставления
+MAX_FUZZY_CANDIDATES = 50
+
+# Квартили в порядке вывода; журналы без квартиля попадают в NO_QUARTILE
+QUARTILES = ('Q1', 'Q2', 'Q3', 'Q4')
+NO_QUARTILE = '-'
+
+# Возможные названия колонок таблицы
+COLUMNS = {
+    'title': ('title', 'source title', 'journal'),
+    'issn': ('issn', 'issns'),
+    'sjr': ('sjr',),
+    'quartile': ('sjr best quartile', 'quartile', 'best quartile'),
+    'h_index': ('h index', 'h-index', 'h_index'),
+}
+
+ISSN_RE = re.compile(r'\b(\d{4})-?(\d{3}[\dXx])\b')
+
+
+def parse_issns(value):
+    """ISSN из строки в виде XXXXXXXX (без дефиса, X заглавная)."""
+    return [f"{first}{second.upper()}" for first, second in ISSN_RE.findall(value or '')]
+
+
+def parse_number(value):
+    """Число из ячейки таблицы (десятичная запятая допускается) или None."""
+    value = (value or '').strip().replace(',', '.')
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def load_metrics(csv_file):
+    """
+    Загружает таблицу показателей и строит индексы.
+
+    Возвращает словарь со списком журналов, индексами по ISSN и по
+    названию, инвертированным индексом слов названий и кэшем сопоставлений.
+    """
+    with open(csv_file, 'r', encoding='utf-8-sig', newline='') as f:
+        sample = f.readline()
+        f.seek(0)
+        delimiter = max(';,\t', key=sample.count)
+        reader = csv.DictReader(f, delimiter=delimiter)
+        header = {name.strip().lower(): name for name in reader.fieldnames or []}
+        columns = {field: next((header[name] for name in names if name in header), None)
+                   for field, names in COLUMNS.items()}
+        if columns['title'] is None and columns['issn'] is None:
+            raise ValueError(f"в таблице {csv_file} нет колонок Title или Issn")
+
+        index = {'journals': [], 'by_issn': {}, 'by_title': {}, 'words': {}, 'cache': {}}
+        for row in reader:
+            cell = lambda field: (row.get(columns[field]) or '').strip() if columns[field] else ''
+            quartile = cell('quartile').upper()
+            journal = {
+                'title': cell('title'),
+                'issn': parse_issns(cell('issn')),
+                'sjr': parse_number(cell('sjr')),
+                'quartile': quartile if quartile in QUARTILES else NO_QUARTILE,
+                'h_index': parse_number(cell('h_index')),
+            }
+            position = len(index['journals'])
+            index['journals'].append(journal)
+            for issn in journal['issn']:
+                index['by_issn'].setdefault(issn, position)
+            key = journal_key(journal['title'])
+            if key and key not in index['by_title']:
+                index['by_title'][key] = position
+                for word in set(key.split()):
+                    index['words'].setdefault(word, []).append(position)
+    return index
+
+
+def fuzzy_lookup(index, key, threshold=DEFAULT_FUZZY_THRESHOLD):
+    """Нечеткий поиск журнала по ключу названия; кандидаты — по самым редким словам."""
+    words = sorted(set(key.split()), key=lambda word: len(index['words'].get(word, ())))
+    candidates = {}
+    for word in words:
+        for position in index['words'].get(word, ()):
+            candidates.setdefault(position)
+            if len(candidates) >= MAX_FUZZY_CANDIDATES:
+                break
+        if len(candidates) >= MAX_FUZZY_CANDIDATES:
+            break
+
+    shingles = title_shingles(key)
+    best, best_score = None, threshold
+    for position in candidates:
+        score = jaccard(shingles, title_shingles(index['journals'][position]['title']))
+        if score >= best_score:
+            best, best_score = position, score
+    return best
+
+
+def lookup(index, issn='', title='', threshold=DEFAULT_FUZZY_THRESHOLD):
+    """Журнал публикации: (запись таблицы, способ — 'issn', 'title', 'fuzzy') или (None, None)."""
+    for value in parse_issns(issn):
+        if value in index['by_issn']:
+            return index['journals'][index['by_issn'][value]], 'issn'
+
+    key = journal_key(title)
+    if not key:
+        return None, None
+    if key not in index['cache']:
+        if key in index['by_title']:
+            index['cache'][key] = (index['by_title'][key], 'title')
+        else:
+            position = fuzzy_lookup(index, key, threshold)
+            index['cache'][key] = (position, 'fuzzy' if position is not None else None)
+    position, method = index['cache'][key]
+    return (index['journals'][position], method) if position is not None else (None, None)
+
+
+def join_publications(entries, index, threshold=DEFAULT_FUZZY_THRESHOLD):
+    """
+    Сопоставляет записи с таблицей за один проход.
+
+    Возвращает отчет: число публикаций по квартилям, по способам
+    сопоставления, таблицу площадок и список несопоставленных площадок.
+    """
+    quartiles = Counter()
+    methods = Counter()
+    venues = {}
+    for entry in entries:
+        fields = unescape_fields(entry)
+        venue = canonical_journal(fields.get('journal') or fields.get('booktitle') or '')
+        if not venue:
+            continue
+        journal, method = lookup(index, fields.get('issn', ''), venue, threshold)
+        quartile = journal['quartile'] if journal else NO_QUARTILE
+        quartiles[quartile] += 1
+        methods[method or 'unmatched'] += 1
+
+        if venue not in venues:
+            venues[venue] = {
+                'publications': 0,
+                'matched_title': journal['title'] if journal else None,
+                'quartile': quartile,
+                'sjr': journal['sjr'] if journal else None,
+                'h_index': journal['h_index'] if journal else None,
+                'method': method,
+            }
+        venues[venue]['publications'] += 1
+
+    venues = dict(sorted(venues.items(), key=lambda item: (-item[1]['publications'], item[0])))
+    return {
+        'quartiles': {quartile: quartiles[quartile] for quartile in QUARTILES + (NO_QUARTILE,)},
+        'match_methods': dict(methods),
+        'venues': venues,
+        'unmatched': [venue for venue, info in venues.items() if info['method'] is None],
+    }
+
+
+def generate_latex_tables(report, top=15):
+    """LaTeX таблицы квартилей и площадок."""
+    quartile_table = ("\\begin{table}[h]\n\\centering\n\\begin{tabular}{|c|c|}\n\\hline\n"
+                      "\\textbf{Квартиль} & \\textbf{Количество публикаций} \\\\\n\\hline\n")
+    for quartile, count in report['quartiles'].items():
+        label = 'Без квартиля' if quartile == NO_QUARTILE else quartile
+        quartile_table += f"{label} & {count} \\\\\n\\hline\n"
+    quartile_table += "\\end{tabular}\n\\end{table}"
+
+    venue_table = ("\\begin{table}[h]\n\\centering\n\\begin{tabular}{|l|c|c|c|}\n\\hline\n"
+                   "\\textbf{Журнал} & \\textbf{Публикаций} & \\textbf{Квартиль} & \\textbf{SJR} \\\\\n\\hline\n")
+    for venue, info in list(report['venues'].items())[:top]:
+        sjr = f"{info['sjr']:.3f}" if info['sjr'] is not None else '-'
+        venue_table += f"{escape_latex(venue)} & {info['publications']} & {info['quartile']} & {sjr} \\\\\n\\hline\n"
+    venue_table += "\\end{tabular}\n\\end{table}"
+
+    return {'quartile_table': quartile_table, 'venue_table': venue_table}
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Join publications with a local journal metrics table (SJR CSV)')
+    parser.add_argument('bib_file', help='BibTeX file')
+    parser.add_argument('metrics_file', help='Journal metrics CSV (SCImago export or similar)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_FUZZY_THRESHOLD, help='Fuzzy title match threshold')
+    parser.add_argument('--output', '-o', default='journal_metrics.json', help='Output JSON report')
+    parser.add_argument('--latex', default='journal_metrics_latex.txt', help='Output LaTeX tables file')
+
+    args = parser.parse_args()
+
+    for filename in (args.bib_file, args.metrics_file):
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+
+    try:
+        index = load_metrics(args.metrics_file)
+    except ValueError as error:
+        print(f"Ошибка: {error}")
+        sys.exit(1)
+    print(f"Журналов в таблице: {len(index['journals'])}")
+
+    report = join_publications(parse_bibtex_file(args.bib_file), index, args.threshold)
+
+    print("\n=== QUARTILES ===")
+    for quartile, count in report['quartiles'].items():
+        print(f"{quartile}: {count} publications")
+    print(f"\nMatched by: {', '.join(f'{method} {count}' for method, count in report['match_methods'].items())}")
+    if report['unmatched']:
+        print("\nНе найдены в таблице:")
+        for venue in report['unmatched']:
+            print(f"   - {venue}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nОтчет сохранен как: {args.output}")
+
+    tables = generate_latex_tables(report)
+    with open(args.latex, 'w', encoding='utf-8') as f:
+        f.write("=== QUARTILE TABLE ===\n")
+        f.write(tables['quartile_table'])
+        f.write("\n\n=== VENUE TABLE ===\n")
+        f.write(tables['venue_table'])
+    print(f"LaTeX таблицы сохранены как: {args.latex}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Приведение названий журналов и конференций к каноническому виду.
+
+Известные журналы задаются файлом journal_names.json
+({"Каноническое название": ["вариант", "ISO4 сокращение", ...]}).
+Все названия и варианты разбиваются на значимые слова (без "of", "and",
+"the" и т.п., как в ISO4) и заносятся в префиксное дерево по словам.
+Слово запроса проходит по ребру дерева, если совпадает со словом ребра
+или является его началом не короче двух букв (из однобуквенных
+сокращений ISO4 понимается только "J." — Journal), поэтому
+"IEEE Trans. Automat. Contr." находит "IEEE Transactions on Automatic
+Control", даже если именно такого сокращения в таблице нет. Точные
+совпадения предпочитаются сокращенным.
+
+Год и порядковый номер конференции ("2024 IEEE 63rd Conference ...")
+отбрасываются, а аббревиатура в скобках в конце названия ("... (CDC)")
+не участвует в сопоставлении, поэтому названия с ней и без нее совпадают.
+Названия вне таблицы сводятся по нормализованному ключу (регистр,
+пунктуация, "&"), и за представителя берется первое встреченное
+написание. Результаты запоминаются, поэтому каждое написание
+разбирается один раз.
+"""
+
+import argparse
+import bisect
+import json
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+from bib_parser import parse_bibtex_file
+from latex_codec import unescape_fields
+from near_duplicates import normalize_title
+
+
+# Таблица названий по умолчанию рядом со скриптом
+DEFAULT_JOURNALS_FILE = Path(__file__).with_name('journal_names.json')
+
+# Слова, которые ISO4 опускает в сокращениях
+SKIP_WORDS = {'of', 'on', 'and', 'the', 'in', 'for', 'a', 'an', 'to', 'und', 'fur', 'de', 'la', 'et'}
+
+# Год и порядковый номер конференции
+EDITION_RE = re.compile(r'^\s*(?:19|20)\d{2}\b\s*|\b\d+(?:st|nd|rd|th)\b\s*', re.IGNORECASE)
+
+# Аббревиатура в скобках в конце названия: "(CDC)", "(CoDIT)", "(FUZZ-IEEE)"
+ACRONYM_RE = re.compile(r'(?<=\S)\s*\(\s*[A-Z][\w&\-]*\s*\)\s*$')
+
+# Минимальная длина сокращенного слова; короче допускаются только слова из ONE_LETTER_ABBREVIATIONS
+MIN_ABBREVIATION_LENGTH = 2
+
+# Однобуквенные сокращения ISO4
+ONE_LETTER_ABBREVIATIONS = {'j': 'journal'}
+
+
+def journal_key(title):
+    """Ключ названия журнала: нормализованное название без "the" и с "and" вместо "&"."""
+    key = normalize_title((title or '').replace('&', ' and '))
+    return key[4:] if key.startswith('the ') else key
+
+
+def strip_edition(name):
+    """Убирает год и порядковый номер конференции из названия."""
+    return ' '.join(EDITION_RE.sub(' ', name or '').split())
+
+
+def strip_acronym(name):
+    """Убирает аббревиатуру в скобках в конце названия."""
+    return ACRONYM_RE.sub('', name or '')
+
+
+def title_words(name):
+    """Значимые слова названия для префиксного дерева (без аббревиатуры в скобках)."""
+    return [word for word in journal_key(strip_acronym(name)).split() if word not in SKIP_WORDS]
+
+
+def _new_node():
+    """Узел префиксного дерева."""
+    return {'children': {}, 'words': None, 'canonical': None}
+
+
+def build_table(journals):
+    """
+    Строит таблицу канонизации.
+
+    journals — словарь {каноническое название: [варианты]}. Возвращает
+    словарь с префиксным деревом по словам и кэшами написаний.
+    """
+    table = {'trie': _new_node(), 'cache': {}, 'seen': {}}
+    for canonical, variants in journals.items():
+        for name in [canonical] + variants:
+            node = table['trie']
+            for word in title_words(name):
+                node = node['children'].setdefault(word, _new_node())
+            node['canonical'] = node['canonical'] or canonical
+    return table
+
+
+def _children_with_prefix(node, prefix):
+    """Дочерние слова узла, начинающиеся с prefix (двоичный поиск по отсортированным словам)."""
+    if node['words'] is None:
+        node['words'] = sorted(node['children'])
+    words = node['words']
+    start = bisect.bisect_left(words, prefix)
+    end = bisect.bisect_left(words, prefix + '\uffff')
+    return words[start:end]
+
+
+def _candidate_words(node, word):
+    """Слова дерева, которым может соответствовать слово запроса."""
+    if len(word) >= MIN_ABBREVIATION_LENGTH:
+        return _children_with_prefix(node, word)
+    return [child for child in (word, ONE_LETTER_ABBREVIATIONS.get(word)) if child in node['children']]
+
+
+def match_trie(table, words):
+    """
+    Каноническое название по словам запроса или None.
+
+    Каждое слово запроса совпадает со словом дерева точно или как его
+    начало (не короче MIN_ABBREVIATION_LENGTH букв); из полных совпадений
+    выбирается с наименьшим числом сокращенных слов.
+    """
+    best = (None, len(words) + 1)
+    stack = [(table['trie'], 0, 0)]
+    while stack:
+        node, position, abbreviated = stack.pop()
+        if abbreviated >= best[1]:
+            continue
+        if position == len(words):
+            if node['canonical'] is not None:
+                best = (node['canonical'], abbreviated)
+            continue
+        word = words[position]
+        for child_word in _candidate_words(node, word):
+            stack.append((node['children'][child_word], position + 1, abbreviated + (child_word != word)))
+    return best[0]
+
+
+def canonicalize(table, name):
+    """Каноническое название журнала (запоминается для каждого написания)."""
+    if name in table['cache']:
+        return table['cache'][name]
+
+    cleaned = strip_edition(name)
+    words = title_words(cleaned)
+    canonical = match_trie(table, words) if words else None
+    if canonical is None and cleaned:
+        # Вне таблицы: одинаковые с точностью до регистра, пунктуации и аббревиатуры
+        # в скобках названия сводятся к первому
+        canonical = table['seen'].setdefault(journal_key(strip_acronym(cleaned)) or journal_key(cleaned), cleaned)
+
+    table['cache'][name] = canonical or ''
+    return table['cache'][name]
+
+
+def load_table(journals_file=DEFAULT_JOURNALS_FILE):
+    """Загружает таблицу канонизации из JSON файла."""
+    with open(journals_file, 'r', encoding='utf-8') as f:
+        return build_table(json.load(f))
+
+
+_default_table = None
+
+
+def canonical_journal(name):
+    """Каноническое название по таблице по умолчанию (строится один раз)."""
+    global _default_table
+    if _default_table is None:
+        _default_table = load_table()
+    return canonicalize(_default_table, name)
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Canonicalize journal names of a BibTeX file')
+    parser.add_argument('bib_file', help='BibTeX file')
+    parser.add_argument('--journals', '-j', default=str(DEFAULT_JOURNALS_FILE), help='Journal names JSON file')
+
+    args = parser.parse_args()
+
+    for filename in (args.bib_file, args.journals):
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+
+    table = load_table(args.journals)
+    counts = Counter()
+    for entry in parse_bibtex_file(args.bib_file):
+        fields = unescape_fields(entry)
+        venue = fields.get('journal') or fields.get('booktitle') or ''
+        if venue.strip():
+            counts[canonicalize(table, venue)] += 1
+
+    for canonical, count in counts.most_common():
+        variants = sorted({' '.join(name.split()) for name, value in table['cache'].items() if value == canonical} - {canonical})
+        suffix = f"  <- {'; '.join(variants)}" if variants else ''
+        print(f"{count:4d}  {canonical}{suffix}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,27 @@
 #!/usr/bin/env python3
 """
 Enhanced script to read DOIs from JSON file and generate BibTeX entries
-- Filters out preprints
+- Filters out preprints (replacing them with published versions when known)
 - Includes citation counts
 - Uses year from JSON file
 """
 
 import json
+import re
 import requests
 import time
-import re
 import argparse
 from urllib.parse import quote_plus
 
+from latex_codec import escape_latex
+from preprint_linker import is_preprint_doi, link_preprints
+
 def is_preprint(doi):
     """Check if DOI is a preprint"""
-    preprint_patterns = [
-        r'arxiv\.org',
-        r'bioarxiv\.org',
-        r'medarxiv\.org',
-        r'chemrxiv\.org',
-        r'psyarxiv\.org',
-        r'socarxiv\.org',
-        r'osf\.io',
-        r'preprints\.org',
-        r'researchsquare\.com',
-        r'biorxiv\.org'
-    ]
-    
-    doi_lower = doi.lower()
-    for pattern in preprint_patterns:
-        if re.search(pattern, doi_lower):
-            return True
-    return False
+    return is_preprint_doi(doi)
 
-def get_bibtex_from_doi(doi, year_from_json=None, title_from_json=None, authors_from_json=None):
+def get_bibtex_from_doi(doi, year_from_json=None, title_from_json=None, authors_from_json=None,
+                        citations_from_json=None, venue_from_json=None):
     """Get BibTeX entry from DOI using CrossRef API"""
     try:
         # Clean the DOI
@@ -82,6 +69,9 @@ def get_bibtex_from_doi(doi, year_from_json=None, title_from_json=None, authors_
         
         # Get journal information
         journal = work.get('container-title', [''])[0] if work.get('container-title') else ''
+        if not journal and venue_from_json:
+            # Fall back to the Scholar venue line without volume, issue and pages
+            journal = re.sub(r'(\s+\d+(\s*\([^)]*\))?)?(,\s*[\w-]*\d[\w-]*)*$', '', venue_from_json)
         
         # Get year - prefer from JSON, fallback to CrossRef
         year = year_from_json
@@ -105,6 +95,9 @@ def get_bibtex_from_doi(doi, year_from_json=None, title_from_json=None, authors_
         # Get publisher
         publisher = work.get('publisher', '')
         
+        # Get ISSN (print and electronic) for joining with journal metrics
+        issn = ', '.join(work.get('ISSN', []))
+        
         # Generate BibTeX key
         if authors:
             first_author = authors[0].split()[-1]  # Last name of first author
@@ -118,9 +111,9 @@ def get_bibtex_from_doi(doi, year_from_json=None, title_from_json=None, authors_
         
         # Create BibTeX entry
         bibtex = f"""@article{{{key},
-  title = {{{title}}},
-  author = {{{' and '.join(authors)}}},
-  journal = {{{journal}}},
+  title = {{{escape_latex(title)}}},
+  author = {{{' and '.join(escape_latex(author) for author in authors)}}},
+  journal = {{{escape_latex(journal)}}},
   year = {{{year}}},
   doi = {{{doi}}},
 """
@@ -135,10 +128,14 @@ def get_bibtex_from_doi(doi, year_from_json=None, title_from_json=None, authors_
             bibtex += f"  pages = {{{pages}}},\n"
         
         if publisher:
-            bibtex += f"  publisher = {{{publisher}}},\n"
+            bibtex += f"  publisher = {{{escape_latex(publisher)}}},\n"
         
-        # Add citation count field (empty for now, can be filled manually)
-        bibtex += f"  citations = {{}},\n"
+        if issn:
+            bibtex += f"  issn = {{{issn}}},\n"
+        
+        # Add citation count from the Scholar profile (empty if unknown, can be filled manually)
+        citations = citations_from_json if citations_from_json not in (None, '') else None
+        bibtex += f"  citations = {{{'' if citations is None else citations}}},\n"
         
         bibtex += "}\n\n"
         
@@ -154,7 +151,9 @@ def get_bibtex_from_doi(doi, year_from_json=None, title_from_json=None, authors_
                 'issue': issue,
                 'pages': pages,
                 'publisher': publisher,
-                'citations': None  # Placeholder for citation count
+                'issn': issn,
+                'venue': venue_from_json or '',
+                'citations': citations  # Cited-by count from the Scholar profile
             }
         }
         
@@ -178,7 +177,9 @@ def read_articles_from_json(filename):
                         'title': item.get('title', ''),
                         'authors': item.get('authors', ''),
                         'year': item.get('year', ''),
-                        'link': item.get('link', '')
+                        'link': item.get('link', ''),
+                        'venue': item.get('venue', ''),
+                        'citations': item.get('citations')
                     })
         
         return articles
@@ -186,30 +187,43 @@ def read_articles_from_json(filename):
         print(f"Error reading JSON file {filename}: {e}")
         return []
 
-def process_articles(articles):
+def process_articles(articles, preprint_links=None):
     """Process articles and generate BibTeX entries"""
     results = []
     failed_dois = []
     skipped_preprints = []
     
+    if preprint_links is None:
+        preprint_links = link_preprints(articles)
+    known_dois = {article['doi'].lower() for article in articles}
+    
     print(f"Processing {len(articles)} articles...")
     print("=" * 50)
     
     for i, article in enumerate(articles, 1):
         doi = article['doi']
+        year = article.get('year')
         print(f"[{i}/{len(articles)}] Processing: {doi}")
         
-        # Skip preprints
+        # Replace preprints with their published versions, skip the rest
         if is_preprint(doi):
-            skipped_preprints.append(article)
-            print(f"  ⚠ Skipped preprint")
-            continue
+            published_doi = preprint_links.get(doi, {}).get('doi', '')
+            if not published_doi or published_doi.lower() in known_dois:
+                skipped_preprints.append(article)
+                print(f"  ⚠ Skipped preprint")
+                continue
+            print(f"  ↪ Using published version: {published_doi}")
+            known_dois.add(published_doi.lower())
+            doi = published_doi
+            year = preprint_links[article['doi']].get('year')
         
         result = get_bibtex_from_doi(
             doi, 
-            year_from_json=article.get('year'),
+            year_from_json=year,
             title_from_json=article.get('title'),
-            authors_from_json=article.get('authors')
+            authors_from_json=article.get('authors'),
+            citations_from_json=article.get('citations'),
+            venue_from_json=article.get('venue')
         )
         
         if result:
@@ -260,6 +274,7 @@ def main():
     parser.add_argument('--output', '-o', default='central uni grant/my_bib.bib', help='Output BibTeX file')
     parser.add_argument('--metadata', '-m', help='Output metadata JSON file')
     parser.add_argument('--failed', '-f', help='Output file for failed DOIs')
+    parser.add_argument('--links', '-l', help='Preprint -> published mapping JSON (from preprint_linker.py)')
     
     args = parser.parse_args()
     
@@ -283,8 +298,14 @@ def main():
     print(f"Found {len(articles)} articles in {args.input}")
     print()
     
+    # Load precomputed preprint links, if any
+    preprint_links = None
+    if args.links:
+        with open(args.links, 'r', encoding='utf-8') as f:
+            preprint_links = json.load(f)
+    
     # Process articles
-    results, failed_dois, skipped_preprints = process_articles(articles)
+    results, failed_dois, skipped_preprints = process_articles(articles, preprint_links)
     
     # Save results
     if results:
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Классификация текстов по ключевым словам автоматом Ахо-Корасик.
+
+Все ключевые слова таксономии компилируются в один автомат, поэтому текст
+просматривается за один проход независимо от числа ключевых слов.
+Совпадения учитываются только на границах слов: "ai" не находится внутри
+"maintain". Ключевое слово со звездочкой на конце ("tractor*")
+совпадает с любым словом, начинающимся с него ("tractors").
+
+Таксономия задается JSON файлом вида
+{"area": {"name": "Название", "keywords": ["kw1", "kw2*"]}}.
+"""
+
+import argparse
+import json
+import sys
+from collections import deque
+from pathlib import Path
+
+
+# Таксономия по умолчанию рядом со скриптом
+DEFAULT_TAXONOMY_FILE = Path(__file__).with_name('research_areas.json')
+
+
+def normalize_text(text):
+    """Нижний регистр и одиночные пробелы, как у ключевых слов автомата."""
+    return ' '.join((text or '').lower().split())
+
+
+def build_automaton(keywords):
+    """
+    Строит автомат Ахо-Корасик.
+
+    keywords — словарь {ключевое слово: метка}. Возвращает словарь с
+    таблицей переходов (список словарей), суффиксными ссылками и выходами:
+    для каждого состояния список (длина слова, метка, префиксное ли слово).
+    """
+    goto = [{}]
+    outputs = [[]]
+    for keyword, label in keywords.items():
+        prefix = keyword.endswith('*')
+        word = normalize_text(keyword.rstrip('*'))
+        if not word:
+            continue
+        state = 0
+        for char in word:
+            if char not in goto[state]:
+                goto.append({})
+                outputs.append([])
+                goto[state][char] = len(goto) - 1
+            state = goto[state][char]
+        outputs[state].append((len(word), label, prefix))
+
+    # Суффиксные ссылки обходом в ширину; выходы наследуются по ссылкам
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for char, child in goto[state].items():
+            queue.append(child)
+            link = fail[state]
+            while link and char not in goto[link]:
+                link = fail[link]
+            fail[child] = goto[link].get(char, 0)
+            outputs[child] = outputs[child] + outputs[fail[child]]
+
+    return {'goto': goto, 'fail': fail, 'outputs': outputs}
+
+
+def _is_word_char(char):
+    """Символ слова: буква или цифра."""
+    return char.isalnum()
+
+
+def find_keywords(automaton, text):
+    """
+    Находит ключевые слова в тексте за один проход.
+
+    Возвращает список (начало, конец, метка) совпадений на границах слов;
+    text должен быть нормализован normalize_text.
+    """
+    goto, fail, outputs = automaton['goto'], automaton['fail'], automaton['outputs']
+    matches = []
+    state = 0
+    for end, char in enumerate(text, 1):
+        while state and char not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(char, 0)
+        for length, label, prefix in outputs[state]:
+            start = end - length
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if not prefix and end < len(text) and _is_word_char(text[end]):
+                continue
+            matches.append((start, end, label))
+    return matches
+
+
+def load_taxonomy(taxonomy_file=DEFAULT_TAXONOMY_FILE):
+    """Загружает таксономию: {область: {'name': ..., 'keywords': [...]}}."""
+    with open(taxonomy_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_classifier(taxonomy):
+    """Компилирует таксономию в автомат с метками-областями."""
+    keywords = {}
+    for area, description in taxonomy.items():
+        for keyword in description.get('keywords', []):
+            keywords.setdefault(keyword.lower(), area)
+    automaton = build_automaton(keywords)
+    automaton['areas'] = list(taxonomy)
+    return automaton
+
+
+def classify(classifier, *texts):
+    """Множество областей, ключевые слова которых встречаются в текстах."""
+    # Тексты разделяются переводом строки, чтобы слова на стыке не склеивались
+    text = '\n'.join(normalize_text(text) for text in texts)
+    return {label for _, _, label in find_keywords(classifier, text)}
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Classify text lines by keyword taxonomy')
+    parser.add_argument('input', help='Text file, one title per line')
+    parser.add_argument('--taxonomy', '-t', default=str(DEFAULT_TAXONOMY_FILE), help='Taxonomy JSON file')
+
+    args = parser.parse_args()
+
+    for filename in (args.input, args.taxonomy):
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+
+    classifier = build_classifier(load_taxonomy(args.taxonomy))
+    with open(args.input, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                print(f"{', '.join(sorted(classify(classifier, line))) or '-'}\t{line.strip()}")
+
+
+if __name__ == "__main__":
+    main()
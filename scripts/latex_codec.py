@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Преобразование текста между Unicode и LaTeX.
+
+escape_latex экранирует специальные символы LaTeX (& % $ # _ { } ~ ^ \\),
+буквы с диакритикой и типографские символы по заранее построенной
+таблице за один проход, поэтому названия и имена из CrossRef можно
+подставлять в bib файлы без риска сломать сборку. unescape_latex
+выполняет обратное преобразование одним проходом скомпилированного
+регулярного выражения по таблице обратных замен и дополнительно
+понимает распространенные варианты записи (\\"{o}, {\\"{o}}, \\c c).
+Для любой строки выполняется unescape_latex(escape_latex(text)) == text.
+
+Кириллица не экранируется: документы собираются с inputenc/T2A.
+"""
+
+import argparse
+import re
+import sys
+import unicodedata
+from pathlib import Path
+
+
+# Специальные символы LaTeX
+SPECIAL_CHARS = {
+    '\\': r'\textbackslash{}',
+    '{': r'\{',
+    '}': r'\}',
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '_': r'\_',
+    '~': r'\textasciitilde{}',
+    '^': r'\textasciicircum{}',
+}
+
+# Типографские символы, которые pdflatex с utf8 не всегда знает
+TYPOGRAPHIC_CHARS = {
+    '–': r'\textendash{}',
+    '—': r'\textemdash{}',
+    '\u2010': r'\mbox{-}',
+    '‘': r'\textquoteleft{}',
+    '’': r'\textquoteright{}',
+    '“': r'\textquotedblleft{}',
+    '”': r'\textquotedblright{}',
+    '\u00a0': r'\nobreakspace{}',
+    '…': r'\textellipsis{}',
+}
+
+# Буквы без разложения на основу и диакритический знак
+SPECIAL_LETTERS = {
+    'ß': r'{\ss}', 'ø': r'{\o}', 'Ø': r'{\O}', 'æ': r'{\ae}', 'Æ': r'{\AE}',
+    'œ': r'{\oe}', 'Œ': r'{\OE}', 'ł': r'{\l}', 'Ł': r'{\L}', 'ı': r'{\i}',
+}
+
+# Комбинируемые знаки Unicode -> команды LaTeX
+ACCENTS = {
+    '̀': '`', '́': "'", '̂': '^', '̃': '~', '̈': '"',
+    '̄': '=', '̇': '.', '̊': 'r', '̋': 'H', '̌': 'v',
+    '̆': 'u', '̧': 'c', '̨': 'k',
+}
+
+
+def _accent_forms(command, base):
+    """Варианты записи буквы с диакритикой; первый — канонический для escape_latex."""
+    if command.isalpha():
+        return [f'{{\\{command}{{{base}}}}}', f'\\{command}{{{base}}}', f'{{\\{command} {base}}}', f'\\{command} {base}']
+    return [f'{{\\{command}{base}}}', f'\\{command}{{{base}}}', f'{{\\{command}{{{base}}}}}', f'\\{command}{base}']
+
+
+def _build_tables():
+    """Строит таблицы прямых и обратных замен."""
+    encode = dict(SPECIAL_CHARS)
+    encode.update(TYPOGRAPHIC_CHARS)
+    encode.update(SPECIAL_LETTERS)
+
+    decode = {escaped: char for char, escaped in encode.items()}
+    # Латиница с диакритикой: Latin-1 Supplement и Latin Extended-A
+    for code in range(0xC0, 0x180):
+        char = chr(code)
+        decomposition = unicodedata.normalize('NFD', char)
+        if char in encode or len(decomposition) != 2 or decomposition[1] not in ACCENTS:
+            continue
+        base = decomposition[0]
+        forms = _accent_forms(ACCENTS[decomposition[1]], base)
+        encode[char] = forms[0]
+        for form in forms:
+            decode.setdefault(form, char)
+        if base == 'i':
+            for form in _accent_forms(ACCENTS[decomposition[1]], '\\i'):
+                decode.setdefault(form, char)
+
+    return encode, decode
+
+
+ENCODE_MAP, DECODE_MAP = _build_tables()
+
+# Символы, требующие экранирования
+ESCAPE_RE = re.compile('[' + ''.join(re.escape(char) for char in ENCODE_MAP) + ']')
+
+# Последовательности всех форм, которые строит _build_tables; найденная
+# последовательность переводится по DECODE_MAP, неизвестная остается как есть
+_LETTER = r'(?:\\i|[A-Za-z])'
+_ACCENTED = rf'''[`'^~"=.](?:\{{{_LETTER}\}}|{_LETTER})|[rHvuck](?:\{{{_LETTER}\}}| {_LETTER})'''
+DECODE_RE = re.compile(
+    rf'\{{\\(?:{_ACCENTED}|[A-Za-z]+)\}}'
+    rf'|\\(?:{_ACCENTED}|mbox\{{-\}}|[A-Za-z]+\{{\}}|[{{}}&%$#_])'
+)
+
+
+def escape_latex(text):
+    """Экранирует текст для подстановки в LaTeX/BibTeX."""
+    if not text:
+        return text or ''
+    return ESCAPE_RE.sub(lambda match: ENCODE_MAP[match.group(0)], text)
+
+
+def unescape_latex(text):
+    """Преобразует экранированный LaTeX текст обратно в Unicode."""
+    if not text or '\\' not in text:
+        return text or ''
+    return DECODE_RE.sub(lambda match: DECODE_MAP.get(match.group(0), match.group(0)), text)
+
+
+def unescape_fields(entry):
+    """Значения полей записи bib_parser в Unicode."""
+    return {name: unescape_latex(value) for name, value in entry['fields'].items()}
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Convert text between Unicode and LaTeX escapes')
+    parser.add_argument('input', help='Input text file')
+    parser.add_argument('output', help='Output text file')
+    parser.add_argument('--decode', '-d', action='store_true', help='Convert LaTeX escapes to Unicode instead')
+
+    args = parser.parse_args()
+
+    if not Path(args.input).exists():
+        print(f"Ошибка: файл {args.input} не найден")
+        sys.exit(1)
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    converted = unescape_latex(text) if args.decode else escape_latex(text)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(converted)
+
+    print(f"Файл сохранен как: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
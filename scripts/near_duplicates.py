@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Поиск почти дублирующихся записей по названиям (MinHash/LSH).
+
+Точная проверка в check_duplicates.py пропускает версии препринта и
+журнальной статьи с небольшими отличиями в словах и пунктуации, а попарное
+нечеткое сравнение квадратично по числу записей. Здесь названия
+нормализуются и разбиваются на символьные шинглы, для каждого названия
+строится сигнатура MinHash, а LSH-бакеты по полосам сигнатуры служат
+блокировкой: сравниваются только записи, попавшие в общий бакет. Кандидаты
+проверяются точным коэффициентом Жаккара и объединяются в кластеры.
+"""
+
+import argparse
+import json
+import re
+import sys
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from bib_parser import parse_bibtex_files
+from latex_codec import unescape_latex
+
+
+MAX_HASH = (1 << 64) - 1
+# Основание полиномиального хеша шинглов
+SHINGLE_BASE = np.uint64(1000003)
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 64
+DEFAULT_SHINGLE_SIZE = 4
+# Бакеты больше этого размера не раскрываются в пары (защита от квадратичного роста)
+DEFAULT_MAX_BUCKET = 200
+
+
+def normalize_title(title):
+    """Нормализует название: без LaTeX-разметки, диакритики, пунктуации и регистра."""
+    title = re.sub(r'\\[a-zA-Z]+\s*', ' ', unescape_latex(title))
+    if not title.isascii():
+        title = unicodedata.normalize('NFKD', title)
+        title = ''.join(char for char in title if not unicodedata.combining(char))
+    title = re.sub(r'[^\w\s]', ' ', title.lower())
+    return re.sub(r'\s+', ' ', title).strip()
+
+
+def title_shingles(title, size=DEFAULT_SHINGLE_SIZE):
+    """Множество символьных шинглов нормализованного названия."""
+    normalized = normalize_title(title)
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def jaccard(shingles1, shingles2):
+    """Коэффициент Жаккара двух множеств шинглов."""
+    if not shingles1 or not shingles2:
+        return 0.0
+    return len(shingles1 & shingles2) / len(shingles1 | shingles2)
+
+
+def make_permutations(num_perm=DEFAULT_NUM_PERM, seed=1):
+    """
+    Коэффициенты (a, b) хеш-функций multiply-shift: ((a * x + b) mod 2^64) >> 32.
+
+    Переполнение uint64 здесь и есть взятие по модулю 2^64, поэтому хеш
+    считается без дорогого деления.
+    """
+    generator = np.random.RandomState(seed)
+    a = generator.randint(0, MAX_HASH, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = generator.randint(0, MAX_HASH, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signatures(titles, permutations, shingle_size=DEFAULT_SHINGLE_SIZE, chunk_size=2048):
+    """
+    Сигнатуры MinHash для списка непустых нормализованных названий.
+
+    Шинглы не материализуются как строки: названия порции склеиваются в
+    один массив кодов символов, хеши всех окон длины shingle_size
+    считаются векторно, а минимумы по названиям берутся через
+    np.minimum.reduceat. Повторы шинглов не влияют на минимум, поэтому
+    результат совпадает с MinHash по множеству шинглов.
+    """
+    a, b = permutations
+    multipliers = SHINGLE_BASE ** np.arange(shingle_size - 1, -1, -1, dtype=np.uint64)
+    signatures = np.empty((len(titles), len(a)), dtype=np.uint32)
+    for chunk_start in range(0, len(titles), chunk_size):
+        # Короткие названия дополняются до длины шингла
+        chunk = [title.ljust(shingle_size, '\0') for title in titles[chunk_start:chunk_start + chunk_size]]
+        codes = np.frombuffer(''.join(chunk).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+        lengths = np.array([len(title) for title in chunk])
+        ends = np.cumsum(lengths)
+
+        window_count = len(codes) - shingle_size + 1
+        hashes = np.zeros(window_count, dtype=np.uint64)
+        for shift, multiplier in enumerate(multipliers):
+            hashes += codes[shift:shift + window_count] * multiplier
+
+        # Окна, не выходящие за границу своего названия
+        owners = np.repeat(np.arange(len(chunk)), lengths)[:window_count]
+        valid = np.arange(window_count) + shingle_size <= ends[owners]
+        offsets = np.r_[0, np.cumsum(lengths - shingle_size + 1)[:-1]]
+
+        values = (np.outer(a, hashes[valid]) + b[:, None]) >> np.uint64(32)
+        minima = np.minimum.reduceat(values, offsets, axis=1)
+        signatures[chunk_start:chunk_start + len(chunk)] = minima.T
+    return signatures
+
+
+def choose_bands(num_perm, threshold):
+    """
+    Подбирает число полос b и строк r (b * r <= num_perm), при которых
+    порог срабатывания LSH (1/b)^(1/r) ближе всего к заданному.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if bands == 0:
+            break
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+def lsh_buckets(signatures, bands, rows, max_bucket=DEFAULT_MAX_BUCKET):
+    """
+    Генерирует LSH-бакеты (массивы номеров строк signatures) размером от 2 до max_bucket.
+
+    Каждая полоса сигнатуры сворачивается в одно 64-битное значение, после
+    чего записи с равными значениями группируются сортировкой, без словаря
+    и цикла Python по записям.
+    """
+    mixer = np.random.RandomState(0).randint(0, MAX_HASH, size=rows, dtype=np.uint64) | np.uint64(1)
+    for band in range(bands):
+        band_values = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        band_hashes = (band_values * mixer).sum(axis=1)
+        order = np.argsort(band_hashes, kind='stable')
+        sorted_hashes = band_hashes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_hashes[1:] != sorted_hashes[:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        for start, size in zip(starts[(sizes >= 2) & (sizes <= max_bucket)],
+                               sizes[(sizes >= 2) & (sizes <= max_bucket)]):
+            yield order[start:start + size]
+
+
+def _find(parent, i):
+    """Корень множества с сжатием путей."""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_near_duplicates(articles, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM,
+                         shingle_size=DEFAULT_SHINGLE_SIZE, max_bucket=DEFAULT_MAX_BUCKET):
+    """
+    Находит кластеры почти одинаковых названий.
+
+    articles — список словарей с ключами ``key`` и ``title``. Возвращает
+    список кластеров: ключи записей, пары с их сходством и максимальное
+    сходство, по убыванию максимального сходства.
+    """
+    permutations = make_permutations(num_perm)
+    bands, rows = choose_bands(num_perm, threshold)
+
+    titles = [normalize_title(article['title']) for article in articles]
+
+    # Блокировка: сравниваются только записи с совпадающей полосой сигнатуры
+    indexed = [index for index, title in enumerate(titles) if title]
+    signatures = minhash_signatures([titles[index] for index in indexed], permutations, shingle_size)
+
+    candidates = set()
+    for members in lsh_buckets(signatures, bands, rows, max_bucket):
+        members = [indexed[i] for i in members]
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                candidates.add((first, second))
+
+    # Проверка кандидатов точным коэффициентом Жаккара
+    shingle_sets = {}
+    for index in {index for pair in candidates for index in pair}:
+        shingle_sets[index] = title_shingles(titles[index], shingle_size)
+
+    parent = list(range(len(articles)))
+    scored_pairs = []
+    for first, second in sorted(candidates):
+        similarity = jaccard(shingle_sets[first], shingle_sets[second])
+        if similarity >= threshold:
+            scored_pairs.append((first, second, similarity))
+            parent[_find(parent, first)] = _find(parent, second)
+
+    clusters = defaultdict(lambda: {'members': set(), 'pairs': []})
+    for first, second, similarity in scored_pairs:
+        cluster = clusters[_find(parent, first)]
+        cluster['members'].update((first, second))
+        cluster['pairs'].append((first, second, similarity))
+
+    results = []
+    for cluster in clusters.values():
+        results.append({
+            'keys': [articles[i]['key'] for i in sorted(cluster['members'])],
+            'titles': [articles[i]['title'] for i in sorted(cluster['members'])],
+            'pairs': [
+                {
+                    'keys': [articles[first]['key'], articles[second]['key']],
+                    'similarity': round(similarity, 3),
+                }
+                for first, second, similarity in cluster['pairs']
+            ],
+            'max_similarity': round(max(pair[2] for pair in cluster['pairs']), 3),
+        })
+
+    results.sort(key=lambda cluster: (-cluster['max_similarity'], cluster['keys']))
+    return results
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Find near-duplicate BibTeX entries by title (MinHash/LSH)')
+    parser.add_argument('inputs', nargs='+', help='Input BibTeX files')
+    parser.add_argument('--threshold', '-t', type=float, default=DEFAULT_THRESHOLD, help='Jaccard similarity threshold')
+    parser.add_argument('--num-perm', type=int, default=DEFAULT_NUM_PERM, help='Number of MinHash permutations')
+    parser.add_argument('--shingle-size', type=int, default=DEFAULT_SHINGLE_SIZE, help='Character shingle size')
+    parser.add_argument('--max-bucket', type=int, default=DEFAULT_MAX_BUCKET, help='Skip LSH buckets larger than this')
+    parser.add_argument('--output', '-o', default='near_duplicate_analysis.json', help='Output JSON file')
+
+    args = parser.parse_args()
+
+    for filename in args.inputs:
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+
+    articles = [
+        {'key': entry['key'], 'title': entry['fields']['title']}
+        for entries in parse_bibtex_files(args.inputs)
+        for entry in entries
+        if entry['fields'].get('title')
+    ]
+    print(f"📊 Всего статей с названием: {len(articles)}")
+
+    clusters = find_near_duplicates(
+        articles, args.threshold, args.num_perm, args.shingle_size, args.max_bucket
+    )
+
+    if not clusters:
+        print("✅ Почти одинаковых названий не найдено!")
+    else:
+        print(f"\n⚠️  Найдено {len(clusters)} кластеров похожих названий:")
+        for i, cluster in enumerate(clusters, 1):
+            print(f"\n{i}. Максимальное сходство: {cluster['max_similarity']}")
+            for key, title in zip(cluster['keys'], cluster['titles']):
+                print(f"   - {key}: {title}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'threshold': args.threshold, 'clusters': clusters}, f, ensure_ascii=False, indent=2)
+
+    print(f"\n📄 Результаты сохранены в файл: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Инкрементальный запуск цепочки скриптов обработки публикаций.
+
+Этапы (сбор данных из Google Scholar -> BibTeX -> удаление дубликатов ->
+переименование ключей -> \\nocite в LaTeX -> статистика) описаны вместе с
+входными и выходными файлами и образуют граф зависимостей: этап зависит от
+тех этапов, чьи выходы он читает. Для каждого этапа хранится SHA-256 его
+входов (включая сам скрипт, импортируемые им модули из scripts/, файлы
+настроек и аргументы) и выходов. Этап перезапускается,
+только если изменился какой-либо вход или выход пропал/был изменен извне;
+независимые этапы выполняются параллельно. Этап сбора данных читает
+внешний источник, у которого нет хешируемых входов, поэтому он
+перезапускается, когда его результат старше max_age_days.
+Каждый файл записывает только один этап.
+
+Пути задаются относительно корня репозитория, скрипт запускается из него.
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+
+# Файл с хешами последнего успешного запуска этапов
+DEFAULT_STATE_FILE = 'data/pipeline_state.json'
+
+SCRIPTS_DIR = 'scripts'
+SCHOLAR_JSON = 'found_dois_ajax.json'
+GENERATED_BIB = 'data/generated.bib'
+DEDUPLICATED_BIB = 'data/deduplicated.bib'
+FINAL_BIB = 'central uni grant/my_bib.bib'
+LATEX_FILE = 'central uni grant/Osinenko_list_of_papers_no_preprints.tex'
+
+# Файлы настроек, которые скрипты читают рядом с собой
+TAXONOMY_FILE = f'{SCRIPTS_DIR}/research_areas.json'
+RESEARCHERS_FILE = f'{SCRIPTS_DIR}/researchers.json'
+JOURNALS_FILE = f'{SCRIPTS_DIR}/journal_names.json'
+RULES_FILE = f'{SCRIPTS_DIR}/russian_rules.json'
+
+# Этапы в порядке README: имя, команда, входы, выходы (и срок годности результата;
+# модули, импортируемые скриптом этапа, учитываются автоматически)
+STAGES = [
+    {
+        'name': 'scrape',
+        'command': [f'{SCRIPTS_DIR}/scrape_dois_ajax.py', '-o', SCHOLAR_JSON],
+        'inputs': [],
+        'outputs': [SCHOLAR_JSON],
+        # Цитирования в профиле меняются без изменения локальных файлов
+        'max_age_days': 7,
+    },
+    {
+        'name': 'bibtex',
+        'command': [f'{SCRIPTS_DIR}/json_to_bibtex_enhanced.py', '-i', SCHOLAR_JSON, '-o', GENERATED_BIB,
+                    '-m', 'data/articles_metadata.json'],
+        'inputs': [SCHOLAR_JSON],
+        'outputs': [GENERATED_BIB, 'data/articles_metadata.json'],
+    },
+    {
+        'name': 'dedup',
+        'command': [f'{SCRIPTS_DIR}/dedup_engine.py', GENERATED_BIB, '-o', DEDUPLICATED_BIB,
+                    '-r', 'data/key_redirects.json'],
+        'inputs': [GENERATED_BIB],
+        'outputs': [DEDUPLICATED_BIB, 'data/key_redirects.json'],
+    },
+    {
+        'name': 'naming',
+        'command': [f'{SCRIPTS_DIR}/convert_bib_naming.py', DEDUPLICATED_BIB, FINAL_BIB],
+        'inputs': [DEDUPLICATED_BIB],
+        'outputs': [FINAL_BIB, str(Path(FINAL_BIB).with_suffix('.keymap.json'))],
+    },
+    {
+        'name': 'citations',
+        'command': [f'{SCRIPTS_DIR}/add_citations.py', '--bib', FINAL_BIB, '--tex', LATEX_FILE],
+        'inputs': [FINAL_BIB, LATEX_FILE],
+        'outputs': [LATEX_FILE],
+    },
+    {
+        'name': 'analyze',
+        'command': [f'{SCRIPTS_DIR}/analyze_publications.py'],
+        'inputs': [FINAL_BIB, TAXONOMY_FILE, RESEARCHERS_FILE, JOURNALS_FILE, RULES_FILE],
+        'outputs': ['publication_stats.json', 'publication_stats_latex.txt'],
+    },
+]
+
+
+def file_hash(path):
+    """SHA-256 содержимого файла или None, если файла нет."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def stage_dependencies(stages):
+    """
+    Зависимости этапов: имя этапа -> множество этапов, чьи выходы он читает.
+
+    Каждый файл должен быть выходом не более чем одного этапа, иначе
+    этапы перезаписывали бы результаты друг друга незаметно для графа,
+    а граф не должен содержать циклов, иначе ни один этап цикла не станет готовым.
+    """
+    producers = {}
+    for stage in stages:
+        for output in stage['outputs']:
+            if output in producers:
+                raise ValueError(f"файл {output} записывают этапы {producers[output]} и {stage['name']}")
+            producers[output] = stage['name']
+
+    dependencies = {}
+    for stage in stages:
+        dependencies[stage['name']] = {
+            producers[path] for path in stage['inputs']
+            if path in producers and producers[path] != stage['name']
+        }
+
+    # Проверка на циклы: этапы без невыполненных зависимостей снимаются по одному
+    remaining = {name: set(deps) for name, deps in dependencies.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"циклическая зависимость этапов: {', '.join(sorted(remaining))}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return dependencies
+
+
+def local_modules(script):
+    """
+    Модули из каталога скрипта, которые он импортирует (транзитивно).
+
+    Импорты ищутся по синтаксическому дереву, включая импорты внутри
+    функций, поэтому список не нужно поддерживать вручную.
+    """
+    directory = Path(script).parent
+    modules = set()
+    pending = [Path(script)]
+    while pending:
+        path = pending.pop()
+        try:
+            tree = ast.parse(path.read_text(encoding='utf-8'))
+        except (OSError, SyntaxError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = directory / f"{name.split('.')[0]}.py"
+                if module.exists() and module.as_posix() not in modules:
+                    modules.add(module.as_posix())
+                    pending.append(module)
+    return sorted(modules)
+
+
+def input_fingerprint(stage):
+    """Хеши входов этапа: файлы данных, сам скрипт, его модули и командная строка."""
+    # modules — необязательный список модулей, которые не видны по импортам скрипта
+    paths = stage['inputs'] + stage['command'][:1] + local_modules(stage['command'][0]) + stage.get('modules', [])
+    fingerprint = {path: file_hash(path) for path in paths}
+    fingerprint['command'] = ' '.join(stage['command'])
+    return fingerprint
+
+
+def output_fingerprint(stage):
+    """Хеши выходов этапа."""
+    return {path: file_hash(path) for path in stage['outputs']}
+
+
+def is_stale(stage, state):
+    """Этап устарел: нет записи о запуске, изменились входы или выходы, истек срок годности."""
+    previous = state.get(stage['name'])
+    if not previous:
+        return True
+    if 'max_age_days' in stage and time.time() - previous.get('time', 0) > stage['max_age_days'] * 86400:
+        return True
+    if previous['inputs'] != input_fingerprint(stage):
+        return True
+    outputs = output_fingerprint(stage)
+    return None in outputs.values() or previous['outputs'] != outputs
+
+
+def run_stage(stage, state, force=False):
+    """
+    Выполняет этап, если он устарел.
+
+    Возвращает 'skipped', 'done' или 'failed'. Хеши входов записываются после
+    выполнения, поэтому этапы, изменяющие свои входы на месте
+    (add_citations.py), при повторном запуске не считаются устаревшими.
+    """
+    if not force and not is_stale(stage, state):
+        return 'skipped'
+
+    print(f"[{stage['name']}] {' '.join(stage['command'])}")
+    result = subprocess.run([sys.executable] + stage['command'])
+    if result.returncode != 0:
+        return 'failed'
+
+    state[stage['name']] = {
+        'inputs': input_fingerprint(stage),
+        'outputs': output_fingerprint(stage),
+        'time': time.time(),
+    }
+    return 'done'
+
+
+def load_state(state_file):
+    """Загружает хеши предыдущих запусков."""
+    if not Path(state_file).exists():
+        return {}
+    with open(state_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state, state_file):
+    """Сохраняет хеши запусков."""
+    Path(state_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(state_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def run_pipeline(stages, state_file=DEFAULT_STATE_FILE, force=(), jobs=4):
+    """
+    Выполняет граф этапов, запуская готовые независимые этапы параллельно.
+
+    Этап запускается после завершения всех этапов, от которых он зависит;
+    решение о пропуске принимается в этот момент, по актуальным хешам.
+    Если этап завершился с ошибкой, зависящие от него этапы не выполняются.
+    Возвращает словарь {имя этапа: статус}.
+    """
+    dependencies = stage_dependencies(stages)
+    by_name = {stage['name']: stage for stage in stages}
+    state = load_state(state_file)
+    status = {}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while len(status) < len(stages):
+            for name, stage_deps in dependencies.items():
+                if name in status or name in running.values():
+                    continue
+                if any(status.get(dep) in ('failed', 'blocked') for dep in stage_deps):
+                    status[name] = 'blocked'
+                elif all(dep in status for dep in stage_deps):
+                    future = executor.submit(run_stage, by_name[name], state, name in force)
+                    running[future] = name
+
+            if not running:
+                if len(status) < len(stages):
+                    # Ни один этап не готов и ничего не выполняется: дальше ждать нечего
+                    for name in dependencies:
+                        status.setdefault(name, 'blocked')
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                status[name] = future.result()
+                print(f"[{name}] {status[name]}")
+                save_state(dict(state), state_file)
+
+    return status
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Run the publication pipeline, re-executing only stale stages')
+    parser.add_argument('--force', '-f', action='append', default=[], help='Stage to re-run regardless of hashes (repeatable)')
+    parser.add_argument('--jobs', '-j', type=int, default=4, help='Maximum number of stages run in parallel')
+    parser.add_argument('--state', default=DEFAULT_STATE_FILE, help='JSON file with hashes of previous runs')
+    parser.add_argument('--dry-run', action='store_true', help='Only list stages that are stale now')
+
+    args = parser.parse_args()
+
+    names = {stage['name'] for stage in STAGES}
+    for name in args.force:
+        if name not in names:
+            print(f"Ошибка: неизвестный этап {name}, доступны: {', '.join(sorted(names))}")
+            sys.exit(1)
+
+    if args.dry_run:
+        state = load_state(args.state)
+        for stage in STAGES:
+            stale = stage['name'] in args.force or is_stale(stage, state)
+            print(f"{stage['name']}: {'устарел' if stale else 'актуален'}")
+        return
+
+    try:
+        status = run_pipeline(STAGES, args.state, set(args.force), args.jobs)
+    except ValueError as error:
+        print(f"Ошибка: {error}")
+        sys.exit(1)
+
+    print("\nИтог:")
+    for stage in STAGES:
+        print(f"  {stage['name']}: {status[stage['name']]}")
+    if any(value in ('failed', 'blocked') for value in status.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Связывание препринтов с опубликованными версиями.
+
+Опубликованные записи индексируются по паре (нормализованное название,
+фамилия первого автора), и каждый препринт (arXiv и др.) сопоставляется с
+опубликованной версией за один проход: препринт, встреченный раньше своей
+публикации, ждет ее в очереди по тому же ключу. Результат — отображение
+DOI (или ключа) препринта на DOI опубликованной версии, которое генераторы
+BibTeX используют для автоматической подстановки.
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+from bib_parser import parse_bibtex_files
+from latex_codec import unescape_fields
+from near_duplicates import normalize_title
+
+
+# Одно регулярное выражение вместо цикла по отдельным шаблонам серверов препринтов
+PREPRINT_RE = re.compile(
+    r'arxiv|biorxiv|medrxiv|chemrxiv|osf\.io|preprints\.org|researchsquare\.com|ssrn',
+    re.IGNORECASE,
+)
+
+
+def is_preprint_doi(doi):
+    """Проверяет, что DOI или ссылка указывает на сервер препринтов."""
+    return bool(PREPRINT_RE.search(doi or ''))
+
+
+def is_preprint_record(record):
+    """Препринт: DOI, ссылка или место публикации указывают на сервер препринтов."""
+    return any(
+        PREPRINT_RE.search(record.get(field) or '')
+        for field in ('doi', 'link', 'url', 'journal')
+    )
+
+
+def first_author_surname(authors):
+    """
+    Нормализованная фамилия первого автора.
+
+    Принимает список авторов или строку в формате BibTeX ("A and B") либо
+    Google Scholar ("P Osinenko, S Streif").
+    """
+    if isinstance(authors, str):
+        if re.search(r'\s+and\s+', authors):
+            authors = re.split(r'\s+and\s+', authors)
+        else:
+            authors = authors.split(',')
+            # "Фамилия, Имя" без " and " — это один автор в формате BibTeX
+            if len(authors) == 2 and ' ' not in authors[0].strip():
+                authors = [','.join(authors)]
+    if not authors:
+        return ''
+
+    first = authors[0].strip()
+    if ',' in first:
+        surname = first.split(',')[0]
+    else:
+        parts = first.split()
+        surname = parts[-1] if parts else ''
+    return normalize_title(surname).replace(' ', '')
+
+
+def link_key(record):
+    """Ключ сопоставления: (нормализованное название, фамилия первого автора)."""
+    return normalize_title(record.get('title')), first_author_surname(record.get('authors') or record.get('author') or '')
+
+
+def record_id(record):
+    """Идентификатор записи в итоговом отображении: DOI или ключ."""
+    return record.get('doi') or record.get('key') or record.get('title')
+
+
+def link_preprints(records):
+    """
+    Сопоставляет препринты с опубликованными версиями за один проход.
+
+    Возвращает словарь {идентификатор препринта: описание опубликованной
+    версии} с полями ``doi``, ``key``, ``title`` и ``year``.
+    """
+    published_index = {}
+    waiting = {}
+    links = {}
+
+    def link(preprint, published):
+        links[record_id(preprint)] = {
+            'doi': published.get('doi', ''),
+            'key': published.get('key', ''),
+            'title': published.get('title', ''),
+            'year': published.get('year', ''),
+        }
+
+    for record in records:
+        key = link_key(record)
+        if not key[0]:
+            continue
+        if is_preprint_record(record):
+            if key in published_index:
+                link(record, published_index[key])
+            else:
+                waiting.setdefault(key, []).append(record)
+        elif key not in published_index:
+            published_index[key] = record
+            for preprint in waiting.pop(key, []):
+                link(preprint, record)
+
+    return links
+
+
+def bib_entry_to_record(entry):
+    """Приводит запись BibTeX к словарю с плоскими полями."""
+    record = unescape_fields(entry)
+    record['key'] = entry['key']
+    return record
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Link preprints to their published versions')
+    parser.add_argument('inputs', nargs='+', help='Input JSON (Scholar/metadata) or BibTeX files')
+    parser.add_argument('--output', '-o', default='preprint_links.json', help='Output JSON mapping')
+
+    args = parser.parse_args()
+
+    records = []
+    for filename in args.inputs:
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+        if filename.endswith('.json'):
+            with open(filename, 'r', encoding='utf-8') as f:
+                records.extend(item for item in json.load(f) if isinstance(item, dict))
+        else:
+            records.extend(bib_entry_to_record(entry) for entry in parse_bibtex_files([filename])[0])
+
+    preprints = sum(1 for record in records if is_preprint_record(record))
+    links = link_preprints(records)
+
+    print(f"Всего записей: {len(records)}")
+    print(f"Препринтов: {preprints}")
+    print(f"Связано с опубликованными версиями: {len(links)}")
+    for preprint, published in links.items():
+        print(f"  {preprint} -> {published['doi'] or published['key']}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(links, f, ensure_ascii=False, indent=2)
+
+    print(f"Отображение сохранено в файл: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Запросы к публикациям bib файла по индексам в памяти.
+
+Записи разбираются один раз, после чего строятся индексы: отсортированный
+по году (диапазоны находятся двоичным поиском), хэш-индексы значений
+журнала (journal или booktitle в каноническом виде journal_names), типа
+записи, DOI и ключа, а также индексы авторов и первых авторов по
+идентификаторам author_identity.
+
+Язык запросов:
+
+    year >= 2020 and type = article and first_author = osinenko
+    journal ~ ifac or (journal ~ "control systems" and not year < 2018)
+
+Поля: year, journal, type, doi, key, author, first_author. Операторы:
+= != < <= > >= и ~ (подстрока). Условия объединяются and, or, not и
+скобками. Для and сначала вычисляется самое избирательное условие по
+индексу, остальные проверяются векторно только на его кандидатах, поэтому
+полный перебор записей не выполняется.
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from author_identity import default_resolver, resolve, resolve_authors
+from bib_parser import parse_bibtex_file
+from columnar_export import MISSING, parse_year, split_authors
+from journal_names import canonical_journal
+from latex_codec import unescape_fields
+
+
+# Поля с хэш-индексом значений
+HASH_FIELDS = ('journal', 'type', 'doi', 'key')
+
+# Поля с индексом по идентификатору автора
+AUTHOR_FIELDS = ('author', 'first_author')
+
+COMPARISONS = {
+    '=': np.equal, '!=': np.not_equal,
+    '<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal,
+}
+
+TOKEN_RE = re.compile(r'''\s*(?:(?P<paren>[()])|(?P<field>\w+)\s*(?P<op>>=|<=|!=|=|<|>|~)\s*(?P<value>"(?:[^"\\]|\\.)*"|[^\s()]+)|(?P<word>\w+))''')
+
+
+def normalize_value(value):
+    """Значение для хэш-индекса: нижний регистр, одиночные пробелы."""
+    return ' '.join((value or '').lower().split())
+
+
+def build_postings(codes, size):
+    """Списки строк по кодам: массив строк, отсортированный по коду, и границы кодов."""
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(size + 1))
+    return order, bounds
+
+
+def build_engine(entries, resolver=None):
+    """Строит индексы по записям bib_parser."""
+    resolver = resolver or default_resolver()
+    count = len(entries)
+    engine = {'count': count, 'rows': np.arange(count), 'records': [], 'resolver': resolver}
+
+    values = {name: {} for name in HASH_FIELDS}
+    codes = {name: np.empty(count, dtype=np.int64) for name in HASH_FIELDS}
+    years = np.empty(count, dtype=np.int64)
+    first_authors = np.full(count, MISSING, dtype=np.int64)
+    author_rows = {}
+
+    for row, entry in enumerate(entries):
+        fields = unescape_fields(entry)
+        record = {
+            'key': entry['key'],
+            'type': entry['type'],
+            'year': fields.get('year', '').strip(),
+            'journal': canonical_journal(fields.get('journal') or fields.get('booktitle') or ''),
+            'doi': fields.get('doi', '').strip(),
+            'title': ' '.join(fields.get('title', '').split()),
+        }
+        engine['records'].append(record)
+        years[row] = parse_year(record['year'])
+        for name in HASH_FIELDS:
+            codes[name][row] = values[name].setdefault(normalize_value(record[name]), len(values[name]))
+
+        author_ids = resolve_authors(resolver, split_authors(fields.get('author')))
+        if author_ids:
+            first_authors[row] = author_ids[0]
+        for author_id in set(author_ids):
+            author_rows.setdefault(author_id, []).append(row)
+
+    # Индекс по году: строки в порядке возрастания года
+    engine['years'] = years
+    engine['year_order'] = np.argsort(years, kind='stable')
+    engine['sorted_years'] = years[engine['year_order']]
+
+    engine['values'] = {name: list(values[name]) for name in HASH_FIELDS}
+    engine['codes'] = codes
+    engine['postings'] = {name: build_postings(codes[name], len(values[name])) for name in HASH_FIELDS}
+    engine['lookup'] = values
+
+    engine['first_authors'] = first_authors
+    engine['author_rows'] = {author_id: np.array(rows, dtype=np.int64) for author_id, rows in author_rows.items()}
+    return engine
+
+
+def parse_query(text):
+    """Разбирает запрос в дерево: ('and'|'or', [узлы]), ('not', узел), ('atom', поле, оператор, значение)."""
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = TOKEN_RE.match(text, position)
+        if not match or match.end() == position:
+            raise ValueError(f"не удалось разобрать запрос с позиции {position}: {text[position:]!r}")
+        position = match.end()
+        if match.group('paren'):
+            tokens.append(match.group('paren'))
+        elif match.group('field'):
+            value = match.group('value')
+            if value.startswith('"'):
+                value = re.sub(r'\\(.)', r'\1', value[1:-1])
+            tokens.append(('atom', match.group('field').lower(), match.group('op'), value))
+        else:
+            word = match.group('word').lower()
+            if word not in ('and', 'or', 'not'):
+                raise ValueError(f"ожидалось условие или and/or/not, найдено {match.group('word')!r}")
+            tokens.append(word)
+
+    def expression(index):
+        node, index = conjunction(index)
+        children = [node]
+        while index < len(tokens) and tokens[index] == 'or':
+            node, index = conjunction(index + 1)
+            children.append(node)
+        return (children[0] if len(children) == 1 else ('or', children)), index
+
+    def conjunction(index):
+        node, index = unary(index)
+        children = [node]
+        while index < len(tokens) and tokens[index] == 'and':
+            node, index = unary(index + 1)
+            children.append(node)
+        return (children[0] if len(children) == 1 else ('and', children)), index
+
+    def unary(index):
+        if index >= len(tokens):
+            raise ValueError("неожиданный конец запроса")
+        token = tokens[index]
+        if token == 'not':
+            node, index = unary(index + 1)
+            return ('not', node), index
+        if token == '(':
+            node, index = expression(index + 1)
+            if index >= len(tokens) or tokens[index] != ')':
+                raise ValueError("не закрыта скобка")
+            return node, index + 1
+        if isinstance(token, tuple):
+            return token, index + 1
+        raise ValueError(f"неожиданный токен {token!r}")
+
+    if not tokens:
+        raise ValueError("пустой запрос")
+    tree, index = expression(0)
+    if index != len(tokens):
+        raise ValueError(f"лишний токен {tokens[index]!r}")
+    return tree
+
+
+def _matching_codes(engine, field, op, value):
+    """Коды значений поля, удовлетворяющих условию (перебор словаря значений, а не записей)."""
+    if field == 'journal' and op in ('=', '!='):
+        # Журналы в индексе канонизированы, поэтому и значение запроса приводится к каноническому
+        value = canonical_journal(value)
+    value = normalize_value(value)
+    if op == '=':
+        code = engine['lookup'][field].get(value)
+        return [] if code is None else [code]
+    if op == '~':
+        return [code for code, known in enumerate(engine['values'][field]) if value in known]
+    if op == '!=':
+        return [code for code, known in enumerate(engine['values'][field]) if known != value]
+    raise ValueError(f"оператор {op} не поддерживается для поля {field}")
+
+
+def _compile_atom(engine, field, op, value):
+    """Условие как (оценка числа строк, функция строк, функция проверки кандидатов)."""
+    if field == 'year':
+        if op == '~' or not value.isdigit():
+            raise ValueError(f"для year нужен числовой год и оператор сравнения: {field} {op} {value}")
+        year = int(value)
+        sorted_years = engine['sorted_years']
+        bounds = {
+            '=': (np.searchsorted(sorted_years, year, 'left'), np.searchsorted(sorted_years, year, 'right')),
+            '<': (np.searchsorted(sorted_years, MISSING, 'right'), np.searchsorted(sorted_years, year, 'left')),
+            '<=': (np.searchsorted(sorted_years, MISSING, 'right'), np.searchsorted(sorted_years, year, 'right')),
+            '>': (np.searchsorted(sorted_years, year, 'right'), len(sorted_years)),
+            '>=': (np.searchsorted(sorted_years, year, 'left'), len(sorted_years)),
+        }
+        compare = COMPARISONS[op]
+        test = lambda rows: compare(engine['years'][rows], year) & (engine['years'][rows] != MISSING)
+        if op == '!=':
+            return engine['count'], lambda: engine['rows'][test(engine['rows'])], test
+        start, end = bounds[op]
+        return end - start, lambda: engine['year_order'][start:end], test
+
+    if field in HASH_FIELDS:
+        matching = _matching_codes(engine, field, op, value)
+        order, bounds = engine['postings'][field]
+        estimate = sum(int(bounds[code + 1] - bounds[code]) for code in matching)
+
+        def rows():
+            parts = [order[bounds[code]:bounds[code + 1]] for code in matching]
+            return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+        codes = np.array(matching, dtype=np.int64)
+        return estimate, rows, lambda candidates: np.isin(engine['codes'][field][candidates], codes)
+
+    if field in AUTHOR_FIELDS:
+        if op not in ('=', '!='):
+            raise ValueError(f"для {field} поддерживаются только = и !=")
+        author_id = resolve(engine['resolver'], value)
+        if field == 'author':
+            posting = engine['author_rows'].get(author_id, np.empty(0, dtype=np.int64))
+            test = lambda candidates: np.isin(candidates, posting)
+            rows = lambda: posting
+            estimate = len(posting)
+        else:
+            posting = engine['author_rows'].get(author_id, np.empty(0, dtype=np.int64))
+            test = lambda candidates: engine['first_authors'][candidates] == author_id
+            rows = lambda: posting[test(posting)]
+            estimate = len(posting)
+        if op == '!=':
+            negated = lambda candidates: ~test(candidates)
+            return engine['count'] - estimate, lambda: engine['rows'][negated(engine['rows'])], negated
+        return estimate, rows, test
+
+    raise ValueError(f"неизвестное поле {field}")
+
+
+def compile_query(engine, node):
+    """Компилирует дерево запроса в (оценка, строки, проверка)."""
+    kind = node[0]
+    if kind == 'atom':
+        return _compile_atom(engine, *node[1:])
+
+    if kind == 'not':
+        estimate, _, test = compile_query(engine, node[1])
+        negated = lambda rows: ~test(rows)
+        return engine['count'] - estimate, lambda: engine['rows'][negated(engine['rows'])], negated
+
+    children = [compile_query(engine, child) for child in node[1]]
+    if kind == 'and':
+        # Пересечение: строки самого избирательного условия фильтруются остальными
+        children.sort(key=lambda child: child[0])
+
+        def rows():
+            candidates = children[0][1]()
+            for _, _, test in children[1:]:
+                if not len(candidates):
+                    break
+                candidates = candidates[test(candidates)]
+            return candidates
+
+        def test(candidates):
+            mask = np.ones(len(candidates), dtype=bool)
+            for _, _, child_test in children:
+                mask &= child_test(candidates)
+            return mask
+
+        return children[0][0], rows, test
+
+    def union_rows():
+        return unique_rows(engine, np.concatenate([child[1]() for child in children]))
+
+    def union_test(candidates):
+        mask = np.zeros(len(candidates), dtype=bool)
+        for _, _, child_test in children:
+            mask |= child_test(candidates)
+        return mask
+
+    return min(sum(child[0] for child in children), engine['count']), union_rows, union_test
+
+
+def unique_rows(engine, rows):
+    """Уникальные номера строк по возрастанию через битовую маску (без сортировки)."""
+    mask = np.zeros(engine['count'], dtype=bool)
+    mask[rows] = True
+    return np.flatnonzero(mask)
+
+
+def query(engine, text):
+    """Номера записей, удовлетворяющих запросу, по возрастанию."""
+    _, rows, _ = compile_query(engine, parse_query(text))
+    return unique_rows(engine, rows())
+
+
+def format_record(record):
+    """Строка вывода для записи."""
+    return f"{record['year'] or '----'}  {record['key']}  {record['title']}"
+
+
+def run_query(engine, text, limit=None):
+    """Выполняет запрос и печатает результаты со временем выполнения."""
+    started = time.perf_counter()
+    try:
+        rows = query(engine, text)
+    except ValueError as error:
+        print(f"Ошибка: {error}")
+        return
+    elapsed = (time.perf_counter() - started) * 1000
+
+    for row in rows[:limit]:
+        print(format_record(engine['records'][row]))
+    print(f"Найдено записей: {len(rows)} ({elapsed:.3f} мс)")
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Query publications of a BibTeX file by indexed fields')
+    parser.add_argument('bib_file', help='BibTeX file')
+    parser.add_argument('query', nargs='?', help='Query expression; interactive mode if omitted')
+    parser.add_argument('--limit', '-n', type=int, help='Maximum number of printed entries')
+
+    args = parser.parse_args()
+
+    if not Path(args.bib_file).exists():
+        print(f"Ошибка: файл {args.bib_file} не найден")
+        sys.exit(1)
+
+    engine = build_engine(parse_bibtex_file(args.bib_file))
+    if args.query:
+        run_query(engine, args.query, args.limit)
+        return
+
+    print(f"Загружено записей: {engine['count']}. Пустая строка или exit — выход.")
+    while True:
+        try:
+            text = input('query> ').strip()
+        except EOFError:
+            break
+        if not text or text == 'exit':
+            break
+        run_query(engine, text, args.limit)
+
+
+if __name__ == "__main__":
+    main()
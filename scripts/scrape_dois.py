@@ -10,6 +10,8 @@ import re
 from urllib.parse import quote_plus
 import json
 
+from latex_codec import escape_latex
+
 def get_google_scholar_articles(url):
     """Scrape article information from Google Scholar profile with pagination"""
     headers = {
@@ -94,9 +96,11 @@ def get_google_scholar_articles(url):
                         if link.startswith('/'):
                             link = 'https://scholar.google.com' + link
                         
-                        # Try to get authors and year
-                        authors_element = element.find('div', class_='gs_gray')
-                        authors = authors_element.get_text(strip=True) if authors_element else ""
+                        # Try to get authors and venue (the second gray line)
+                        gray_elements = element.find_all('div', class_='gs_gray')
+                        authors = gray_elements[0].get_text(strip=True) if gray_elements else ""
+                        venue = gray_elements[1].get_text(strip=True) if len(gray_elements) > 1 else ""
+                        venue = re.sub(r',\s*\d{4}$', '', venue)
                         
                         # Try to get year
                         year = None
@@ -107,11 +111,21 @@ def get_google_scholar_articles(url):
                             if year_match:
                                 year = year_match.group(1)
                         
+                        # Get cited-by count (empty cell means no citations)
+                        citations = 0
+                        cited_element = element.find('a', class_='gsc_a_ac')
+                        if cited_element:
+                            cited_match = re.search(r'\d+', cited_element.get_text(strip=True))
+                            if cited_match:
+                                citations = int(cited_match.group(0))
+                        
                         page_articles.append({
                             'title': title,
                             'authors': authors,
                             'link': link,
-                            'year': year
+                            'year': year,
+                            'venue': venue,
+                            'citations': citations
                         })
                 
                 all_articles.extend(page_articles)
@@ -186,21 +200,24 @@ def similar_titles(title1, title2, threshold=0.7):
     similarity = len(intersection) / len(union)
     return similarity >= threshold
 
-def create_bibtex_entry(title, authors, doi, year=None):
+def create_bibtex_entry(title, authors, doi, year=None, citations=None):
     """Create a BibTeX entry"""
     # Generate a key from the title
     key = re.sub(r'[^\w\s]', '', title.lower())
     key = re.sub(r'\s+', '_', key)[:30]
     
     bibtex = f"""@article{{{key},
-  title = {{{title}}},
-  author = {{{authors}}},
+  title = {{{escape_latex(title)}}},
+  author = {{{escape_latex(authors)}}},
   doi = {{{doi}}},
 """
     
     if year:
         bibtex += f"  year = {{{year}}},\n"
     
+    if citations is not None:
+        bibtex += f"  citations = {{{citations}}},\n"
+    
     bibtex += "}\n\n"
     return bibtex
 
@@ -242,7 +259,8 @@ def main():
             article['title'],
             article['authors'],
             article['doi'],
-            article.get('year')
+            article.get('year'),
+            article.get('citations')
         )
     
     with open('central uni grant/my_bib.bib', 'w', encoding='utf-8') as f:
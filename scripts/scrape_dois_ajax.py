@@ -3,12 +3,15 @@
 Script to scrape DOIs from Google Scholar profile articles using AJAX requests
 """
 
+import argparse
 import requests
 import time
 import re
 import json
 from urllib.parse import quote_plus
 
+from latex_codec import escape_latex
+
 def get_all_articles_ajax(url):
     """Get all articles from Google Scholar using AJAX requests"""
     headers = {
@@ -71,9 +74,11 @@ def get_all_articles_ajax(url):
                             if link.startswith('/'):
                                 link = 'https://scholar.google.com' + link
                             
-                            # Get authors
-                            authors_element = element.find('div', class_='gs_gray')
-                            authors = authors_element.get_text(strip=True) if authors_element else ""
+                            # Get authors and venue (the second gray line)
+                            gray_elements = element.find_all('div', class_='gs_gray')
+                            authors = gray_elements[0].get_text(strip=True) if gray_elements else ""
+                            venue = gray_elements[1].get_text(strip=True) if len(gray_elements) > 1 else ""
+                            venue = re.sub(r',\s*\d{4}$', '', venue)
                             
                             # Get year
                             year = None
@@ -84,11 +89,21 @@ def get_all_articles_ajax(url):
                                 if year_match:
                                     year = year_match.group(1)
                             
+                            # Get cited-by count (empty cell means no citations)
+                            citations = 0
+                            cited_element = element.find('a', class_='gsc_a_ac')
+                            if cited_element:
+                                cited_match = re.search(r'\d+', cited_element.get_text(strip=True))
+                                if cited_match:
+                                    citations = int(cited_match.group(0))
+                            
                             batch_articles.append({
                                 'title': title,
                                 'authors': authors,
                                 'link': link,
-                                'year': year
+                                'year': year,
+                                'venue': venue,
+                                'citations': citations
                             })
                     
                     # Check if we got new articles
@@ -167,26 +182,34 @@ def similar_titles(title1, title2, threshold=0.7):
     similarity = len(intersection) / len(union)
     return similarity >= threshold
 
-def create_bibtex_entry(title, authors, doi, year=None):
+def create_bibtex_entry(title, authors, doi, year=None, citations=None):
     """Create a BibTeX entry"""
     # Generate a key from the title
     key = re.sub(r'[^\w\s]', '', title.lower())
     key = re.sub(r'\s+', '_', key)[:30]
     
     bibtex = f"""@article{{{key},
-  title = {{{title}}},
-  author = {{{authors}}},
+  title = {{{escape_latex(title)}}},
+  author = {{{escape_latex(authors)}}},
   doi = {{{doi}}},
 """
     
     if year:
         bibtex += f"  year = {{{year}}},\n"
     
+    if citations is not None:
+        bibtex += f"  citations = {{{citations}}},\n"
+    
     bibtex += "}\n\n"
     return bibtex
 
 def main():
-    url = "https://scholar.google.com/citations?user=bROxyNoAAAAJ&hl=ru&oi=ao"
+    parser = argparse.ArgumentParser(description='Scrape articles and their DOIs from a Google Scholar profile')
+    parser.add_argument('--url', default="https://scholar.google.com/citations?user=bROxyNoAAAAJ&hl=ru&oi=ao", help='Google Scholar profile URL')
+    parser.add_argument('--output', '-o', default='found_dois_ajax.json', help='Output JSON file with articles')
+    parser.add_argument('--bib', help='Also write a draft BibTeX file (the final bib is produced by the pipeline)')
+    args = parser.parse_args()
+    url = args.url
     
     print("Scraping articles from Google Scholar profile using AJAX...")
     articles = get_all_articles_ajax(url)
@@ -213,26 +236,29 @@ def main():
         time.sleep(1)
     
     # Save results to file
-    with open('found_dois_ajax.json', 'w', encoding='utf-8') as f:
+    with open(args.output, 'w', encoding='utf-8') as f:
         json.dump(results, f, ensure_ascii=False, indent=2)
     
-    # Create BibTeX file
-    bibtex_content = ""
-    for article in results:
-        bibtex_content += create_bibtex_entry(
-            article['title'],
-            article['authors'],
-            article['doi'],
-            article.get('year')
-        )
-    
-    with open('central uni grant/my_bib.bib', 'w', encoding='utf-8') as f:
-        f.write(bibtex_content)
-    
     print(f"\nResults:")
     print(f"- Found DOIs for {len(results)} out of {len(articles)} articles")
-    print(f"- Results saved to 'found_dois_ajax.json'")
-    print(f"- BibTeX entries saved to 'central uni grant/my_bib.bib'")
+    print(f"- Results saved to '{args.output}'")
+    
+    # Create draft BibTeX file only on request
+    if args.bib:
+        bibtex_content = ""
+        for article in results:
+            bibtex_content += create_bibtex_entry(
+                article['title'],
+                article['authors'],
+                article['doi'],
+                article.get('year'),
+                article.get('citations')
+            )
+        
+        with open(args.bib, 'w', encoding='utf-8') as f:
+            f.write(bibtex_content)
+        
+        print(f"- BibTeX entries saved to '{args.bib}'")
     
     # Print summary
     print(f"\nFound DOIs:")
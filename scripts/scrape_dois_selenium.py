@@ -15,6 +15,8 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from latex_codec import escape_latex
+
 def setup_driver():
     """Setup Chrome driver with appropriate options"""
     chrome_options = Options()
@@ -192,8 +194,8 @@ def create_bibtex_entry(title, authors, doi, year=None):
     key = re.sub(r'\s+', '_', key)[:30]
     
     bibtex = f"""@article{{{key},
-  title = {{{title}}},
-  author = {{{authors}}},
+  title = {{{escape_latex(title)}}},
+  author = {{{escape_latex(authors)}}},
   doi = {{{doi}}},
 """
     
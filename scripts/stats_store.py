@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Инкрементальное хранилище статистики публикаций.
+
+Состояние хранится в JSON файле: для каждой записи bib файла — хэш ее
+исходного текста и вклад в статистику (год, журнал, издатель, первый
+автор, области исследований, цитирования), а также накопленные счетчики
+по годам, журналам, издателям, первым авторам и областям. При обновлении
+новый bib файл сравнивается с состоянием по хэшам записей, и счетчики
+корректируются только на добавленные, удаленные и измененные записи,
+поэтому время обновления пропорционально изменению, а не размеру файла.
+
+Изменение таксономии областей, списка исследователей (researchers.json)
+или таблицы названий журналов (journal_names.json) приводит к полному
+пересчету: состояние хранит их хэши. Режим
+--verify дополнительно пересчитывает статистику с нуля и сравнивает
+счетчики с инкрементальными.
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+from analyze_publications import entry_to_publication, finalize_aggregate, new_aggregate, top_counts
+from author_identity import DEFAULT_RESEARCHERS_FILE
+from bib_parser import parse_bibtex_text
+from journal_names import DEFAULT_JOURNALS_FILE
+from keyword_classifier import DEFAULT_TAXONOMY_FILE, build_classifier, classify, load_taxonomy
+
+
+# Версия формата состояния; при несовпадении состояние строится заново
+STATE_VERSION = 3
+
+# Счетчики-словари состояния
+COUNTER_NAMES = ('by_year', 'first_author_by_year', 'journals', 'publishers', 'first_authors', 'research_areas')
+
+# Файлы настроек, от которых зависят вклады записей (первый автор, канонические журналы)
+CONFIG_FILES = (DEFAULT_RESEARCHERS_FILE, DEFAULT_JOURNALS_FILE)
+
+
+def taxonomy_hash(taxonomy):
+    """Хэш таксономии: при его изменении вклады записей устаревают."""
+    data = json.dumps(taxonomy, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def config_hash(config_files=CONFIG_FILES):
+    """Хэш файлов настроек: при изменении любого из них вклады записей устаревают."""
+    digest = hashlib.sha256()
+    for path in config_files:
+        digest.update(Path(path).name.encode('utf-8'))
+        if Path(path).exists():
+            digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def new_state(taxonomy):
+    """Пустое состояние для таксономии."""
+    counters = {'total': 0, 'first_author': 0}
+    counters.update({name: {} for name in COUNTER_NAMES})
+    return {
+        'version': STATE_VERSION,
+        'taxonomy': taxonomy_hash(taxonomy),
+        'config': config_hash(),
+        'entries': {},
+        'counters': counters,
+    }
+
+
+def load_state(state_file, taxonomy):
+    """Загружает состояние; устаревшее или отсутствующее заменяется пустым."""
+    if Path(state_file).exists():
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if (state.get('version') == STATE_VERSION and state.get('taxonomy') == taxonomy_hash(taxonomy)
+                and state.get('config') == config_hash()):
+            return state
+    return new_state(taxonomy)
+
+
+def save_state(state, state_file):
+    """Сохраняет состояние."""
+    with open(state_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+
+def read_entries(bib_file):
+    """
+    Записи bib файла: {идентификатор: (хэш текста, запись)}.
+
+    Идентификатор — ключ записи; повторяющиеся ключи получают суффиксы
+    #2, #3, ..., чтобы каждая запись учитывалась отдельно.
+    """
+    with open(bib_file, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    entries = {}
+    seen = Counter()
+    for entry in parse_bibtex_text(text):
+        seen[entry['key']] += 1
+        entry_id = entry['key'] if seen[entry['key']] == 1 else f"{entry['key']}#{seen[entry['key']]}"
+        start, end = entry['span']
+        digest = hashlib.sha256(text[start:end].encode('utf-8')).hexdigest()
+        entries[entry_id] = (digest, entry)
+    return entries
+
+
+def entry_key(entry_id):
+    """Ключ записи по идентификатору состояния (без суффикса #2, #3, ...)."""
+    key, separator, number = entry_id.rpartition('#')
+    return key if separator and number.isdigit() else entry_id
+
+
+def contribution(entry, classifier):
+    """Вклад записи в счетчики; None для записей без названия, авторов или года."""
+    publication = entry_to_publication(entry)
+    if publication is None:
+        return None
+    return {
+        'year': publication['year'],
+        'journal': publication['journal'],
+        'publisher': publication['publisher'],
+        'first_author': publication['authors'][0],
+        'is_first_author': publication['is_first_author'],
+        'areas': sorted(classify(classifier, publication['title'], publication['journal'])),
+        'citations': publication['citations'],
+    }
+
+
+def _bump(counter, name, sign):
+    """Изменяет счетчик на sign и удаляет нулевые значения."""
+    counter[name] = counter.get(name, 0) + sign
+    if not counter[name]:
+        del counter[name]
+
+
+def apply_contribution(counters, contrib, sign):
+    """Добавляет (sign=1) или вычитает (sign=-1) вклад записи."""
+    if contrib is None:
+        return
+    counters['total'] += sign
+    if contrib['is_first_author']:
+        counters['first_author'] += sign
+    # Ключи JSON — строки, поэтому годы хранятся строками
+    if contrib['year'].isdigit():
+        _bump(counters['by_year'], contrib['year'], sign)
+        if contrib['is_first_author']:
+            _bump(counters['first_author_by_year'], contrib['year'], sign)
+    if contrib['journal']:
+        _bump(counters['journals'], contrib['journal'], sign)
+    if contrib['publisher']:
+        _bump(counters['publishers'], contrib['publisher'], sign)
+    _bump(counters['first_authors'], contrib['first_author'], sign)
+    for area in contrib['areas']:
+        _bump(counters['research_areas'], area, sign)
+
+
+def compute_delta(state, entries):
+    """Изменения относительно состояния: добавленные, удаленные и измененные записи."""
+    old = state['entries']
+    return {
+        'added': [entry_id for entry_id in entries if entry_id not in old],
+        'removed': [entry_id for entry_id in old if entry_id not in entries],
+        'updated': [entry_id for entry_id, (digest, _) in entries.items()
+                    if entry_id in old and old[entry_id]['hash'] != digest],
+    }
+
+
+def apply_delta(state, delta, entries, classifier):
+    """Применяет изменения к состоянию; затрагиваются только измененные записи."""
+    counters = state['counters']
+    for entry_id in delta['removed'] + delta['updated']:
+        apply_contribution(counters, state['entries'].pop(entry_id)['contribution'], -1)
+    for entry_id in delta['added'] + delta['updated']:
+        digest, entry = entries[entry_id]
+        contrib = contribution(entry, classifier)
+        apply_contribution(counters, contrib, 1)
+        state['entries'][entry_id] = {'hash': digest, 'contribution': contrib}
+
+
+def refresh_state(state_file, bib_file, taxonomy):
+    """Загружает состояние, применяет изменения bib файла и сохраняет его."""
+    state = load_state(state_file, taxonomy)
+    entries = read_entries(bib_file)
+    delta = compute_delta(state, entries)
+    if any(delta.values()) or not Path(state_file).exists():
+        apply_delta(state, delta, entries, build_classifier(taxonomy))
+        save_state(state, state_file)
+    return state, delta
+
+
+def recompute_state(bib_file, taxonomy):
+    """Строит состояние с нуля по всему bib файлу."""
+    state = new_state(taxonomy)
+    entries = read_entries(bib_file)
+    apply_delta(state, compute_delta(state, entries), entries, build_classifier(taxonomy))
+    return state
+
+
+def verify_state(state, bib_file, taxonomy):
+    """Сравнивает счетчики состояния с полным пересчетом; возвращает список расхождений."""
+    expected = recompute_state(bib_file, taxonomy)['counters']
+    actual = state['counters']
+    return [name for name in expected if expected[name] != actual.get(name)]
+
+
+def state_to_stats(state, taxonomy, since_year=None, topics=None):
+    """Статистика в формате analyze_publications по накопленным счетчикам (topics — как в finalize_aggregate)."""
+    counters = state['counters']
+    aggregate = new_aggregate(taxonomy)
+    aggregate['total'] = counters['total']
+    aggregate['first_author'] = counters['first_author']
+    aggregate['by_year'] = Counter({int(year): count for year, count in counters['by_year'].items()})
+    aggregate['first_author_by_year'] = Counter({int(year): count for year, count in counters['first_author_by_year'].items()})
+    aggregate['journals'] = Counter(counters['journals'])
+    for area, count in counters['research_areas'].items():
+        if area in aggregate['research_areas']:
+            aggregate['research_areas'][area] = count
+
+    for entry_id, record in state['entries'].items():
+        contrib = record['contribution']
+        if contrib is not None:
+            aggregate['citations'].append(contrib['citations'])
+            aggregate['citation_years'].append(int(contrib['year']) if contrib['year'].isdigit() else 0)
+            aggregate['keys'].append(entry_key(entry_id))
+
+    stats = finalize_aggregate(aggregate, since_year, topics)
+    stats['top_publishers'] = top_counts(counters['publishers'])
+    stats['top_first_authors'] = top_counts(counters['first_authors'])
+    return stats
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Incrementally update publication statistics from a BibTeX file')
+    parser.add_argument('bib_file', help='BibTeX file')
+    parser.add_argument('--state', '-s', default='publication_stats_state.json', help='Persisted statistics state file')
+    parser.add_argument('--taxonomy', '-t', default=str(DEFAULT_TAXONOMY_FILE), help='Research area taxonomy JSON file')
+    parser.add_argument('--verify', action='store_true', help='Also recompute from scratch and compare the counters')
+
+    args = parser.parse_args()
+
+    for filename in (args.bib_file, args.taxonomy):
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+
+    taxonomy = load_taxonomy(args.taxonomy)
+    state, delta = refresh_state(args.state, args.bib_file, taxonomy)
+
+    print(f"Добавлено записей: {len(delta['added'])}")
+    print(f"Удалено записей: {len(delta['removed'])}")
+    print(f"Изменено записей: {len(delta['updated'])}")
+    print(f"Всего публикаций: {state['counters']['total']}")
+
+    if args.verify:
+        mismatches = verify_state(state, args.bib_file, taxonomy)
+        if mismatches:
+            print(f"Ошибка: счетчики расходятся с полным пересчетом: {', '.join(mismatches)}")
+            sys.exit(1)
+        print("Проверка пройдена: счетчики совпадают с полным пересчетом")
+
+    print(f"Состояние сохранено как: {args.state}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Потоковое слияние многих bib файлов с удалением дубликатов во внешней памяти.
+
+В отличие от remove_duplicates.py, который держит все записи в словаре,
+здесь память ограничена размером одного прогона (run) независимо от
+объема входных файлов:
+
+1. Файлы читаются потоково, для каждой записи вычисляется нормализованный
+   ключ блокировки (DOI, иначе название, иначе ключ записи).
+2. Записи накапливаются порциями, сортируются по ключу блокировки и
+   сбрасываются во временные файлы (sorted runs).
+3. Прогоны сливаются k-путевым слиянием (heapq.merge); записи с одинаковым
+   ключом блокировки идут подряд и схлопываются в самую полную.
+4. Оставшиеся записи еще раз сортируются внешней сортировкой по номеру
+   первого появления, поэтому порядок вывода детерминирован и совпадает
+   с порядком во входных файлах.
+
+Служебные записи (@string, @preamble, @comment) копируются в начало
+результата без повторов, чтобы макросы были определены до записей.
+Разные публикации с одинаковым ключом получают буквенный суффикс
+(как в convert_bib_naming.py); в памяти для этого хранятся только ключи.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import shutil
+import sys
+import tempfile
+from itertools import chain, groupby
+from pathlib import Path
+
+from bib_parser import iter_bibtex_blocks, parse_bibtex_text
+from convert_bib_naming import unique_key
+from dedup_engine import normalize_doi, richness
+from near_duplicates import normalize_title
+
+
+# Число записей в одном прогоне
+DEFAULT_RUN_SIZE = 50000
+
+
+def blocking_key(entry):
+    """Нормализованный ключ блокировки записи."""
+    doi = normalize_doi(entry['fields'].get('doi'))
+    if doi:
+        return f'doi:{doi}'
+    title = normalize_title(entry['fields'].get('title'))
+    if title:
+        return f'title:{title}'
+    return f'key:{entry["key"]}'
+
+
+def iter_records(filenames, specials=None):
+    """
+    Потоково читает записи из файлов.
+
+    Каждая запись — список [ключ блокировки, порядковый номер, полнота, ключ,
+    текст, позиция ключа в тексте]. Служебные записи без повторов
+    дописываются в открытый файл specials.
+    """
+    sequence = 0
+    seen_specials = set()
+    for filename in filenames:
+        with open(filename, 'r', encoding='utf-8') as f:
+            for block in iter_bibtex_blocks(f):
+                special_blocks = []
+                for entry in parse_bibtex_text(block, special_blocks=special_blocks):
+                    start, end = entry['span']
+                    key_span = [position - start for position in entry['key_span']]
+                    yield [blocking_key(entry), sequence, list(richness(entry)), entry['key'], block[start:end], key_span]
+                    sequence += 1
+                if specials is None:
+                    continue
+                for text in special_blocks:
+                    if text not in seen_specials:
+                        seen_specials.add(text)
+                        specials.write(f'{text}\n\n')
+
+
+def _write_run(records, directory):
+    """Сбрасывает отсортированную порцию во временный файл JSON Lines."""
+    fd, path = tempfile.mkstemp(suffix='.jsonl', dir=directory)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+    return path
+
+
+def _read_run(path):
+    """Читает прогон построчно."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def external_sort(records, key, directory, run_size=DEFAULT_RUN_SIZE):
+    """
+    Внешняя сортировка: порции по run_size записей сортируются в памяти,
+    сбрасываются на диск и сливаются k-путевым слиянием.
+    """
+    runs = []
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= run_size:
+            runs.append(_write_run(sorted(batch, key=key), directory))
+            batch = []
+    if batch:
+        runs.append(_write_run(sorted(batch, key=key), directory))
+
+    try:
+        yield from heapq.merge(*(_read_run(path) for path in runs), key=key)
+    finally:
+        for path in runs:
+            os.remove(path)
+
+
+def collapse_duplicates(sorted_records, stats):
+    """
+    Схлопывает подряд идущие записи с одинаковым ключом блокировки.
+
+    Остается самая полная запись группы; ей присваивается номер первого
+    появления группы, чтобы сохранить исходный порядок.
+    """
+    for _, group in groupby(sorted_records, key=lambda record: record[0]):
+        group = list(group)
+        best = max(group, key=lambda record: (record[2], -record[1]))
+        stats['duplicates'] += len(group) - 1
+        yield [group[0][1], best[3], best[4], best[5]]
+
+
+def write_entries(f, records, all_keys, stats):
+    """
+    Пишет записи через пустую строку, переименовывая повторы ключей.
+
+    Первая запись с ключом сохраняет его, следующие получают буквенный
+    суффикс, не совпадающий ни с одним входным ключом (all_keys, в нижнем регистре).
+    """
+    emitted = set()
+    for index, (_, key, text, (key_start, key_end)) in enumerate(records):
+        if index:
+            f.write('\n\n')
+        if key and key.lower() in emitted:
+            new_key = unique_key(key, all_keys)
+            all_keys.add(new_key.lower())
+            stats['renamed'].append((key, new_key))
+            key = new_key
+            text = text[:key_start] + key + text[key_end:]
+        emitted.add(key.lower())
+        f.write(text)
+
+
+def streaming_merge(filenames, output_file, run_size=DEFAULT_RUN_SIZE, temp_dir=None):
+    """Сливает bib файлы с удалением дубликатов, используя ограниченную память."""
+    stats = {'entries': 0, 'duplicates': 0, 'renamed': []}
+    # Ключи сравниваются без учета регистра, как их сравнивает BibTeX
+    all_keys = set()
+
+    def counted(records):
+        for record in records:
+            stats['entries'] += 1
+            all_keys.add(record[3].lower())
+            yield record
+
+    with tempfile.TemporaryDirectory(dir=temp_dir) as directory:
+        specials_path = os.path.join(directory, 'specials.bib')
+        with open(specials_path, 'w', encoding='utf-8') as specials:
+            by_block = external_sort(
+                counted(iter_records(filenames, specials)),
+                key=lambda record: (record[0], record[1]),
+                directory=directory,
+                run_size=run_size,
+            )
+            unique = collapse_duplicates(by_block, stats)
+            by_sequence = external_sort(unique, key=lambda record: record[0], directory=directory, run_size=run_size)
+
+            # Внешняя сортировка дочитывает входные файлы до выдачи первой записи,
+            # после этого все служебные записи уже собраны
+            first = next(by_sequence, None)
+            specials.close()
+
+            with open(output_file, 'w', encoding='utf-8') as f:
+                with open(specials_path, 'r', encoding='utf-8') as copied:
+                    shutil.copyfileobj(copied, f)
+                if first is not None:
+                    write_entries(f, chain([first], by_sequence), all_keys, stats)
+                f.write('\n')
+
+    stats['unique'] = stats['entries'] - stats['duplicates']
+    return stats
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Merge many BibTeX files with bounded-memory deduplication')
+    parser.add_argument('inputs', nargs='+', help='Input BibTeX files')
+    parser.add_argument('--output', '-o', required=True, help='Output merged BibTeX file')
+    parser.add_argument('--run-size', type=int, default=DEFAULT_RUN_SIZE, help='Entries per sorted run kept in memory')
+    parser.add_argument('--temp-dir', help='Directory for temporary run files')
+
+    args = parser.parse_args()
+
+    for filename in args.inputs:
+        if not Path(filename).exists():
+            print(f"Ошибка: файл {filename} не найден")
+            sys.exit(1)
+
+    stats = streaming_merge(args.inputs, args.output, args.run_size, args.temp_dir)
+
+    print(f"Всего записей: {stats['entries']}")
+    print(f"Удалено дубликатов: {stats['duplicates']}")
+    print(f"Осталось уникальных записей: {stats['unique']}")
+    for old_key, new_key in stats['renamed']:
+        print(f"Ключ {old_key} занят другой записью, переименован в {new_key}")
+    print(f"Файл сохранен как: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
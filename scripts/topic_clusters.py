@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Тематическая кластеризация публикаций по названиям и аннотациям.
+
+Тексты нормализуются (normalize_title из near_duplicates), из них
+строится разреженная матрица TF-IDF scipy.sparse с нормированными
+строками, которая кластеризуется сферическим k-means на NumPy: близость —
+косинус, центроиды — единичные векторы. При заданном --batch-size
+используется мини-пакетный вариант. Кластеры подписываются терминами с
+наибольшим весом в центроиде.
+
+Словарь, idf, центроиды, строки матрицы и параметры построения модели
+(число кластеров, min_df, max_df, размер пакета, seed) кэшируются в .npz
+файле. При повторном запуске с теми же параметрами новые и измененные
+записи только преобразуются по сохраненному словарю и относятся к
+ближайшему центроиду; полная перекластеризация выполняется по --refit
+или при изменении любого из параметров.
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from bib_parser import parse_bibtex_file
+from latex_codec import unescape_fields
+from near_duplicates import normalize_title
+
+
+# Служебные слова, не несущие темы
+STOP_WORDS = {
+    'the', 'and', 'for', 'with', 'from', 'into', 'onto', 'over', 'under', 'via', 'its', 'their',
+    'this', 'that', 'these', 'those', 'are', 'was', 'were', 'been', 'being', 'has', 'have', 'had',
+    'not', 'but', 'which', 'such', 'can', 'may', 'also', 'than', 'then', 'there', 'here', 'some',
+    'all', 'any', 'each', 'other', 'more', 'most', 'based', 'using', 'used', 'use', 'new', 'work',
+    'paper', 'study', 'approach', 'method', 'methods', 'proposed', 'propose', 'proposes', 'results',
+    'show', 'shows', 'shown', 'well', 'how', 'between', 'within', 'without', 'about', 'our', 'two',
+}
+
+# Номер кластера для документов без терминов словаря
+NO_CLUSTER = -1
+
+
+def tokenize(text):
+    """Термины текста: нормализованные слова длиннее двух букв без служебных слов."""
+    return [token for token in normalize_title(text).split()
+            if len(token) > 2 and not token.isdigit() and token not in STOP_WORDS]
+
+
+def read_documents(bib_file):
+    """Документы bib файла: {ключ: текст названия и аннотации}."""
+    documents = {}
+    for entry in parse_bibtex_file(bib_file):
+        fields = unescape_fields(entry)
+        text = ' '.join(fields.get(name, '') for name in ('title', 'abstract')).strip()
+        if text:
+            documents[entry['key']] = text
+    return documents
+
+
+def text_hash(text):
+    """Хэш текста документа для определения изменений."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def build_vocabulary(token_lists, min_df=2, max_df=0.5):
+    """
+    Словарь и idf по документам.
+
+    Термин входит в словарь, если встречается не менее чем в min_df
+    документах и не более чем в доле max_df документов.
+    """
+    count = len(token_lists)
+    document_frequency = Counter()
+    for tokens in token_lists:
+        document_frequency.update(set(tokens))
+
+    terms = sorted(term for term, df in document_frequency.items() if min_df <= df <= max(max_df * count, min_df))
+    df = np.array([document_frequency[term] for term in terms], dtype=np.float64)
+    idf = np.log((1 + count) / (1 + df)) + 1
+    return terms, idf
+
+
+def normalize_rows(matrix):
+    """Нормирует строки разреженной матрицы на единичную длину (нулевые остаются нулевыми)."""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+def transform(token_lists, terms, idf):
+    """Матрица TF-IDF CSR (сублинейный tf, строки единичной длины) по готовому словарю."""
+    columns = {term: column for column, term in enumerate(terms)}
+    indptr = [0]
+    indices = []
+    data = []
+    for tokens in token_lists:
+        counts = Counter(columns[token] for token in tokens if token in columns)
+        for column, count in sorted(counts.items()):
+            indices.append(column)
+            data.append((1 + np.log(count)) * idf[column])
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(token_lists), len(terms)), dtype=np.float64)
+    return normalize_rows(matrix).tocsr()
+
+
+def _unit(vectors):
+    """Нормирует строки плотной матрицы."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def init_centroids(matrix, clusters, rng):
+    """Начальные центроиды k-means++ по косинусному расстоянию."""
+    count = matrix.shape[0]
+    chosen = [int(rng.integers(count))]
+    distance = 1 - (matrix @ matrix[chosen[0]].T).toarray().ravel()
+    for _ in range(1, clusters):
+        weights = np.clip(distance, 0, None)
+        if weights.sum() == 0:
+            chosen.append(int(rng.integers(count)))
+        else:
+            chosen.append(int(rng.choice(count, p=weights / weights.sum())))
+        distance = np.minimum(distance, 1 - (matrix @ matrix[chosen[-1]].T).toarray().ravel())
+    return _unit(matrix[chosen].toarray())
+
+
+def assign(matrix, centroids):
+    """Ближайший по косинусу центроид для каждой строки; NO_CLUSTER для пустых строк."""
+    similarity = np.asarray(matrix @ centroids.T)
+    labels = similarity.argmax(axis=1)
+    labels[np.diff(matrix.indptr) == 0] = NO_CLUSTER
+    return labels
+
+
+def cluster_sums(matrix, labels, clusters):
+    """Суммы строк по кластерам через разреженную матрицу принадлежности."""
+    valid = labels != NO_CLUSTER
+    membership = sparse.csr_matrix(
+        (np.ones(int(valid.sum())), (labels[valid], np.flatnonzero(valid))),
+        shape=(clusters, matrix.shape[0]),
+    )
+    return np.asarray((membership @ matrix).todense()), np.bincount(labels[valid], minlength=clusters)
+
+
+def spherical_kmeans(matrix, clusters, iterations=100, batch_size=None, seed=0):
+    """
+    Сферический k-means; при batch_size меньше числа строк — мини-пакетный.
+
+    Возвращает (центроиды, метки кластеров строк).
+    """
+    rng = np.random.default_rng(seed)
+    count = matrix.shape[0]
+    centroids = init_centroids(matrix, clusters, rng)
+
+    if batch_size and batch_size < count:
+        seen = np.zeros(clusters)
+        for _ in range(iterations):
+            batch = matrix[rng.choice(count, batch_size, replace=False)]
+            sums, sizes = cluster_sums(batch, assign(batch, centroids), clusters)
+            seen += sizes
+            updated = sizes > 0
+            # Скорость обучения центроида убывает как 1 / число увиденных строк
+            rate = (sizes[updated] / seen[updated])[:, None]
+            means = sums[updated] / sizes[updated][:, None]
+            centroids[updated] = _unit((1 - rate) * centroids[updated] + rate * means)
+        return centroids, assign(matrix, centroids)
+
+    labels = None
+    for _ in range(iterations):
+        new_labels = assign(matrix, centroids)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        sums, sizes = cluster_sums(matrix, labels, clusters)
+        # Пустой кластер сохраняет прежний центроид
+        centroids[sizes > 0] = _unit(sums[sizes > 0])
+    return centroids, labels
+
+
+def top_terms(centroids, terms, count=5):
+    """Термины с наибольшим весом для каждого центроида."""
+    order = np.argsort(-centroids, axis=1, kind='stable')[:, :count]
+    return [[terms[column] for column in row if centroids[index, column] > 0] for index, row in enumerate(order)]
+
+
+def save_cache(cache_file, model):
+    """Сохраняет параметры, словарь, idf, центроиды, строки матрицы и метки в .npz."""
+    matrix = model['matrix']
+    np.savez_compressed(
+        cache_file,
+        params=np.array(json.dumps(model['params'], sort_keys=True)),
+        terms=np.array(model['terms'], dtype=str),
+        idf=model['idf'],
+        centroids=model['centroids'],
+        keys=np.array(model['keys'], dtype=str),
+        hashes=np.array(model['hashes'], dtype=str),
+        labels=model['labels'],
+        data=matrix.data,
+        indices=matrix.indices,
+        indptr=matrix.indptr,
+    )
+
+
+def load_cache(cache_file):
+    """Загружает кэш модели или возвращает None; у кэша без параметров они равны None."""
+    if not Path(cache_file).exists():
+        return None
+    with np.load(cache_file, allow_pickle=False) as data:
+        terms = [str(term) for term in data['terms']]
+        return {
+            'params': json.loads(str(data['params'])) if 'params' in data else None,
+            'terms': terms,
+            'idf': data['idf'],
+            'centroids': data['centroids'],
+            'keys': [str(key) for key in data['keys']],
+            'hashes': [str(digest) for digest in data['hashes']],
+            'labels': data['labels'],
+            'matrix': sparse.csr_matrix(
+                (data['data'], data['indices'], data['indptr']),
+                shape=(len(data['indptr']) - 1, len(terms)),
+            ),
+        }
+
+
+def model_params(clusters, batch_size=None, seed=0, min_df=2, max_df=0.5):
+    """Параметры построения модели; кэш с другими параметрами перестраивается."""
+    return {'clusters': clusters, 'batch_size': batch_size, 'seed': seed, 'min_df': min_df, 'max_df': max_df}
+
+
+def fit(documents, clusters, batch_size=None, seed=0, min_df=2, max_df=0.5):
+    """Строит словарь и матрицу по всем документам и кластеризует их."""
+    keys = list(documents)
+    token_lists = [tokenize(documents[key]) for key in keys]
+    terms, idf = build_vocabulary(token_lists, min_df, max_df)
+    matrix = transform(token_lists, terms, idf)
+    centroids, labels = spherical_kmeans(matrix, min(clusters, len(keys)), batch_size=batch_size, seed=seed)
+    return {
+        'params': model_params(clusters, batch_size, seed, min_df, max_df),
+        'terms': terms,
+        'idf': idf,
+        'centroids': centroids,
+        'keys': keys,
+        'hashes': [text_hash(documents[key]) for key in keys],
+        'labels': labels,
+        'matrix': matrix,
+    }
+
+
+def update(model, documents):
+    """
+    Обновляет модель по новым документам без перекластеризации.
+
+    Неизмененные документы сохраняют строки и метки; новые и измененные
+    преобразуются по сохраненному словарю и относятся к ближайшему
+    центроиду. Возвращает (модель, число преобразованных документов).
+    """
+    cached = {key: (digest, row) for row, (key, digest) in enumerate(zip(model['keys'], model['hashes']))}
+    keys = list(documents)
+    hashes = [text_hash(documents[key]) for key in keys]
+    fresh = [index for index, (key, digest) in enumerate(zip(keys, hashes))
+             if key not in cached or cached[key][0] != digest]
+
+    rows = [None] * len(keys)
+    labels = np.empty(len(keys), dtype=np.int64)
+    fresh_set = set(fresh)
+    for index, key in enumerate(keys):
+        if index not in fresh_set:
+            rows[index] = model['matrix'][cached[key][1]]
+            labels[index] = model['labels'][cached[key][1]]
+    if fresh:
+        matrix = transform([tokenize(documents[keys[index]]) for index in fresh], model['terms'], model['idf'])
+        fresh_labels = assign(matrix, model['centroids'])
+        for position, index in enumerate(fresh):
+            rows[index] = matrix[position]
+            labels[index] = fresh_labels[position]
+
+    shape = (0, len(model['terms']))
+    model = dict(model, keys=keys, hashes=hashes, labels=labels,
+                 matrix=sparse.vstack(rows, format='csr') if rows else sparse.csr_matrix(shape))
+    return model, len(fresh)
+
+
+def topics_report(model, terms_per_topic=5):
+    """Отчет: кластеры с подписями, размерами и ключами, назначения записей."""
+    labels_terms = top_terms(model['centroids'], model['terms'], terms_per_topic)
+    clusters = {}
+    for index, terms in enumerate(labels_terms):
+        clusters[f'topic_{index}'] = {
+            'name': ', '.join(terms[:3]) or f'topic_{index}',
+            'terms': terms,
+            'keys': [key for key, label in zip(model['keys'], model['labels']) if label == index],
+        }
+    for cluster in clusters.values():
+        cluster['size'] = len(cluster['keys'])
+    assignments = {key: f'topic_{label}' for key, label in zip(model['keys'], model['labels']) if label != NO_CLUSTER}
+    return {'clusters': clusters, 'assignments': assignments}
+
+
+def load_topic_areas(topics_file):
+    """Темы как области исследований для analyze_publications: (таксономия, назначения записей)."""
+    with open(topics_file, 'r', encoding='utf-8') as f:
+        topics = json.load(f)
+    taxonomy = {topic: {'name': cluster['name'], 'keywords': cluster['terms']}
+                for topic, cluster in topics['clusters'].items()}
+    return taxonomy, topics['assignments']
+
+
+def count_topics(topics, keys):
+    """
+    Число публикаций по темам среди записей с ключами keys.
+
+    topics — результат load_topic_areas. Записи, которых нет в
+    назначениях (добавлены после кластеризации или без терминов словаря),
+    не учитываются.
+    """
+    taxonomy, assignments = topics
+    counts = {topic: 0 for topic in taxonomy}
+    for key in keys:
+        topic = assignments.get(key)
+        if topic in counts:
+            counts[topic] += 1
+    return counts
+
+
+def main():
+    """Основная функция для запуска скрипта."""
+    parser = argparse.ArgumentParser(description='Cluster publications into topics by TF-IDF of titles and abstracts')
+    parser.add_argument('bib_file', help='BibTeX file')
+    parser.add_argument('--clusters', '-k', type=int, default=8, help='Number of topics')
+    parser.add_argument('--batch-size', type=int, help='Use mini-batch k-means with this batch size')
+    parser.add_argument('--min-df', type=int, default=2, help='Minimum number of documents containing a term')
+    parser.add_argument('--max-df', type=float, default=0.5, help='Maximum share of documents containing a term')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--cache', default='topics_cache.npz', help='Vocabulary and matrix cache file')
+    parser.add_argument('--refit', action='store_true', help='Rebuild the vocabulary and recluster all entries')
+    parser.add_argument('--output', '-o', default='topics.json', help='Output JSON file')
+
+    args = parser.parse_args()
+
+    if not Path(args.bib_file).exists():
+        print(f"Ошибка: файл {args.bib_file} не найден")
+        sys.exit(1)
+
+    documents = read_documents(args.bib_file)
+    if not documents:
+        print("Ошибка: в файле нет записей с названиями")
+        sys.exit(1)
+
+    params = model_params(args.clusters, args.batch_size, args.seed, args.min_df, args.max_df)
+    model = None if args.refit else load_cache(args.cache)
+    if model is not None and model['params'] == params:
+        model, transformed = update(model, documents)
+        print(f"Кэш: {args.cache}, преобразовано новых или измененных записей: {transformed}")
+    else:
+        model = fit(documents, args.clusters, args.batch_size, args.seed, args.min_df, args.max_df)
+        print(f"Словарь: {len(model['terms'])} терминов, записей: {len(model['keys'])}")
+    save_cache(args.cache, model)
+
+    report = topics_report(model)
+    print("\n=== TOPICS ===")
+    for topic, cluster in report['clusters'].items():
+        print(f"{topic}: {cluster['size']} publications — {', '.join(cluster['terms'])}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\nТемы сохранены как: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
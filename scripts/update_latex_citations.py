@@ -3,77 +3,163 @@
 Скрипт для обновления ключей цитирования в LaTeX файле.
 
 Обновляет старые ключи (фамилия+год) на новые семантические ключи
-после преобразования bib файла.
+после преобразования bib файла. Обрабатывает \\cite, \\citep, \\textcite,
+\\nocite и другие команды со списками ключей и необязательными
+аргументами, в одном файле или во всех .tex файлах дерева каталогов
+(параллельно).
 """
 
+import argparse
+import json
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from convert_bib_naming import key_mapping_path
+
 
 def create_key_mapping(bib_file):
-    """Создает отображение старых ключей на новые из bib файла."""
-    with open(bib_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Паттерн для поиска старых ключей (фамилия+год)
-    old_pattern = r'@\w+\{([A-Z][a-z]+[0-9]+)'
-    old_keys = set(re.findall(old_pattern, content))
-    
-    # Паттерн для поиска новых ключей (семантические)
-    new_pattern = r'@\w+\{([a-z_]+_[0-9]+)'
-    new_keys = set(re.findall(new_pattern, content))
-    
-    # Создаем отображение (это упрощенная версия, в реальности нужно
-    # сопоставлять по заголовкам)
-    mapping = {}
-    
-    # Для демонстрации создадим базовое отображение
-    # В реальности нужно анализировать заголовки статей
-    print("Найдены старые ключи:", sorted(old_keys))
-    print("Найдены новые ключи:", sorted(new_keys))
-    
+    """Загружает отображение старых ключей на новые, сохраненное convert_bib_naming.py рядом с bib файлом."""
+    mapping_file = key_mapping_path(bib_file)
+    if not mapping_file.exists():
+        # Без отображения заменять нечего: не сообщаем об успехе, ничего не переписав
+        print(f"Ошибка: файл {mapping_file} не найден (создается convert_bib_naming.py)")
+        sys.exit(1)
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        mapping = json.load(f)
+    print(f"Загружено отображение ключей из {mapping_file}: {len(mapping)} ключей")
     return mapping
 
 
+# Команды цитирования (\cite, \citep, \textcite, \nocite, ...) с необязательными
+# аргументами [..] и списком ключей через запятую
+CITE_RE = re.compile(r'(\\[A-Za-z]*cite[A-Za-z]*\*?(?:\s*\[[^\]]*\])*\s*\{)([^}]*)(\})')
+KEY_TOKEN_RE = re.compile(r'[^,\s]+')
+
+# Отображение ключей в процессе-обработчике (передается один раз при запуске)
+_worker_mapping = {}
+
+
+def rewrite_citations(content, mapping):
+    """
+    Заменяет ключи во всех командах цитирования за один проход по тексту.
+
+    Каждая команда находится одним скомпилированным выражением, а ключи из
+    ее списка ищутся в словаре отображения, поэтому время не зависит от
+    размера отображения. Возвращает новый текст и число замененных ключей.
+    """
+    replaced = 0
+
+    def replace_key(match):
+        nonlocal replaced
+        key = match.group(0)
+        if key in mapping:
+            replaced += 1
+            return mapping[key]
+        return key
+
+    def replace_command(match):
+        keys = KEY_TOKEN_RE.sub(replace_key, match.group(2))
+        return f"{match.group(1)}{keys}{match.group(3)}"
+
+    return CITE_RE.sub(replace_command, content), replaced
+
+
+def _init_worker(mapping):
+    """Сохраняет отображение ключей в процессе-обработчике."""
+    global _worker_mapping
+    _worker_mapping = mapping
+
+
+def rewrite_file(latex_file, output_file=None, mapping=None):
+    """
+    Обновляет ключи в одном LaTeX файле.
+
+    Файл перезаписывается, только если ключи действительно изменились.
+    Возвращает (имя файла, число замененных ключей).
+    """
+    with open(latex_file, 'r', encoding='utf-8', newline='') as f:
+        content = f.read()
+
+    new_content, replaced = rewrite_citations(content, _worker_mapping if mapping is None else mapping)
+
+    output_file = output_file or latex_file
+    if new_content != content or output_file != latex_file:
+        with open(output_file, 'w', encoding='utf-8', newline='') as f:
+            f.write(new_content)
+
+    return str(latex_file), replaced
+
+
+def find_tex_files(root):
+    """Все .tex файлы в дереве каталогов."""
+    return sorted(Path(root).rglob('*.tex'))
+
+
+def update_tree(root, mapping, workers=None):
+    """Обновляет ключи во всех .tex файлах дерева параллельно."""
+    tex_files = find_tex_files(root)
+    if workers == 1 or len(tex_files) <= 1:
+        return [rewrite_file(path, mapping=mapping) for path in tex_files]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(mapping,)) as executor:
+        return list(executor.map(rewrite_file, tex_files))
+
+
 def update_latex_citations(latex_file, bib_file, output_file):
     """Обновляет ключи цитирования в LaTeX файле."""
-    with open(latex_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
     # Создаем отображение ключей
     mapping = create_key_mapping(bib_file)
     
     # Заменяем старые ключи на новые
-    for old_key, new_key in mapping.items():
-        content = content.replace(f'\\nocite{{{old_key}}}', f'\\nocite{{{new_key}}}')
-    
-    # Сохраняем результат
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(content)
+    _, replaced = rewrite_file(latex_file, output_file, mapping)
     
+    print(f"Заменено ключей: {replaced}")
     print(f"Файл обновлен: {output_file}")
 
 
+def load_mapping(mapping_file):
+    """Загружает отображение ключей из JSON файла."""
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
 def main():
     """Основная функция для запуска скрипта."""
-    if len(sys.argv) != 4:
-        print("Использование: python update_latex_citations.py latex_file.tex bib_file.bib output_file.tex")
-        sys.exit(1)
-    
-    latex_file = sys.argv[1]
-    bib_file = sys.argv[2]
-    output_file = sys.argv[3]
-    
-    if not Path(latex_file).exists():
-        print(f"Ошибка: файл {latex_file} не найден")
+    parser = argparse.ArgumentParser(description='Rewrite citation keys in LaTeX files')
+    parser.add_argument('target', help='LaTeX file or directory with .tex files')
+    parser.add_argument('bib_file', nargs='?', help='BibTeX file (its .keymap.json is used)')
+    parser.add_argument('output', nargs='?', help='Output file (single-file mode only)')
+    parser.add_argument('--mapping', '-m', help='JSON file with old -> new key mapping')
+    parser.add_argument('--workers', '-w', type=int, help='Number of worker processes')
+
+    args = parser.parse_args()
+
+    if not Path(args.target).exists():
+        print(f"Ошибка: файл {args.target} не найден")
         sys.exit(1)
-    
-    if not Path(bib_file).exists():
-        print(f"Ошибка: файл {bib_file} не найден")
+
+    if args.mapping:
+        mapping = load_mapping(args.mapping)
+    elif args.bib_file:
+        if not Path(args.bib_file).exists():
+            print(f"Ошибка: файл {args.bib_file} не найден")
+            sys.exit(1)
+        mapping = create_key_mapping(args.bib_file)
+    else:
+        print("Ошибка: укажите bib файл или --mapping")
         sys.exit(1)
-    
-    update_latex_citations(latex_file, bib_file, output_file)
+
+    if Path(args.target).is_dir():
+        results = update_tree(args.target, mapping, args.workers)
+    else:
+        results = [rewrite_file(args.target, args.output, mapping)]
+
+    for filename, replaced in results:
+        if replaced:
+            print(f"{filename}: заменено ключей: {replaced}")
+    print(f"Обработано файлов: {len(results)}, заменено ключей: {sum(r for _, r in results)}")
 
 
 if __name__ == "__main__":